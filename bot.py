@@ -5,35 +5,23 @@ import os
 import asyncio
 import discord
 import logging
-import traceback
 import sys
 import time
+import heapq
 from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
-# Custom log formatter that safely handles emojis
-class SafeFormatter(logging.Formatter):
-    def format(self, record):
-        try:
-            return super().format(record)
-        except UnicodeEncodeError:
-            record.msg = str(record.msg).encode('utf-8', 'replace').decode('utf-8')
-            if hasattr(record, 'args') and record.args:
-                record.args = tuple(
-                    str(arg).encode('utf-8', 'replace').decode('utf-8') 
-                    if isinstance(arg, str) else arg 
-                    for arg in record.args
-                )
-            return super().format(record)
-
 # Import from common modules
 from common.config import (
     COMMAND_PREFIX, AFK_TIMEOUT_SECONDS, 
     ACCEPT_EMOJI, DECLINE_EMOJI
 )
 from common.database import database
-from common.utils.game_utils import active_games
+from common.utils.game_utils import (
+    active_games, afk_heap, afk_wakeup,
+    pending_messages, get_pending_message, PendingConfirmation, edit_and_clear_reactions
+)
 from common.commands.leaderboard import setup_leaderboard_commands, GAME_IDS
 from common.commands.help import setup_help_command
 
@@ -41,26 +29,33 @@ from common.commands.help import setup_help_command
 # Memory Match Game (ID: 1001)
 from games.game_1001_matching.commands_1001 import (
     setup_challenge_command, end_game_internal,
-    end_game_confirmations, pending_challenges
+    end_game_confirmations, pending_challenges,
+    accept_matching_challenge, decline_matching_challenge
 )
 
 # Tic Tac Toe Game (ID: 1002)
 from games.game_1002_tictactoe.commands_1002 import (
     setup_tictactoe_command, end_ttt_game_internal,
-    end_ttt_confirmations, pending_ttt_challenges
+    end_ttt_confirmations, pending_ttt_challenges,
+    accept_ttt_challenge, decline_ttt_challenge
 )
 
 # Rock Paper Scissors Game (ID: 1003)
 from games.game_1003_rps.commands_1003 import (
-    setup_rps_command, pending_rps_challenges
+    setup_rps_command, pending_rps_challenges,
+    accept_rps_challenge, decline_rps_challenge
 )
 
 # Setup logging
+# Write the console as UTF-8 and escape anything it can't encode, so emojis never break logging
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding='utf-8', errors='backslashreplace')
+
 file_handler = logging.FileHandler("discord_bot.log", encoding='utf-8')
 console_handler = logging.StreamHandler(sys.stdout)
 
-# Apply the safe formatter to both handlers
-formatter = SafeFormatter('%(asctime)s [%(levelname)s] %(message)s')
+# Apply the same formatter to both handlers
+formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
 file_handler.setFormatter(formatter)
 console_handler.setFormatter(formatter)
 
@@ -74,6 +69,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("discord_bot")
 
+# Embed colours, created once and shared by every embed
+COLOR_RED = discord.Color.red()
+
 # Load environment variables
 load_dotenv()
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")
@@ -81,8 +79,7 @@ TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 # Setup intents
 intents = discord.Intents.default()
 intents.message_content = True
-intents.members = True
-intents.reactions = True
+intents.reactions = True  # No members intent: reaction events carry the member, fetch_member covers the rest
 
 # Create bot
 bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents, help_command=None)
@@ -90,20 +87,9 @@ bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents, help_command=
 # Error handler
 @bot.event
 async def on_error(event, *args, **kwargs):
-    error_type, error_value, error_traceback = sys.exc_info()
-    
-    error_msg = f"Error in {event}: {error_type.__name__}: {error_value}\n"
-    error_msg += "".join(traceback.format_tb(error_traceback))
-    
-    logger.error(error_msg)
-    
-    # If this is during command execution, try to notify the user
-    if event == "on_command_error" and args:
-        ctx = args[0]
-        try:
-            await ctx.send(f"An error occurred: {error_type.__name__}. Check logs for details.", delete_after=5.0)
-        except:
-            pass
+    # logging pulls the active exception from sys.exc_info() and formats it only when emitted
+    logger.exception("Error in %s", event)
+    # Command errors are reported to the user by on_command_error
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -122,17 +108,17 @@ async def on_command_error(ctx, error):
 @bot.event
 async def on_ready():
     """When the bot is ready."""
-    # Initialize database
-    database["init_db"]()
+    # Initialize database off the event loop so heartbeats aren't blocked
+    await asyncio.get_running_loop().run_in_executor(None, database["init_db"])
     
     # Start background tasks
     bot.loop.create_task(check_afk_games())
     
     # Log bot info
     app_info = await bot.application_info()
-    logger.info(f"Logged in as {bot.user.name} (ID: {bot.user.id})")
-    logger.info(f"Owner: {app_info.owner}")
-    logger.info(f"Discord.py version: {discord.__version__}")
+    logger.info("Logged in as %s (ID: %s)", bot.user.name, bot.user.id)
+    logger.info("Owner: %s", app_info.owner)
+    logger.info("Discord.py version: %s", discord.__version__)
     
     # Set bot status
     game_names = list(GAME_IDS.values())
@@ -141,95 +127,86 @@ async def on_ready():
     
     print(f"{bot.user.name} is ready!")
 
+# AFK messages, formatted once since the timeout never changes
+AFK_MESSAGE = f"Game ended due to inactivity (no moves for {int(AFK_TIMEOUT_SECONDS/60)} minutes)."
+RPS_AFK_MESSAGE = f"Rock Paper Scissors game ended due to inactivity (no moves for {int(AFK_TIMEOUT_SECONDS/60)} minutes)."
+
+async def end_rps_game_afk(channel, game, ended_by=None, reason=None):
+    """End a Rock Paper Scissors game due to inactivity."""
+    # No need for special handling as RPS games are stateless between rounds
+    if active_games.get("1003", {}).pop(channel.id, None) is not None:
+        await channel.send(RPS_AFK_MESSAGE)
+
+# Game ID -> coroutine used to end an inactive game of that type
+AFK_HANDLERS = {
+    "1001": end_game_internal,      # Memory Match
+    "1002": end_ttt_game_internal,  # Tic Tac Toe
+    "1003": end_rps_game_afk,       # Rock Paper Scissors
+}
+
 async def check_afk_games():
-    """Background task to check for AFK players and end inactive games."""
+    """Background task to end inactive games, sleeping until the next AFK deadline."""
     while not bot.is_closed():
         try:
-            current_time = time.time()
+            now = time.monotonic()
             
-            # Check Memory Match Games (ID: 1001)
-            game_id = "1001"
-            channels_to_check = list(active_games[game_id].keys()) if game_id in active_games else []
-            for channel_id in channels_to_check:
-                game = active_games[game_id].get(channel_id)
-                if not game:
-                    continue
+            # Pop every scheduled check whose deadline has passed
+            while afk_heap and afk_heap[0][0] <= now:
+                _, game_id, channel_id = heapq.heappop(afk_heap)
                 
-                # Check if the game has been inactive for too long
-                if current_time - game.last_activity_time > AFK_TIMEOUT_SECONDS:
-                    # Get the channel
-                    channel = bot.get_channel(channel_id)
-                    if not channel:
-                        # Channel no longer exists, remove the game
-                        if channel_id in active_games[game_id]:
-                            del active_games[game_id][channel_id]
-                        continue
-                    
-                    # End the game due to AFK
-                    await end_game_internal(
-                        channel, 
-                        game, 
-                        None, 
-                        f"Game ended due to inactivity (no moves for {int(AFK_TIMEOUT_SECONDS/60)} minutes)."
-                    )
-            
-            # Check Tic Tac Toe Games (ID: 1002)
-            game_id = "1002"
-            channels_to_check = list(active_games[game_id].keys()) if game_id in active_games else []
-            for channel_id in channels_to_check:
-                game = active_games[game_id].get(channel_id)
-                if not game:
+                game = active_games.get(game_id, {}).get(channel_id)
+                if game is None:
+                    continue  # Game already ended
+                
+                # Moves only refresh last_activity_time, so reschedule games that are still active
+                deadline = game.last_activity_time + AFK_TIMEOUT_SECONDS
+                if deadline > now:
+                    heapq.heappush(afk_heap, (deadline, game_id, channel_id))
                     continue
                 
-                # Check if the game has been inactive for too long
-                if current_time - game.last_activity_time > AFK_TIMEOUT_SECONDS:
-                    # Get the channel
-                    channel = bot.get_channel(channel_id)
-                    if not channel:
-                        # Channel no longer exists, remove the game
-                        if channel_id in active_games[game_id]:
-                            del active_games[game_id][channel_id]
-                        continue
-                    
-                    # End the game due to AFK
-                    await end_ttt_game_internal(
-                        channel, 
-                        game, 
-                        None, 
-                        f"Game ended due to inactivity (no moves for {int(AFK_TIMEOUT_SECONDS/60)} minutes)."
-                    )
-            
-            # Check Rock Paper Scissors Games (ID: 1003)
-            game_id = "1003"
-            channels_to_check = list(active_games[game_id].keys()) if game_id in active_games else []
-            for channel_id in channels_to_check:
-                game = active_games[game_id].get(channel_id)
-                if not game:
+                # Get the channel
+                channel = bot.get_channel(channel_id)
+                if not channel:
+                    # Channel no longer exists, remove the game
+                    active_games[game_id].pop(channel_id, None)
                     continue
                 
-                # Check if the game has been inactive for too long
-                if current_time - game.last_activity_time > AFK_TIMEOUT_SECONDS:
-                    # Get the channel
-                    channel = bot.get_channel(channel_id)
-                    if not channel:
-                        # Channel no longer exists, remove the game
-                        if channel_id in active_games[game_id]:
-                            del active_games[game_id][channel_id]
-                        continue
-                    
-                    # End the game due to AFK by removing it from active games
-                    # No need for special handling as RPS games are stateless between rounds
-                    if channel_id in active_games[game_id]:
-                        del active_games[game_id][channel_id]
-                        await channel.send(f"Rock Paper Scissors game ended due to inactivity (no moves for {int(AFK_TIMEOUT_SECONDS/60)} minutes).")
+                # End the game due to AFK
+                await AFK_HANDLERS[game_id](channel, game, None, AFK_MESSAGE)
+            
+            # With no games running, leftover entries of ended games are stale - drop them
+            # so an idle bot waits on add_active_game() alone instead of waking per deadline
+            if not any(active_games.values()):
+                afk_heap.clear()
             
-            # Sleep for a while before checking again (every 10 seconds)
-            await asyncio.sleep(10)
+            # Sleep until the earliest deadline, or until a new game is scheduled
+            afk_wakeup.clear()
+            timeout = afk_heap[0][0] - time.monotonic() if afk_heap else None
+            try:
+                await asyncio.wait_for(afk_wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
         
         except Exception as e:
-            logger.error(f"Error in AFK checker: {e}")
+            logger.error("Error in AFK checker: %s", e)
             await asyncio.sleep(30)  # Sleep longer on error
 
+# Reactions the bot responds to - unicode glyphs, so they match PartialEmoji.name directly
+TRACKED_EMOJIS = frozenset((ACCEPT_EMOJI, DECLINE_EMOJI))
+
+# Pending challenge dict -> (accept coroutine, decline coroutine)
+CHALLENGE_HANDLERS = (
+    (pending_challenges, accept_matching_challenge, decline_matching_challenge),  # Memory Match
+    (pending_ttt_challenges, accept_ttt_challenge, decline_ttt_challenge),        # Tic Tac Toe
+    (pending_rps_challenges, accept_rps_challenge, decline_rps_challenge),        # Rock Paper Scissors
+)
+
+# End game confirmation dict -> (game ID, coroutine used to end the game)
+CONFIRMATION_HANDLERS = (
+    (end_game_confirmations, "1001", end_game_internal),     # Memory Match
+    (end_ttt_confirmations, "1002", end_ttt_game_internal),  # Tic Tac Toe
+)
+
 @bot.event
 async def on_raw_reaction_add(payload):
     """Handle reactions for game challenges and confirmations."""
@@ -238,227 +215,115 @@ async def on_raw_reaction_add(payload):
         if payload.user_id == bot.user.id:
             return
         
-        # Get the channel
-        channel = bot.get_channel(payload.channel_id)
-        if not channel:
+        # Only accept/decline reactions matter
+        emoji = payload.emoji.name
+        if emoji not in TRACKED_EMOJIS:
             return
         
-        # Get the message
-        try:
-            message = await channel.fetch_message(payload.message_id)
-        except (discord.errors.NotFound, discord.errors.Forbidden):
+        # Find the pending challenge or confirmation for this message
+        pending = get_pending_message(payload.message_id)
+        if pending is None:
             return
-            
-        # Ignore if the message is not from the bot
-        if message.author.id != bot.user.id:
+        pending_dict, key, value = pending
+        
+        # Only the challenged player / opponent can respond
+        # Challenge keys are (target_user_id, channel_id), confirmations store the opponent
+        target_id = value.opponent.id if isinstance(value, PendingConfirmation) else key[0]
+        if payload.user_id != target_id:
+            return
+        
+        # Get the channel
+        channel = bot.get_channel(payload.channel_id)
+        if not channel:
             return
-            
-        # Get the emoji as a string
-        emoji = str(payload.emoji)
         
         # Get the user who reacted
         user = None # Initialize user
         try:
             guild = bot.get_guild(payload.guild_id)
             if not guild:
-                logger.warning(f"Reaction payload from unknown guild_id: {payload.guild_id}, channel_id: {payload.channel_id}")
+                logger.warning("Reaction payload from unknown guild_id: %s, channel_id: %s", payload.guild_id, payload.channel_id)
                 return
             
-            # Try to get member from cache first, then fetch if not found or if member object is incomplete
-            user = guild.get_member(payload.user_id)
+            # Guild reaction events carry the member, then try the cache, then fetch as a last resort
+            user = payload.member or guild.get_member(payload.user_id)
             if not user:
-                logger.info(f"Member {payload.user_id} not in cache for guild {guild.id}, attempting to fetch.")
+                logger.info("Member %s not in cache for guild %s, attempting to fetch.", payload.user_id, guild.id)
                 user = await guild.fetch_member(payload.user_id)
             
             if not user: # Should be redundant if fetch_member raises NotFound, but as a safeguard
-                logger.warning(f"Could not obtain member object for {payload.user_id} in guild {guild.id} after fetch attempt.")
+                logger.warning("Could not obtain member object for %s in guild %s after fetch attempt.", payload.user_id, guild.id)
                 return
 
         except discord.errors.NotFound:
-            logger.warning(f"Member {payload.user_id} not found in guild {guild.id} via fetch_member. They might have left.")
+            logger.warning("Member %s not found in guild %s via fetch_member. They might have left.", payload.user_id, guild.id)
             return
         except discord.errors.Forbidden:
-            logger.error(f"Bot lacks permissions to fetch member {payload.user_id} in guild {guild.id}.")
+            logger.error("Bot lacks permissions to fetch member %s in guild %s.", payload.user_id, guild.id)
             return
         except discord.errors.HTTPException as e:
-            logger.error(f"HTTP error fetching member {payload.user_id} in guild {guild.id}: {e.status} {e.text}")
-            return
-        except Exception as e:
-            logger.error(f"Unexpected error fetching member {payload.user_id} in guild {guild.id}: {type(e).__name__} - {e}")
-            logger.error(traceback.format_exc())
+            logger.error("HTTP error fetching member %s in guild %s: %s %s", payload.user_id, guild.id, e.status, e.text)
             return
-            
-        # Check for Memory Match challenge acceptance/rejection
-        # pending_challenges: (target_user_id, channel_id) -> (challenger, channel, category, message_id, rows, cols)
-        for key, challenge_tuple in list(pending_challenges.items()):
-            target_id, ch_id = key
-            
-            # Unpack only the first 4 values we need, ignoring the rest
-            challenger, channel, message_id, category = challenge_tuple[:4]
-            
-            if message_id == payload.message_id and payload.user_id == target_id:
-                # This is a reaction to a challenge message
-                
-                if emoji == ACCEPT_EMOJI:
-                    # Challenge accepted - create a new Context to call the accept command
-                    ctx = await bot.get_context(message)
-                    ctx.author = user
-                    await bot.get_command("matching_accept").invoke(ctx)
-                    return
-                    
-                elif emoji == DECLINE_EMOJI:
-                    # Challenge declined - create a new Context to call the decline command
-                    ctx = await bot.get_context(message)
-                    ctx.author = user
-                    await bot.get_command("matching_decline").invoke(ctx)
-                    return
         
-        # Check for Tic Tac Toe challenge acceptance/rejection
-        for key, (challenger, ch, msg_id) in list(pending_ttt_challenges.items()):
-            target_id, ch_id = key
+        # Check for challenge acceptance/rejection
+        for challenges, accept_func, decline_func in CHALLENGE_HANDLERS:
+            if pending_dict is not challenges:
+                continue
             
-            if msg_id == payload.message_id and payload.user_id == target_id:
-                # This is a reaction to a Tic Tac Toe challenge message
-                
-                if emoji == ACCEPT_EMOJI:
-                    # Challenge accepted - create a new Context to call the accept command
-                    ctx = await bot.get_context(message)
-                    ctx.author = user
-                    await bot.get_command("ttt_accept").invoke(ctx)
-                    return
-                    
-                elif emoji == DECLINE_EMOJI:
-                    # Challenge declined - create a new Context to call the decline command
-                    ctx = await bot.get_context(message)
-                    ctx.author = user
-                    await bot.get_command("ttt_decline").invoke(ctx)
-                    return
+            # Call the same logic the accept/decline commands use
+            handler = accept_func if emoji == ACCEPT_EMOJI else decline_func
+            await handler(channel, user)
+            return
         
-        # Check for Rock Paper Scissors challenge acceptance/rejection
-        for key, (challenger, ch, msg_id, game_type) in list(pending_rps_challenges.items()):
-            target_id, ch_id = key
+        # Check for end game confirmations
+        for confirmations, game_id, end_game_func in CONFIRMATION_HANDLERS:
+            if pending_dict is not confirmations:
+                continue
+            
+            # Only indexed bot messages get here, so a partial message is enough to edit or delete it
+            message = channel.get_partial_message(payload.message_id)
             
-            if msg_id == payload.message_id and payload.user_id == target_id:
-                # This is a reaction to a Rock Paper Scissors challenge message
+            if emoji == ACCEPT_EMOJI:
+                # End game confirmed
+                # Check if the game still exists
+                game = active_games.get(game_id, {}).get(value.channel_id)
+                if game is not None:
+                    # End the game
+                    await end_game_func(
+                        channel,
+                        game,
+                        value.requester,
+                        "Game ended by mutual agreement."
+                    )
                 
-                if emoji == ACCEPT_EMOJI:
-                    # Challenge accepted - create a new Context to call the accept command
-                    ctx = await bot.get_context(message)
-                    ctx.author = user
-                    await bot.get_command("rps_accept").invoke(ctx)
-                    return
-                    
-                elif emoji == DECLINE_EMOJI:
-                    # Challenge declined - create a new Context to call the decline command
-                    ctx = await bot.get_context(message)
-                    ctx.author = user
-                    await bot.get_command("rps_decline").invoke(ctx)
-                    return
-        
-        # Check for Memory Match end game confirmations
-        for confirmation_id, info in list(end_game_confirmations.items()):
-            if info["message_id"] == payload.message_id and payload.user_id == info["opponent_id"]:
-                # This is a reaction to an end game confirmation message
+                # Delete the confirmation message
+                try:
+                    await message.delete()
+                except discord.HTTPException:
+                    pass
                 
-                if emoji == ACCEPT_EMOJI:
-                    # End game confirmed
-                    channel_id = info["channel_id"]
-                    
-                    # Check if the game still exists
-                    if "1001" in active_games and channel_id in active_games["1001"]:
-                        game = active_games["1001"][channel_id]
-                        
-                        # End the game
-                        await end_game_internal(
-                            channel,
-                            game,
-                            info["requester"],
-                            "Game ended by mutual agreement."
-                        )
-                    
-                    # Delete the confirmation message
-                    try:
-                        await message.delete()
-                    except:
-                        pass
-                    
-                    # Remove the confirmation
-                    del end_game_confirmations[confirmation_id]
-                    return
-                    
-                elif emoji == DECLINE_EMOJI:
-                    # End game rejected
-                    # Update the embed
-                    embed = discord.Embed(
-                        title="End Game Rejected",
-                        description=f"{info['opponent'].mention} wants to continue playing.",
-                        color=discord.Color.red()
-                    )
-                    
-                    # Edit the message
-                    try:
-                        await message.edit(embed=embed)
-                        await message.clear_reactions()
-                    except:
-                        pass
-                    
-                    # Remove the confirmation
-                    del end_game_confirmations[confirmation_id]
-                    return
-        
-        # Check for Tic Tac Toe end game confirmations
-        for confirmation_id, info in list(end_ttt_confirmations.items()):
-            if info["message_id"] == payload.message_id and payload.user_id == info["opponent_id"]:
-                # This is a reaction to an end game confirmation message
+            else:
+                # End game rejected
+                # Update the embed
+                embed = discord.Embed(
+                    title="End Game Rejected",
+                    description=f"{value.opponent.mention} wants to continue playing.",
+                    color=COLOR_RED
+                )
                 
-                if emoji == ACCEPT_EMOJI:
-                    # End game confirmed
-                    channel_id = info["channel_id"]
-                    
-                    # Check if the game still exists
-                    if "1002" in active_games and channel_id in active_games["1002"]:
-                        game = active_games["1002"][channel_id]
-                        
-                        # End the game
-                        await end_ttt_game_internal(
-                            channel,
-                            game,
-                            info["requester"],
-                            "Game ended by mutual agreement."
-                        )
-                    
-                    # Delete the confirmation message
-                    try:
-                        await message.delete()
-                    except:
-                        pass
-                    
-                    # Remove the confirmation
-                    del end_ttt_confirmations[confirmation_id]
-                    return
-                    
-                elif emoji == DECLINE_EMOJI:
-                    # End game rejected
-                    # Update the embed
-                    embed = discord.Embed(
-                        title="End Game Rejected",
-                        description=f"{info['opponent'].mention} wants to continue playing.",
-                        color=discord.Color.red()
-                    )
-                    
-                    # Edit the message
-                    try:
-                        await message.edit(embed=embed)
-                        await message.clear_reactions()
-                    except:
-                        pass
-                    
-                    # Remove the confirmation
-                    del end_ttt_confirmations[confirmation_id]
-                    return
+                # Edit the message
+                try:
+                    await edit_and_clear_reactions(message, embed=embed)
+                except discord.HTTPException:
+                    pass
+            
+            # Remove the confirmation
+            confirmations.pop(key, None)
+            pending_messages.pop(payload.message_id, None)
+            return
                 
-    except Exception as e:
-        logger.error(f"Error handling reaction: {e}\n{traceback.format_exc()}")
+    except discord.HTTPException as e:
+        logger.error("Error handling reaction: %s", e, exc_info=True)
 
 @bot.command(name="sync", description="Sync slash commands with Discord")
 @commands.is_owner()
@@ -471,30 +336,32 @@ async def sync(ctx):
         await ctx.message.delete(delay=1.0)
         logger.info("Slash commands synced successfully")
     except Exception as e:
-        logger.error(f"Error syncing slash commands: {e}")
+        logger.error("Error syncing slash commands: %s", e)
         await ctx.send(f"Error syncing slash commands: {e}", delete_after=1.0)
 
 async def setup_all_games():
     """Set up all game modules."""
-    # Register the common commands
-    leaderboard_commands = await setup_leaderboard_commands(bot)
-    help_commands = await setup_help_command(bot)
-    
-    # Set up matching game commands (ID: 1001)
-    await setup_challenge_command(bot)
+    # Register the common and per-game commands concurrently, they don't depend on each other
+    leaderboard_commands, help_commands, *_ = await asyncio.gather(
+        setup_leaderboard_commands(bot),
+        setup_help_command(bot),
+        setup_challenge_command(bot),   # Memory Match (ID: 1001)
+        setup_tictactoe_command(bot),   # Tic Tac Toe (ID: 1002)
+        setup_rps_command(bot)          # Rock Paper Scissors (ID: 1003)
+    )
     
-    # Set up tic tac toe commands (ID: 1002)
-    await setup_tictactoe_command(bot)
-    
-    # Set up Rock Paper Scissors commands (ID: 1003)
-    await setup_rps_command(bot)
-    
-    logger.info(f"Registered commands: {', '.join(list(leaderboard_commands.keys()) + list(help_commands.keys()))}")
+    logger.info("Registered commands: %s", ', '.join(list(leaderboard_commands.keys()) + list(help_commands.keys())))
 
 # Run the bot
 async def main():
     """Main entry point."""
+    stats_flusher = None
     try:
+        # Run new tasks eagerly up to their first await (Python 3.12+)
+        eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+        if eager_task_factory is not None:
+            asyncio.get_running_loop().set_task_factory(eager_task_factory)
+        
         # Initialize active_games dictionary
         for game_id in GAME_IDS:
             active_games[game_id] = {}
@@ -502,19 +369,39 @@ async def main():
         # Setup all games
         await setup_all_games()
         
+        # Write buffered game results in batches
+        stats_flusher = asyncio.create_task(database["run_stats_flusher"]())
+        
         # Start the bot
         await bot.start(TOKEN)
     except KeyboardInterrupt:
         logger.info("Bot shutdown initiated via keyboard interrupt")
         await bot.close()
     finally:
+        # Write out any results still waiting in the buffer
+        if stats_flusher is not None:
+            stats_flusher.cancel()
+        database["flush_player_stats"]()
+        
         logger.info("Bot has been shutdown")
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        # Use uvloop's faster event loop when it is installed (not available on Windows)
+        try:
+            import uvloop
+        except ImportError:
+            uvloop = None
+        
+        if uvloop is None:
+            asyncio.run(main())
+        elif sys.version_info >= (3, 12):
+            asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+        else:
+            uvloop.install()
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("Bot shutdown initiated by user (KeyboardInterrupt)")
     except Exception as e:
-        logger.error(f"Unhandled exception: {e}")
+        logger.error("Unhandled exception: %s", e)
         print(f"Unhandled error: {e}") 
\ No newline at end of file
@@ -4,6 +4,7 @@ Help command for the game bot.
 import discord
 from discord import app_commands
 from discord.ext import commands
+import functools
 import logging
 
 # Import game IDs from leaderboard
@@ -12,6 +13,9 @@ from common.commands.leaderboard import GAME_IDS
 logger = logging.getLogger("discord_bot")
 
 class HelpView(discord.ui.View):
+    # discord.ui.View keeps its own __dict__, these just give our attributes fixed slots
+    __slots__ = ("ctx", "command_prefix", "message")
+    
     def __init__(self, ctx, command_prefix):
         super().__init__(timeout=60)
         self.ctx = ctx
@@ -31,13 +35,7 @@ class HelpView(discord.ui.View):
         selection = select.values[0]
         
         # Create embed based on selection
-        if selection == "overview":
-            embed = create_overview_embed(self.command_prefix)
-        elif selection == "general":
-            embed = create_general_commands_embed(self.command_prefix)
-        else:
-            # Game-specific help
-            embed = create_game_help_embed(selection, self.command_prefix)
+        embed = create_help_embed(selection, self.command_prefix)
         
         # Update the message
         await interaction.response.edit_message(embed=embed, view=self)
@@ -49,11 +47,76 @@ class HelpView(discord.ui.View):
         
         try:
             # Try to update the message with disabled buttons
-            message = await self.ctx.fetch_message(self.message.id)
-            await message.edit(view=self)
-        except:
+            await self.message.edit(view=self)
+        except discord.HTTPException:
             pass
 
+class LazyHelpView(discord.ui.View):
+    """Placeholder view with a single button that swaps in the full HelpView when clicked."""
+    __slots__ = ("ctx", "command_prefix", "message")
+    
+    def __init__(self, ctx, command_prefix):
+        super().__init__(timeout=60)
+        self.ctx = ctx
+        self.command_prefix = command_prefix
+    
+    @discord.ui.button(label="Menu", style=discord.ButtonStyle.primary)
+    async def menu_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Build the dropdown view only once someone actually wants it."""
+        view = HelpView(self.ctx, self.command_prefix)
+        view.message = self.message
+        
+        # This placeholder is done, stop it so its timeout doesn't touch the message
+        self.stop()
+        
+        await interaction.response.edit_message(view=view)
+    
+    async def on_timeout(self):
+        """Disable the button when it times out."""
+        for item in self.children:
+            item.disabled = True
+        
+        try:
+            # Try to update the message with the disabled button
+            await self.message.edit(view=self)
+        except discord.HTTPException:
+            pass
+
+@functools.lru_cache(maxsize=16)
+def _help_payload(selection, command_prefix):
+    """Build the help embed for a selection once and keep its parts as immutable tuples."""
+    if selection == "overview":
+        embed = create_overview_embed(command_prefix)
+    elif selection == "general":
+        embed = create_general_commands_embed(command_prefix)
+    else:
+        # Game-specific help
+        embed = create_game_help_embed(selection, command_prefix)
+    
+    fields = tuple((field.name, field.value, field.inline) for field in embed.fields)
+    return embed.title, embed.description, embed.color, fields, embed.footer.text
+
+def create_help_embed(selection, command_prefix):
+    """
+    Get the help embed for a dropdown selection.
+    
+    Args:
+        selection: "overview", "general" or a game ID
+        command_prefix: The bot's command prefix
+        
+    Returns:
+        discord.Embed: A new embed built from the cached payload
+    """
+    title, description, color, fields, footer_text = _help_payload(selection, command_prefix)
+    
+    embed = discord.Embed(title=title, description=description, color=color)
+    for name, value, inline in fields:
+        embed.add_field(name=name, value=value, inline=inline)
+    if footer_text:
+        embed.set_footer(text=footer_text)
+    
+    return embed
+
 def create_overview_embed(command_prefix):
     """Create an overview embed for the bot."""
     embed = discord.Embed(
@@ -225,11 +288,11 @@ async def setup_help_command(bot):
     async def help_cmd(ctx):
         """Show help information about the available games."""
         try:
-            # Create the view with dropdown
-            view = HelpView(ctx, bot.command_prefix)
+            # Start with just a menu button, the dropdown view is built when it's clicked
+            view = LazyHelpView(ctx, bot.command_prefix)
             
             # Create initial overview embed
-            embed = create_overview_embed(bot.command_prefix)
+            embed = create_help_embed("overview", bot.command_prefix)
             
             # Send the help message with view
             msg = await ctx.send(embed=embed, view=view)
@@ -238,7 +301,7 @@ async def setup_help_command(bot):
             view.message = msg
                 
         except Exception as e:
-            logger.error(f"Error showing help: {e}")
+            logger.error("Error showing help: %s", e)
             await ctx.send("Error showing help. Please try again.")
     
     return {"help": help_cmd} 
\ No newline at end of file
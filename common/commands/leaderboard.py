@@ -6,11 +6,30 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 import asyncio
+import copy
+from cachetools import TTLCache
 
 from common.database import database
 
 logger = logging.getLogger("discord_bot")
 
+# Embed colours, created once and shared by every embed
+COLOR_BLUE = discord.Color.blue()
+COLOR_RED = discord.Color.red()
+
+def _install_stub_defaults():
+    """Fill in empty results for any database functions that aren't available, without replacing real ones."""
+    database.setdefault("get_global_game_leaderboard", lambda game_id, limit, offset=0: [])
+    database.setdefault("get_server_game_leaderboard", lambda server_id, game_id, limit, offset=0: [])
+    database.setdefault("get_global_game_leaderboard_count", lambda game_id: 0)
+    database.setdefault("get_server_game_leaderboard_count", lambda server_id, game_id: 0)
+    database.setdefault("get_global_leaderboard_count", lambda: 0)
+    database.setdefault("get_server_leaderboard_count", lambda server_id: 0)
+    database.setdefault("get_player_game_stats", lambda player_id, game_id=None: [])
+    database.setdefault("search_player", lambda search_term, scope, server_id=None, game_id=None: [])
+
+_install_stub_defaults()
+
 # Game IDs and names
 GAME_IDS = {
     "1001": "Memory Match",
@@ -18,16 +37,98 @@ GAME_IDS = {
     "1003": "Rock Paper Scissors"
 }
 
+# Game select options template, each view works on its own copies of these
+GAME_SELECT_OPTIONS = [
+    discord.SelectOption(label="All Games", value="all", default=True),
+    *[discord.SelectOption(label=name, value=game_id) for game_id, name in GAME_IDS.items()]
+]
+
+# Short-lived cache for leaderboard queries, keyed by (function name, *args)
+# Pagination re-reads the same data, and stats only change at human timescales
+LEADERBOARD_CACHE = TTLCache(maxsize=512, ttl=20)
+
+# Recent player search results, keyed by (lowercase search term, scope, server ID, game ID)
+# Prefixing a search with SEARCH_REFRESH_PREFIX skips the cache
+SEARCH_CACHE = TTLCache(maxsize=256, ttl=60)
+SEARCH_REFRESH_PREFIX = "!"
+
+def cached_query(cache, name, *args):
+    """
+    Call database[name](*args), reusing a cached result while it is fresh.
+    
+    Args:
+        cache: The TTLCache to store the result in
+        name: Name of the database function
+        *args: Arguments for the database function
+    
+    Returns:
+        The (possibly cached) result of the database function
+    """
+    key = (name, *args)
+    try:
+        return cache[key]
+    except KeyError:
+        result = cache[key] = database[name](*args)
+        return result
+
+def _server_id(view):
+    """Get the server ID for a server leaderboard view."""
+    return view.guild_id if view else 0
+
+# Leaderboard query for each (scope, filtered by game) combination:
+# (database function name, function returning the arguments that come before limit/offset)
+LEADERBOARD_QUERIES = {
+    ("global", True): ("get_global_game_leaderboard_with_count", lambda view, game_id: (game_id,)),
+    ("global", False): ("get_global_leaderboard_with_count", lambda view, game_id: ()),
+    ("server", True): ("get_server_game_leaderboard_with_count", lambda view, game_id: (_server_id(view), game_id)),
+    ("server", False): ("get_server_leaderboard_with_count", lambda view, game_id: (_server_id(view),))
+}
+
+# Row layouts for the monospace tables in the leaderboard, search and stats embeds
+# Player and game columns use a precision, so long names are truncated by the format itself
+LEADERBOARD_ALL_ROW = "{:<5}{:<20.19}{:<15.14}{:<6}{:<8}{:<8}"
+LEADERBOARD_GAME_ROW = "{:<5}{:<20.19}{:<6}{:<8}{:<8}"
+SEARCH_ROW = "{:<20.19}{:<15.14}{:<6}{:<8}{:<8}"
+STATS_ROW = "{:<15.14}{:<6}{:<8}{:<8}{:<8}"
+
+# Header and separator lines for those tables, formatted once
+LEADERBOARD_ALL_HEADER = (LEADERBOARD_ALL_ROW.format("Rank", "Player", "Game", "Wins", "Losses", "Win Rate"), "-" * 65)
+LEADERBOARD_GAME_HEADER = (LEADERBOARD_GAME_ROW.format("Rank", "Player", "Wins", "Losses", "Win Rate"), "-" * 50)
+SEARCH_HEADER = (SEARCH_ROW.format("Player", "Game", "Wins", "Losses", "Win Rate"), "-" * 55)
+STATS_SEPARATOR = "-" * 45
+STATS_HEADER = (STATS_ROW.format("Game", "Wins", "Losses", "Win Rate", "Played"), STATS_SEPARATOR)
+
+# Slash command choices for the game parameter
+GAME_CHOICES = [
+    app_commands.Choice(name="All Games", value="all"),
+    *[app_commands.Choice(name=name, value=game_id) for game_id, name in GAME_IDS.items()]
+]
+
 # Button for pagination
 class LeaderboardPagination(discord.ui.View):
+    # discord.ui.View keeps its own __dict__, these just give our attributes fixed slots
+    __slots__ = (
+        "ctx", "guild_id", "guild_name", "scope", "game_id", "page", "page_size",
+        "max_pages", "page_keys", "_count_known", "_game_options", "_base_embed", "message"
+    )
+    
     def __init__(self, ctx, scope, game_id=None, page=0, page_size=10):
         super().__init__(timeout=60)
         self.ctx = ctx
+        self.guild_id = ctx.guild.id if ctx.guild else 0
+        self.guild_name = ctx.guild.name if ctx.guild else "Server"
         self.scope = scope
         self.game_id = game_id
         self.page = page
         self.page_size = page_size
         self.max_pages = 1  # Will be updated later
+        self.page_keys = {}  # Page number -> key to continue the ranking from, filled as pages are shown
+        self._count_known = False  # Whether max_pages is already set for the current game
+        self._base_embed = None  # Last full embed, reused when only the page changes
+        
+        # Own copies of the select options, so defaults can be toggled in place
+        self._game_options = [copy.copy(option) for option in GAME_SELECT_OPTIONS]
+        self.game_select.options = self._game_options
         
         # Update buttons state
         self._update_buttons()
@@ -39,47 +140,35 @@ class LeaderboardPagination(discord.ui.View):
         # Disable next button if on last page or not enough data
         self.next_button.disabled = (self.page >= self.max_pages - 1)
         
-        # Update the game select menu
-        if hasattr(self, 'game_select'):
-            self.game_select.options = [
-                discord.SelectOption(
-                    label=f"{name}",
-                    value=game_id,
-                    default=(self.game_id == game_id if self.game_id else game_id == "all")
-                ) for game_id, name in GAME_IDS.items()
-            ]
-            # Add "All Games" option
-            self.game_select.options.insert(0, discord.SelectOption(
-                label="All Games",
-                value="all",
-                default=(not self.game_id)
-            ))
+        # Mark the selected game in the select menu
+        desired = self.game_id or "all"
+        for option in self._game_options:
+            option.default = (option.value == desired)
             
     @discord.ui.button(label="◀️ Previous", style=discord.ButtonStyle.primary)
     async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.page > 0:
             self.page -= 1
-            await self.update_leaderboard(interaction)
+            await self.update_leaderboard(interaction, page_only=True)
     
     @discord.ui.button(label="▶️ Next", style=discord.ButtonStyle.primary)
     async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.page < self.max_pages - 1:
             self.page += 1
-            await self.update_leaderboard(interaction)
+            await self.update_leaderboard(interaction, page_only=True)
     
     @discord.ui.select(
         placeholder="Select a game",
-        options=[
-            discord.SelectOption(label="All Games", value="all", default=True),
-            *[discord.SelectOption(label=name, value=game_id) for game_id, name in GAME_IDS.items()]
-        ]
+        options=GAME_SELECT_OPTIONS
     )
     async def game_select(self, interaction: discord.Interaction, select: discord.ui.Select):
         # Update game_id (or set to None for "all")
         self.game_id = select.values[0] if select.values[0] != "all" else None
         
-        # Reset to first page
+        # Reset to first page, the new game has its own page count
         self.page = 0
+        self.page_keys = {}
+        self._count_known = False
         
         # Update the leaderboard
         await self.update_leaderboard(interaction)
@@ -89,27 +178,55 @@ class LeaderboardPagination(discord.ui.View):
         # Create a modal for searching
         await interaction.response.send_modal(PlayerSearchModal(self))
     
-    async def update_leaderboard(self, interaction):
-        """Update the leaderboard embed and view."""
+    def _render_page(self):
+        """Refresh the table and page footer of the last full embed for the current page."""
+        offset = self.page * self.page_size
+        query_name, query_args = LEADERBOARD_QUERIES[(self.scope, bool(self.game_id))]
+        data, _, next_key = cached_query(
+            LEADERBOARD_CACHE, query_name, *query_args(self, self.game_id), self.page_size, offset, self.page_keys.get(self.page)
+        )
+        if next_key is not None:
+            self.page_keys[self.page + 1] = next_key
+        
+        self._base_embed.description = _render_description(data, offset, self.game_id)
+        self._base_embed.set_footer(text=f"Page {self.page+1}/{self.max_pages}")
+        return self._base_embed
+    
+    async def update_leaderboard(self, interaction, page_only=False):
+        """
+        Update the leaderboard embed and view.
+        
+        Args:
+            interaction: The interaction to respond to
+            page_only: Whether only the page changed, so the title can be kept
+        """
         try:
-            embed = create_leaderboard_embed(
-                self.scope, 
-                self.game_id, 
-                self.page, 
-                self.page_size,
-                get_max_pages=True,
-                view=self
-            )
+            # Acknowledge right away so a slow query can't miss the interaction deadline
+            await interaction.response.defer()
+            
+            if page_only and self._base_embed is not None:
+                embed = self._render_page()
+            else:
+                embed = self._base_embed = create_leaderboard_embed(
+                    self.scope, 
+                    self.game_id, 
+                    self.page, 
+                    self.page_size,
+                    get_max_pages=not self._count_known,
+                    view=self
+                )
+                self._count_known = True
             
             # Update button states
             self._update_buttons()
             
-            # Respond to the interaction
-            await interaction.response.edit_message(embed=embed, view=self)
+            # Update the deferred message
+            await interaction.edit_original_response(embed=embed, view=self)
             
         except Exception as e:
-            logger.error(f"Error updating leaderboard: {e}")
-            await interaction.response.send_message(
+            logger.error("Error updating leaderboard: %s", e)
+            send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+            await send(
                 "Error updating leaderboard. Please try again.",
                 ephemeral=True
             )
@@ -121,9 +238,49 @@ class LeaderboardPagination(discord.ui.View):
         
         try:
             # Try to update the message with disabled buttons
-            message = await self.ctx.fetch_message(self.message.id)
-            await message.edit(view=self)
-        except:
+            await self.message.edit(view=self)
+        except discord.HTTPException:
+            pass
+
+class LazyLeaderboardView(discord.ui.View):
+    """Placeholder view with a single button that swaps in the full LeaderboardPagination when clicked."""
+    __slots__ = ("ctx", "guild_id", "guild_name", "scope", "game_id", "page_size", "max_pages", "page_keys", "message")
+    
+    def __init__(self, ctx, scope, game_id=None, page_size=10):
+        super().__init__(timeout=60)
+        self.ctx = ctx
+        self.guild_id = ctx.guild.id if ctx.guild else 0
+        self.guild_name = ctx.guild.name if ctx.guild else "Server"
+        self.scope = scope
+        self.game_id = game_id
+        self.page_size = page_size
+        self.max_pages = 1  # Updated by create_leaderboard_embed
+        self.page_keys = {}  # Updated by create_leaderboard_embed
+    
+    @discord.ui.button(label="Menu", style=discord.ButtonStyle.primary)
+    async def menu_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Build the pagination and search view only once someone actually wants it."""
+        view = LeaderboardPagination(self.ctx, self.scope, self.game_id, page_size=self.page_size)
+        view.max_pages = self.max_pages
+        view.page_keys = self.page_keys
+        view._count_known = True
+        view._update_buttons()
+        view.message = self.message
+        
+        # This placeholder is done, stop it so its timeout doesn't touch the message
+        self.stop()
+        
+        await interaction.response.edit_message(view=view)
+    
+    async def on_timeout(self):
+        """Disable the button when it times out."""
+        for item in self.children:
+            item.disabled = True
+        
+        try:
+            # Try to update the message with the disabled button
+            await self.message.edit(view=self)
+        except discord.HTTPException:
             pass
 
 # Modal for player search
@@ -136,36 +293,50 @@ class PlayerSearchModal(discord.ui.Modal, title="Search Player"):
         max_length=100
     )
     
+    __slots__ = ("parent_view",)
+    
     def __init__(self, view):
         super().__init__()
         self.parent_view = view
     
     async def on_submit(self, interaction: discord.Interaction):
         try:
+            # Acknowledge right away so a slow query can't miss the interaction deadline
+            await interaction.response.defer()
+            
             # Search for the player
             search_term = self.player_name.value
+            refresh = search_term.startswith(SEARCH_REFRESH_PREFIX)
+            if refresh:
+                search_term = search_term[len(SEARCH_REFRESH_PREFIX):]
             
-            # Get player data
-            player_data = database["search_player"](
-                search_term, 
-                self.parent_view.scope, 
-                interaction.guild.id if self.parent_view.scope == "server" else None,
-                self.parent_view.game_id
-            )
+            server_id = interaction.guild.id if self.parent_view.scope == "server" else None
+            key = (search_term.lower(), self.parent_view.scope, server_id, self.parent_view.game_id)
+            
+            # Get player data, reusing a recent identical search unless a refresh was asked for
+            player_data = None if refresh else SEARCH_CACHE.get(key)
+            if player_data is None:
+                player_data = SEARCH_CACHE[key] = database["search_player"](
+                    search_term, 
+                    self.parent_view.scope, 
+                    server_id,
+                    self.parent_view.game_id
+                )
             
             if player_data:
                 # Create an embed for the player
                 embed = create_player_search_embed(player_data, search_term, self.parent_view.scope)
-                await interaction.response.edit_message(embed=embed, view=self.parent_view)
+                await interaction.edit_original_response(embed=embed, view=self.parent_view)
             else:
-                await interaction.response.send_message(
+                await interaction.followup.send(
                     f"No players found matching '{search_term}'.", 
                     ephemeral=True
                 )
                 
         except Exception as e:
-            logger.error(f"Error searching for player: {e}")
-            await interaction.response.send_message(
+            logger.error("Error searching for player: %s", e)
+            send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+            await send(
                 "Error searching for player. Please try again.",
                 ephemeral=True
             )
@@ -174,25 +345,53 @@ def create_player_search_embed(player_data, search_term, scope):
     """Create an embed displaying search results for a player."""
     embed = discord.Embed(
         title=f"Player Search Results for '{search_term}'",
-        color=discord.Color.blue()
+        color=COLOR_BLUE
     )
     
     # Format the results
-    result_text = "```\n"
-    result_text += f"{'Player':<20}{'Game':<15}{'Wins':<6}{'Losses':<8}{'Win Rate':<8}\n"
-    result_text += "-" * 55 + "\n"
-    
-    for username, game_name, wins, losses, win_rate in player_data:
-        result_text += f"{username[:19]:<20}{game_name[:14]:<15}{wins:<6}{losses:<8}{win_rate:<8}\n"
-    
-    result_text += "```"
-    embed.description = result_text
+    rows = [*SEARCH_HEADER]
+    rows.extend(
+        SEARCH_ROW.format(username, game_name, wins, losses, win_rate)
+        for username, game_name, wins, losses, win_rate in player_data
+    )
+    embed.description = "```\n" + "\n".join(rows) + "\n```"
     
     # Add scope information
     embed.set_footer(text=f"Scope: {scope.capitalize()}")
     
     return embed
 
+def _render_description(data, offset, game_id):
+    """
+    Build the leaderboard table for one page.
+    
+    Args:
+        data: Leaderboard rows for the page
+        offset: Rank offset of the first row
+        game_id: Game ID the rows are filtered by, or None for all games
+    
+    Returns:
+        str: The code block table, or a placeholder if there is no data
+    """
+    if not data:
+        return "No games played yet."
+    
+    # Adjust headers based on whether we're showing game name
+    if not game_id:  # All games
+        rows = [*LEADERBOARD_ALL_HEADER]
+        rows.extend(
+            LEADERBOARD_ALL_ROW.format(i, username, game_name, wins, losses, win_rate)
+            for i, (username, game_name, wins, losses, win_rate) in enumerate(data, offset + 1)
+        )
+    else:  # Specific game
+        rows = [*LEADERBOARD_GAME_HEADER]
+        rows.extend(
+            LEADERBOARD_GAME_ROW.format(i, username, wins, losses, win_rate)
+            for i, (username, wins, losses, win_rate) in enumerate(data, offset + 1)
+        )
+    
+    return "```\n" + "\n".join(rows) + "\n```"
+
 def create_leaderboard_embed(scope, game_id=None, page=0, page_size=10, get_max_pages=False, view=None):
     """
     Create an embed for the leaderboard.
@@ -219,25 +418,17 @@ def create_leaderboard_embed(scope, game_id=None, page=0, page_size=10, get_max_
         if scope == "global":
             title = f"Global Leaderboard: {game_name}"
         else:
-            guild_name = view.ctx.guild.name if view else "Server"
+            guild_name = view.guild_name if view else "Server"
             title = f"Server Leaderboard: {guild_name} - {game_name}"
         
-        # Get the data from database
-        if scope == "global":
-            if game_id:
-                data = database["get_global_game_leaderboard"](game_id, page_size, offset)
-                total = database["get_global_game_leaderboard_count"](game_id) if get_max_pages else 0
-            else:
-                data = database["get_global_leaderboard"](page_size, offset)
-                total = database["get_global_leaderboard_count"]() if get_max_pages else 0
-        else:
-            server_id = view.ctx.guild.id if view else 0
-            if game_id:
-                data = database["get_server_game_leaderboard"](server_id, game_id, page_size, offset)
-                total = database["get_server_game_leaderboard_count"](server_id, game_id) if get_max_pages else 0
-            else:
-                data = database["get_server_leaderboard"](server_id, page_size, offset)
-                total = database["get_server_leaderboard_count"](server_id) if get_max_pages else 0
+        # Get the page and the total entry count from database in one query
+        query_name, query_args = LEADERBOARD_QUERIES[(scope, bool(game_id))]
+        after = view.page_keys.get(page) if view else None
+        data, total, next_key = cached_query(LEADERBOARD_CACHE, query_name, *query_args(view, game_id), page_size, offset, after)
+        
+        # Remember where the next page starts so it can be fetched without OFFSET
+        if view and next_key is not None:
+            view.page_keys[page + 1] = next_key
         
         # Update max pages if requested
         if get_max_pages and view:
@@ -246,34 +437,11 @@ def create_leaderboard_embed(scope, game_id=None, page=0, page_size=10, get_max_
         # Create the embed
         embed = discord.Embed(
             title=title,
-            color=discord.Color.blue()
+            color=COLOR_BLUE
         )
         
         # Format the leaderboard
-        if data:
-            # Add header
-            leaderboard_text = "```\n"
-            
-            # Adjust headers based on whether we're showing game name
-            if not game_id:  # All games
-                leaderboard_text += f"{'Rank':<5}{'Player':<20}{'Game':<15}{'Wins':<6}{'Losses':<8}{'Win Rate':<8}\n"
-                leaderboard_text += "-" * 65 + "\n"
-                
-                # Add rows
-                for i, (username, game_name, wins, losses, win_rate) in enumerate(data, offset + 1):
-                    leaderboard_text += f"{i:<5}{username[:19]:<20}{game_name[:14]:<15}{wins:<6}{losses:<8}{win_rate:<8}\n"
-            else:  # Specific game
-                leaderboard_text += f"{'Rank':<5}{'Player':<20}{'Wins':<6}{'Losses':<8}{'Win Rate':<8}\n"
-                leaderboard_text += "-" * 50 + "\n"
-                
-                # Add rows
-                for i, (username, wins, losses, win_rate) in enumerate(data, offset + 1):
-                    leaderboard_text += f"{i:<5}{username[:19]:<20}{wins:<6}{losses:<8}{win_rate:<8}\n"
-            
-            leaderboard_text += "```"
-            embed.description = leaderboard_text
-        else:
-            embed.description = "No games played yet."
+        embed.description = _render_description(data, offset, game_id)
         
         # Add page information
         page_info = f"Page {page+1}/{view.max_pages if view else '?'}"
@@ -282,13 +450,13 @@ def create_leaderboard_embed(scope, game_id=None, page=0, page_size=10, get_max_
         return embed
         
     except Exception as e:
-        logger.error(f"Error creating leaderboard embed: {e}")
+        logger.error("Error creating leaderboard embed: %s", e)
         
         # Return a fallback embed
         embed = discord.Embed(
             title="Error loading leaderboard",
             description="There was an error loading the leaderboard data.",
-            color=discord.Color.red()
+            color=COLOR_RED
         )
         return embed
 
@@ -305,10 +473,7 @@ async def setup_leaderboard_commands(bot):
             app_commands.Choice(name="Server", value="server"),
             app_commands.Choice(name="Global", value="global")
         ],
-        game=[
-            app_commands.Choice(name="All Games", value="all"),
-            *[app_commands.Choice(name=name, value=game_id) for game_id, name in GAME_IDS.items()]
-        ]
+        game=GAME_CHOICES
     )
     async def leaderboard(ctx, scope: str = "server", game: str = "all"):
         """Show the game leaderboard with pagination."""
@@ -322,8 +487,11 @@ async def setup_leaderboard_commands(bot):
             # Determine the game ID
             game_id = None if game == "all" else game
             
-            # Create the pagination view
-            view = LeaderboardPagination(ctx, scope, game_id)
+            # Acknowledge slash invocations before querying the database
+            await ctx.defer()
+            
+            # Start with just a menu button, the pagination view is built when it's clicked
+            view = LazyLeaderboardView(ctx, scope, game_id)
             
             # Create the leaderboard embed
             embed = create_leaderboard_embed(scope, game_id, 0, 10, True, view)
@@ -335,7 +503,7 @@ async def setup_leaderboard_commands(bot):
             view.message = msg
             
         except Exception as e:
-            logger.error(f"Error showing leaderboard: {e}")
+            logger.error("Error showing leaderboard: %s", e)
             await ctx.send("Error showing leaderboard. Please try again.")
     
     @bot.hybrid_command(name="stats", description="Show your game statistics")
@@ -344,10 +512,7 @@ async def setup_leaderboard_commands(bot):
         user="User to show stats for (default: yourself)"
     )
     @app_commands.choices(
-        game=[
-            app_commands.Choice(name="All Games", value="all"),
-            *[app_commands.Choice(name=name, value=game_id) for game_id, name in GAME_IDS.items()]
-        ]
+        game=GAME_CHOICES
     )
     async def stats(ctx, game: str = "all", user: discord.Member = None):
         """Show a player's game statistics."""
@@ -358,38 +523,38 @@ async def setup_leaderboard_commands(bot):
             # Determine the game ID
             game_id = None if game == "all" else game
             
+            # Acknowledge slash invocations before querying the database
+            await ctx.defer()
+            
             # Get the player's stats
             stats_data = database["get_player_game_stats"](target_user.id, game_id)
             
             # Create the embed
             embed = discord.Embed(
                 title=f"Game Stats: {target_user.display_name}",
-                color=discord.Color.blue()
+                color=COLOR_BLUE
             )
             
             if stats_data:
                 # Format the stats
-                stats_text = "```\n"
-                stats_text += f"{'Game':<15}{'Wins':<6}{'Losses':<8}{'Win Rate':<8}{'Played':<8}\n"
-                stats_text += "-" * 45 + "\n"
+                rows = [*STATS_HEADER]
                 
                 total_wins = 0
                 total_losses = 0
                 
                 for game_name, wins, losses, win_rate, games_played in stats_data:
-                    stats_text += f"{game_name[:14]:<15}{wins:<6}{losses:<8}{win_rate:<8}{games_played:<8}\n"
+                    rows.append(STATS_ROW.format(game_name, wins, losses, win_rate, games_played))
                     total_wins += wins
                     total_losses += losses
                 
                 # Add totals if showing multiple games
                 if len(stats_data) > 1:
-                    stats_text += "-" * 45 + "\n"
+                    rows.append(STATS_SEPARATOR)
                     total_games = total_wins + total_losses
                     win_rate = f"{total_wins / total_games * 100:.1f}%" if total_games > 0 else "0.0%"
-                    stats_text += f"{'TOTAL':<15}{total_wins:<6}{total_losses:<8}{win_rate:<8}{total_games:<8}\n"
+                    rows.append(STATS_ROW.format("TOTAL", total_wins, total_losses, win_rate, total_games))
                 
-                stats_text += "```"
-                embed.description = stats_text
+                embed.description = "```\n" + "\n".join(rows) + "\n```"
             else:
                 embed.description = "No games played yet."
             
@@ -400,17 +565,7 @@ async def setup_leaderboard_commands(bot):
             await ctx.send(embed=embed)
             
         except Exception as e:
-            logger.error(f"Error showing stats: {e}")
+            logger.error("Error showing stats: %s", e)
             await ctx.send("Error showing stats. Please try again.")
     
-    # Update the database module to include these new functions
-    database["get_global_game_leaderboard"] = lambda game_id, limit, offset=0: []
-    database["get_server_game_leaderboard"] = lambda server_id, game_id, limit, offset=0: []
-    database["get_global_game_leaderboard_count"] = lambda game_id: 0
-    database["get_server_game_leaderboard_count"] = lambda server_id, game_id: 0
-    database["get_global_leaderboard_count"] = lambda: 0
-    database["get_server_leaderboard_count"] = lambda server_id: 0
-    database["get_player_game_stats"] = lambda player_id, game_id=None: []
-    database["search_player"] = lambda search_term, scope, server_id=None, game_id=None: []
-    
     return {"leaderboard": leaderboard, "stats": stats} 
\ No newline at end of file
@@ -1,6 +1,8 @@
 """
 Configuration settings for the Discord Emoji Memory Match Game.
 """
+import itertools
+import types
 
 # --- Bot Configuration ---
 COMMAND_PREFIX = '!'
@@ -9,7 +11,7 @@ COMMAND_PREFIX = '!'
 EMOJI_BACK = "❓"  # The emoji shown for hidden/unmatched emojis
 
 # Define emoji categories with their corresponding emojis
-EMOJI_CATEGORIES = {
+_EMOJI_CATEGORY_LISTS = {
     "food": ["🍎", "🍕", "🍔", "🌮", "🍦", "🍰", "🍫", "🥑", "🍓", "🍇", "🍪", "🥕", "🥨", "🥩", "🍜"],
     "animals": ["🐶", "🐱", "🐭", "🐰", "🦊", "🐻", "🐼", "🐨", "🐯", "🦁", "🐮", "🐷", "🐸", "🐔", "🦄"],
     "faces": ["😀", "😂", "🥰", "😎", "🤔", "😴", "🥳", "😇", "🤠", "🤡", "😺", "🤖", "👻", "👽", "🎃"],
@@ -26,6 +28,19 @@ EMOJI_CATEGORIES = {
     "weather": ["☀️", "🌤️", "⛅", "🌥️", "☁️", "🌦️", "🌧️", "⛈️", "🌩️", "🌨️", "❄️", "💨", "🌪️", "🌫️", "☔"]
 }
 
+# Flattened (structure-of-arrays) layout of the categories above:
+# category names, every category's emojis back to back, and where each category starts in that pool
+EMOJI_CATEGORY_NAMES = tuple(_EMOJI_CATEGORY_LISTS)
+EMOJI_POOL = tuple(itertools.chain.from_iterable(_EMOJI_CATEGORY_LISTS.values()))
+EMOJI_CATEGORY_OFFSETS = (0, *itertools.accumulate(len(emojis) for emojis in _EMOJI_CATEGORY_LISTS.values()))
+
+# Read-only category name -> emoji tuple view for existing callers
+# Each tuple is a slice of EMOJI_POOL and references the same emoji strings
+EMOJI_CATEGORIES = types.MappingProxyType({
+    name: EMOJI_POOL[EMOJI_CATEGORY_OFFSETS[i]:EMOJI_CATEGORY_OFFSETS[i + 1]]
+    for i, name in enumerate(EMOJI_CATEGORY_NAMES)
+})
+
 # Board dimensions
 ROWS = 5
 COLUMNS = 5
@@ -3,14 +3,233 @@ Database module for the Discord Game Bot.
 Manages leaderboard data using SQLite.
 """
 import sqlite3
+import asyncio
 import os
 import logging
+import queue
+import threading
+from types import MappingProxyType
 
 logger = logging.getLogger("discord_bot")
 
 # Database file
 DB_FILE = "game_stats.db"
 
+# Game ID to name mapping, copied into the games table on startup
+GAME_NAMES = MappingProxyType({
+    "1001": "Memory Match",
+    "1002": "Tic Tac Toe"
+})
+
+def _win_rate(wins, losses):
+    """Format a player's win rate as a percentage string."""
+    total_games = wins + losses
+    return "%.1f%%" % (wins / total_games * 100) if total_games else "0.0%"
+
+# Number of idle read-only connections kept around for leaderboard queries
+READ_POOL_SIZE = 4
+
+# Prepared statements each connection keeps, enough for every distinct query in this module
+STATEMENT_CACHE_SIZE = 128
+
+# Shared read-write connection, opened on first use and kept for the life of the bot
+_conn = None
+_conn_lock = threading.Lock()  # Guards opening the connection
+_write_lock = threading.Lock()  # Keeps single updates out of a batch flush's transaction
+
+# How often buffered stat updates are written, and how many players trigger an early write
+WRITE_FLUSH_INTERVAL = 1.0
+WRITE_BUFFER_LIMIT = 100
+
+# Leaderboard entry counts - {("server", server_id[, game_id]) or ("global"[, game_id]): count}
+# Cleared whenever stats are written, since a write may add a new entry
+_count_cache = {}
+_count_generation = 0  # Bumped on every clear, so a count read before a write isn't stored after it
+_count_lock = threading.Lock()  # Keeps a clear from landing between a reader's check and its store
+
+def _invalidate_counts():
+    """Drop all cached leaderboard counts after a write."""
+    global _count_generation
+    with _count_lock:
+        _count_generation += 1
+        _count_cache.clear()
+
+def _store_count(key, generation, count):
+    """Cache a count, unless stats were written since the reader took its generation."""
+    with _count_lock:
+        if generation == _count_generation:
+            _count_cache[key] = count
+
+# Buffered stat updates - {(user_id, server_id, game_id): [username, wins, losses]}
+_write_buffer = {}
+_buffer_lock = threading.Lock()
+_flush_wakeup = asyncio.Event()  # Set when the buffer is full, so run_stats_flusher writes it early
+
+def _get_conn():
+    """
+    Get the shared database connection, opening it on first use.
+    
+    Returns:
+        sqlite3.Connection: An autocommit connection usable from any thread
+    """
+    global _conn
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                conn = sqlite3.connect(
+                    DB_FILE, check_same_thread=False, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+                )
+                
+                # WAL lets reads run alongside writes, the rest trades durability on power loss for speed
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA temp_store=MEMORY")
+                conn.execute("PRAGMA cache_size=-64000")
+                
+                _conn = conn
+    return _conn
+
+# Idle read-only connections, each with its own page cache
+_read_pool = queue.Queue(maxsize=READ_POOL_SIZE)
+
+def _acquire_read_conn():
+    """
+    Take a read-only connection from the pool, opening a new one if none are idle.
+    
+    Returns:
+        sqlite3.Connection: A read-only connection, hand it back with _release_read_conn
+    """
+    try:
+        return _read_pool.get_nowait()
+    except queue.Empty:
+        # Make sure the database and its WAL mode are set up before opening it read-only
+        _get_conn()
+        
+        conn = sqlite3.connect(
+            f"file:{DB_FILE}?mode=ro", uri=True, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        return conn
+
+def _release_read_conn(conn):
+    """
+    Return a read-only connection to the pool, closing it if the pool is already full.
+    
+    A connection that isn't released (because its query raised) is simply closed
+    when it is garbage collected, and the pool opens a replacement when needed.
+    """
+    try:
+        _read_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+# SQL for the most frequent queries, kept as constants so each connection's
+# statement cache always sees the exact same text and reuses the prepared statement
+UPSERT_PLAYER_STATS_SQL = """
+INSERT INTO leaderboard (user_id, server_id, game_id, wins, losses) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (user_id, server_id, game_id) DO UPDATE SET
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses
+"""
+
+UPSERT_PLAYER_NAME_SQL = "INSERT INTO player_names (user_id, server_id, username) VALUES (?, ?, ?) ON CONFLICT (user_id, server_id) DO UPDATE SET username = excluded.username"
+
+SERVER_LEADERBOARD_COUNT_SQL = "SELECT COUNT(*) FROM leaderboard WHERE server_id = ?"
+
+SERVER_GAME_LEADERBOARD_COUNT_SQL = "SELECT COUNT(*) FROM leaderboard WHERE server_id = ? AND game_id = ?"
+
+GLOBAL_LEADERBOARD_COUNT_SQL = "SELECT COUNT(*) FROM (SELECT DISTINCT user_id, game_id FROM leaderboard)"
+
+GLOBAL_GAME_LEADERBOARD_COUNT_SQL = "SELECT COUNT(DISTINCT user_id) FROM leaderboard WHERE game_id = ?"
+
+# Server leaderboards are ordered by (wins DESC, losses ASC, rowid ASC), so the last row of a page
+# is a unique key the next page can continue after, instead of skipping rows with OFFSET
+# The redundant wins <= ? lets the *_AFTER_SQL queries seek into the index at the key instead of
+# walking every row ranked above it
+# Win rates are formatted by SQLite as the rows are read, ready to be shown as they are
+# The page queries read rows in idx_server_wins / idx_server_game_wins order and stop at LIMIT,
+# the total comes from the cached count queries instead of a window count over every row
+SERVER_LEADERBOARD_PAGE_SQL = """
+SELECT username, COALESCE(name, 'Game ' || game_id) AS game_name, wins, losses, printf('%.1f%%', COALESCE(wins * 100.0 / NULLIF(wins + losses, 0), 0)) AS win_rate, leaderboard.rowid
+FROM leaderboard JOIN player_names USING (user_id, server_id) LEFT JOIN games USING (game_id)
+WHERE server_id = ?
+ORDER BY wins DESC, losses ASC, leaderboard.rowid ASC
+LIMIT ? OFFSET ?
+"""
+
+SERVER_LEADERBOARD_AFTER_SQL = """
+SELECT username, COALESCE(name, 'Game ' || game_id) AS game_name, wins, losses, printf('%.1f%%', COALESCE(wins * 100.0 / NULLIF(wins + losses, 0), 0)) AS win_rate, leaderboard.rowid
+FROM leaderboard JOIN player_names USING (user_id, server_id) LEFT JOIN games USING (game_id)
+WHERE server_id = ? AND wins <= ? AND (wins < ? OR (wins = ? AND (losses > ? OR (losses = ? AND leaderboard.rowid > ?))))
+ORDER BY wins DESC, losses ASC, leaderboard.rowid ASC
+LIMIT ?
+"""
+
+SERVER_GAME_LEADERBOARD_PAGE_SQL = """
+SELECT username, wins, losses, printf('%.1f%%', COALESCE(wins * 100.0 / NULLIF(wins + losses, 0), 0)) AS win_rate, leaderboard.rowid
+FROM leaderboard JOIN player_names USING (user_id, server_id)
+WHERE server_id = ? AND game_id = ?
+ORDER BY wins DESC, losses ASC, leaderboard.rowid ASC
+LIMIT ? OFFSET ?
+"""
+
+SERVER_GAME_LEADERBOARD_AFTER_SQL = """
+SELECT username, wins, losses, printf('%.1f%%', COALESCE(wins * 100.0 / NULLIF(wins + losses, 0), 0)) AS win_rate, leaderboard.rowid
+FROM leaderboard JOIN player_names USING (user_id, server_id)
+WHERE server_id = ? AND game_id = ? AND wins <= ? AND (wins < ? OR (wins = ? AND (losses > ? OR (losses = ? AND leaderboard.rowid > ?))))
+ORDER BY wins DESC, losses ASC, leaderboard.rowid ASC
+LIMIT ?
+"""
+
+GLOBAL_LEADERBOARD_WITH_COUNT_SQL = """
+SELECT username, COALESCE(name, 'Game ' || game_id) AS game_name, SUM(wins) as total_wins, SUM(losses) as total_losses, printf('%.1f%%', COALESCE(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 0)) AS win_rate, COUNT(*) OVER() AS total
+FROM leaderboard JOIN player_names USING (user_id, server_id) LEFT JOIN games USING (game_id)
+GROUP BY user_id, game_id
+ORDER BY total_wins DESC, total_losses ASC
+LIMIT ? OFFSET ?
+"""
+
+GLOBAL_GAME_LEADERBOARD_WITH_COUNT_SQL = """
+SELECT username, SUM(wins) as total_wins, SUM(losses) as total_losses, printf('%.1f%%', COALESCE(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 0)) AS win_rate, COUNT(*) OVER() AS total
+FROM leaderboard JOIN player_names USING (user_id, server_id)
+WHERE game_id = ?
+GROUP BY user_id
+ORDER BY total_wins DESC, total_losses ASC
+LIMIT ? OFFSET ?
+"""
+
+def _keyset_params(after):
+    """Expand a (wins, losses, rowid) page key into the parameters of the *_AFTER_SQL conditions."""
+    wins, losses, rowid = after
+    return (wins, wins, wins, losses, losses, rowid)
+
+# Server page queries the leaderboard view runs, with placeholder parameters for checking their plans
+INDEXED_PAGE_QUERIES = (
+    ("SERVER_LEADERBOARD_PAGE_SQL", SERVER_LEADERBOARD_PAGE_SQL, (0, 10, 0)),
+    ("SERVER_LEADERBOARD_AFTER_SQL", SERVER_LEADERBOARD_AFTER_SQL, (0, *_keyset_params((0, 0, 0)), 10)),
+    ("SERVER_GAME_LEADERBOARD_PAGE_SQL", SERVER_GAME_LEADERBOARD_PAGE_SQL, (0, "1001", 10, 0)),
+    ("SERVER_GAME_LEADERBOARD_AFTER_SQL", SERVER_GAME_LEADERBOARD_AFTER_SQL, (0, "1001", *_keyset_params((0, 0, 0)), 10)),
+)
+
+def check_query_plans(cursor):
+    """
+    Check that the server page queries read rows in index order.
+    
+    Args:
+        cursor: Cursor to run EXPLAIN QUERY PLAN with
+        
+    Returns:
+        list: Names of the queries whose plan sorts in a temp B-tree, empty if all of them use an index
+    """
+    sorted_queries = []
+    for name, sql, params in INDEXED_PAGE_QUERIES:
+        plan = [row[3] for row in cursor.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        if any("TEMP B-TREE" in step for step in plan):
+            logger.warning("%s sorts in a temp B-tree instead of using an index: %s", name, "; ".join(plan))
+            sorted_queries.append(name)
+    return sorted_queries
+
 # Ensure the database exists and has the necessary tables
 def init_db():
     """Initialize the database and create tables if they don't exist."""
@@ -19,14 +238,12 @@ def init_db():
         db_exists = os.path.exists(DB_FILE)
         
         # Connect to database (creates it if it doesn't exist)
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+        cursor = _get_conn().cursor()
         
         # Create tables if they don't exist
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS leaderboard (
             user_id INTEGER,
-            username TEXT NOT NULL,
             server_id INTEGER,
             game_id TEXT NOT NULL,
             wins INTEGER DEFAULT 0,
@@ -35,7 +252,71 @@ def init_db():
         )
         ''')
         
-        conn.commit()
+        # Player names, the display name is per server so it's stored once per player and server
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS player_names (
+            user_id INTEGER,
+            server_id INTEGER,
+            username TEXT NOT NULL,
+            PRIMARY KEY (user_id, server_id)
+        )
+        ''')
+        
+        # Older databases kept the name on every leaderboard row, move it over to player_names
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(leaderboard)")]
+        if "username" in columns:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # There's no update time to go by, each game's row holds the name from that game's last result.
+                # The bare username comes from the row with the most games played, the one most likely written last
+                cursor.execute('''
+                INSERT OR IGNORE INTO player_names (user_id, server_id, username)
+                SELECT user_id, server_id, username FROM (
+                    SELECT user_id, server_id, username, MAX(wins + losses) FROM leaderboard GROUP BY user_id, server_id
+                )
+                ''')
+                cursor.execute("ALTER TABLE leaderboard DROP COLUMN username")
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            logger.info("Moved player names from the leaderboard table to the player_names table")
+        
+        # Databases from before names were per server have a users table with one name per player,
+        # use it for each of their servers until their next game there refreshes it
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'").fetchone():
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute('''
+                INSERT OR IGNORE INTO player_names (user_id, server_id, username)
+                SELECT DISTINCT user_id, server_id, username FROM leaderboard JOIN users USING (user_id)
+                ''')
+                cursor.execute("DROP TABLE users")
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            logger.info("Moved player names from the users table to the player_names table")
+        
+        # Game names, joined into the leaderboard queries
+        cursor.execute("CREATE TABLE IF NOT EXISTS games (game_id TEXT PRIMARY KEY, name TEXT NOT NULL)")
+        cursor.executemany(
+            "INSERT INTO games (game_id, name) VALUES (?, ?) ON CONFLICT (game_id) DO UPDATE SET name = excluded.name",
+            GAME_NAMES.items()
+        )
+        
+        # Indexes for the leaderboard queries, the primary key starts with user_id so it can't serve them
+        # Server leaderboards read rows in ranking order instead of sorting the whole server
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_server_wins ON leaderboard (server_id, wins DESC, losses ASC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_server_game_wins ON leaderboard (server_id, game_id, wins DESC, losses ASC)")
+        # Global per-game leaderboards and counts group one game's rows by player
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_game_user ON leaderboard (game_id, user_id)")
+        
+        # Refresh the planner's statistics for those indexes, runs on each startup
+        cursor.execute("ANALYZE")
+        
+        # Warn if a schema change left a page query sorting the whole server again
+        check_query_plans(cursor)
         
         # Log result
         if db_exists:
@@ -43,10 +324,8 @@ def init_db():
         else:
             logger.info("Created new database")
         
-        conn.close()
-        
     except Exception as e:
-        logger.error(f"Error initializing database: {e}")
+        logger.error("Error initializing database: %s", e)
         raise
 
 def update_player_stats(user_id, username, server_id, is_win, game_id="1001"):
@@ -61,45 +340,152 @@ def update_player_stats(user_id, username, server_id, is_win, game_id="1001"):
         game_id: Game identifier (default: "1001" for Memory Match)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+        conn = _get_conn()
         
-        # Get current stats
-        cursor.execute(
-            "SELECT wins, losses FROM leaderboard WHERE user_id = ? AND server_id = ? AND game_id = ?", 
-            (user_id, server_id, game_id)
+        # Insert the player's record or add to their existing one, and refresh their name
+        with _write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(UPSERT_PLAYER_NAME_SQL, (user_id, server_id, username))
+                conn.execute(UPSERT_PLAYER_STATS_SQL, (user_id, server_id, game_id, 1 if is_win else 0, 0 if is_win else 1))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        _invalidate_counts()
+        
+        logger.debug(
+            "Updated stats for player %s (ID: %s) in server %s for game %s: %s",
+            username, user_id, server_id, game_id, "Win" if is_win else "Loss"
         )
-        result = cursor.fetchone()
         
-        if result:
-            # Update existing record
-            wins, losses = result
+    except Exception as e:
+        logger.error("Error updating player stats: %s", e)
+
+def queue_player_stats(user_id, username, server_id, is_win, game_id="1001"):
+    """
+    Buffer a player's result to be written by the next flush_player_stats.
+    
+    Results for the same player, server and game are merged in the buffer.
+    
+    Args:
+        user_id: Discord user ID
+        username: Player's display name
+        server_id: Discord server ID
+        is_win: True if player won, False if lost
+        game_id: Game identifier (default: "1001" for Memory Match)
+    """
+    queue_game_results([(user_id, username, server_id, is_win, game_id)])
+
+def queue_game_results(results):
+    """
+    Buffer the results of every player in a finished game at once.
+    
+    The results are merged into the buffer together, so they're always
+    written by the same flush_player_stats transaction.
+    
+    Args:
+        results: List of tuples (user_id, username, server_id, is_win, game_id)
+    """
+    with _buffer_lock:
+        for user_id, username, server_id, is_win, game_id in results:
+            entry = _write_buffer.get((user_id, server_id, game_id))
+            if entry is None:
+                entry = _write_buffer[(user_id, server_id, game_id)] = [username, 0, 0]
+            
+            # Latest name wins, results accumulate
+            entry[0] = username
             if is_win:
-                wins += 1
+                entry[1] += 1
             else:
-                losses += 1
-                
-            cursor.execute(
-                "UPDATE leaderboard SET wins = ?, losses = ?, username = ? WHERE user_id = ? AND server_id = ? AND game_id = ?",
-                (wins, losses, username, user_id, server_id, game_id)
-            )
-        else:
-            # Insert new record
-            wins = 1 if is_win else 0
-            losses = 0 if is_win else 1
-            
-            cursor.execute(
-                "INSERT INTO leaderboard (user_id, username, server_id, game_id, wins, losses) VALUES (?, ?, ?, ?, ?, ?)",
-                (user_id, username, server_id, game_id, wins, losses)
-            )
+                entry[2] += 1
         
-        conn.commit()
-        conn.close()
+        buffer_full = len(_write_buffer) >= WRITE_BUFFER_LIMIT
+    
+    logger.debug("Queued %d player results", len(results))
+    
+    # Don't let a burst of games grow the buffer without bound, the flusher writes it off the event loop
+    if buffer_full:
+        _flush_wakeup.set()
+
+def flush_player_stats():
+    """Write all buffered stat updates in a single transaction."""
+    global _write_buffer
+    
+    # Swap the buffer out so new results can be queued while this one is written
+    with _buffer_lock:
+        if not _write_buffer:
+            return
+        pending, _write_buffer = _write_buffer, {}
+    
+    rows = [
+        (user_id, server_id, game_id, wins, losses)
+        for (user_id, server_id, game_id), (_, wins, losses) in pending.items()
+    ]
+    # One name per player and server, the buffer already holds the latest one for each entry
+    names = {
+        (user_id, server_id): username
+        for (user_id, server_id, _), (username, _, _) in pending.items()
+    }
+    
+    committed = False
+    try:
+        conn = _get_conn()
+        with _write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(UPSERT_PLAYER_NAME_SQL, ((user_id, server_id, username) for (user_id, server_id), username in names.items()))
+                conn.executemany(UPSERT_PLAYER_STATS_SQL, rows)
+                conn.execute("COMMIT")
+                committed = True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        _invalidate_counts()
         
-        logger.info(f"Updated stats for player {username} (ID: {user_id}) in server {server_id} for game {game_id}: {'Win' if is_win else 'Loss'}")
+        logger.debug("Flushed stats for %d players", len(rows))
         
     except Exception as e:
-        logger.error(f"Error updating player stats: {e}")
+        logger.error("Error flushing player stats: %s", e)
+        if not committed:
+            _requeue_player_stats(pending)
+
+def _requeue_player_stats(pending):
+    """
+    Put the results of a failed flush back in the buffer so the next flush retries them.
+    
+    Args:
+        pending: The swapped out buffer, {(user_id, server_id, game_id): [username, wins, losses]}
+    """
+    with _buffer_lock:
+        for key, (username, wins, losses) in pending.items():
+            entry = _write_buffer.get(key)
+            if entry is None:
+                _write_buffer[key] = [username, wins, losses]
+            else:
+                # Results queued since the swap are newer, so their name is kept
+                entry[1] += wins
+                entry[2] += losses
+    
+    logger.warning("Kept %d unwritten player results for the next flush", len(pending))
+
+async def run_stats_flusher(interval=WRITE_FLUSH_INTERVAL):
+    """
+    Flush buffered stat updates every interval seconds, or as soon as the buffer fills up, forever.
+    
+    Args:
+        interval: Seconds between flushes
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await asyncio.wait_for(_flush_wakeup.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        _flush_wakeup.clear()
+        
+        if _write_buffer:
+            await loop.run_in_executor(None, flush_player_stats)
 
 def get_player_stats(user_id, game_id=None):
     """
@@ -113,7 +499,7 @@ def get_player_stats(user_id, game_id=None):
         Tuple of (wins, losses, total_games, win_rate)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
         if game_id:
@@ -130,20 +516,17 @@ def get_player_stats(user_id, game_id=None):
             )
             
         result = cursor.fetchone()
-        conn.close()
+        _release_read_conn(conn)
         
         if result and (result[0] is not None or result[1] is not None):
             wins = result[0] or 0
             losses = result[1] or 0
-            total_games = wins + losses
-            win_rate = f"{(wins / total_games * 100) if total_games > 0 else 0:.1f}%"
-            
-            return wins, losses, total_games, win_rate
+            return wins, losses, wins + losses, _win_rate(wins, losses)
         else:
             return 0, 0, 0, "0.0%"
         
     except Exception as e:
-        logger.error(f"Error getting player stats: {e}")
+        logger.error("Error getting player stats: %s", e)
         return 0, 0, 0, "0.0%"
 
 def get_player_game_stats(user_id, game_id=None):
@@ -158,45 +541,33 @@ def get_player_game_stats(user_id, game_id=None):
         List of tuples (game_name, wins, losses, win_rate, games_played)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        # Game ID to name mapping
-        game_names = {
-            "1001": "Memory Match",
-            "1002": "Tic Tac Toe"
-        }
-        
         if game_id:
             # Get stats for specific game
             cursor.execute(
-                "SELECT game_id, SUM(wins), SUM(losses) FROM leaderboard WHERE user_id = ? AND game_id = ? GROUP BY game_id",
+                "SELECT COALESCE(name, 'Game ' || game_id), SUM(wins), SUM(losses), printf('%.1f%%', COALESCE(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 0)), SUM(wins) + SUM(losses) FROM leaderboard LEFT JOIN games USING (game_id) WHERE user_id = ? AND game_id = ? GROUP BY game_id",
                 (user_id, game_id)
             )
         else:
             # Get stats for all games
             cursor.execute(
-                "SELECT game_id, SUM(wins), SUM(losses) FROM leaderboard WHERE user_id = ? GROUP BY game_id",
+                "SELECT COALESCE(name, 'Game ' || game_id), SUM(wins), SUM(losses), printf('%.1f%%', COALESCE(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 0)), SUM(wins) + SUM(losses) FROM leaderboard LEFT JOIN games USING (game_id) WHERE user_id = ? GROUP BY game_id",
                 (user_id,)
             )
             
-        results = cursor.fetchall()
-        conn.close()
+        # Build the rows straight off the cursor, then hand the connection back
+        stats = [
+            (game_name, wins or 0, losses or 0, win_rate, total_games or 0)
+            for game_name, wins, losses, win_rate, total_games in cursor
+        ]
+        _release_read_conn(conn)
         
-        stats = []
-        for game_id, wins, losses in results:
-            wins = wins or 0
-            losses = losses or 0
-            total_games = wins + losses
-            win_rate = f"{(wins / total_games * 100) if total_games > 0 else 0:.1f}%"
-            game_name = game_names.get(game_id, f"Game {game_id}")
-            
-            stats.append((game_name, wins, losses, win_rate, total_games))
-            
         return stats
         
     except Exception as e:
-        logger.error(f"Error getting player game stats: {e}")
+        logger.error("Error getting player game stats: %s", e)
         return []
 
 def get_server_leaderboard(server_id, limit=10, offset=0):
@@ -212,39 +583,25 @@ def get_server_leaderboard(server_id, limit=10, offset=0):
         List of tuples (username, game_name, wins, losses, win_rate)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        # Game ID to name mapping
-        game_names = {
-            "1001": "Memory Match",
-            "1002": "Tic Tac Toe"
-        }
-        
         # Get all-time stats for each player in the server, for all games
         cursor.execute('''
-        SELECT username, game_id, wins, losses 
-        FROM leaderboard 
+        SELECT username, COALESCE(name, 'Game ' || game_id) AS game_name, wins, losses, printf('%.1f%%', COALESCE(wins * 100.0 / NULLIF(wins + losses, 0), 0)) AS win_rate
+        FROM leaderboard JOIN player_names USING (user_id, server_id) LEFT JOIN games USING (game_id)
         WHERE server_id = ? 
         ORDER BY wins DESC, losses ASC
         LIMIT ? OFFSET ?
         ''', (server_id, limit, offset))
         
-        results = cursor.fetchall()
-        conn.close()
+        leaderboard = cursor.fetchall()
+        _release_read_conn(conn)
         
-        leaderboard = []
-        for username, game_id, wins, losses in results:
-            total_games = wins + losses
-            win_rate = f"{(wins / total_games * 100) if total_games > 0 else 0:.1f}%"
-            game_name = game_names.get(game_id, f"Game {game_id}")
-            
-            leaderboard.append((username, game_name, wins, losses, win_rate))
-            
         return leaderboard
         
     except Exception as e:
-        logger.error(f"Error getting server leaderboard: {e}")
+        logger.error("Error getting server leaderboard: %s", e)
         return []
 
 def get_server_game_leaderboard(server_id, game_id, limit=10, offset=0):
@@ -261,32 +618,29 @@ def get_server_game_leaderboard(server_id, game_id, limit=10, offset=0):
         List of tuples (username, wins, losses, win_rate)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
         # Get all-time stats for each player in the server, for the specific game
         cursor.execute('''
-        SELECT username, wins, losses 
-        FROM leaderboard 
+        SELECT username, wins, losses, printf('%.1f%%', COALESCE(wins * 100.0 / NULLIF(wins + losses, 0), 0)) AS win_rate
+        FROM leaderboard JOIN player_names USING (user_id, server_id)
         WHERE server_id = ? AND game_id = ?
         ORDER BY wins DESC, losses ASC
         LIMIT ? OFFSET ?
         ''', (server_id, game_id, limit, offset))
         
-        results = cursor.fetchall()
-        conn.close()
+        # Build the rows straight off the cursor, then hand the connection back
+        leaderboard = [
+            (username, wins, losses, win_rate)
+            for username, wins, losses, win_rate in cursor
+        ]
+        _release_read_conn(conn)
         
-        leaderboard = []
-        for username, wins, losses in results:
-            total_games = wins + losses
-            win_rate = f"{(wins / total_games * 100) if total_games > 0 else 0:.1f}%"
-            
-            leaderboard.append((username, wins, losses, win_rate))
-            
         return leaderboard
         
     except Exception as e:
-        logger.error(f"Error getting server game leaderboard: {e}")
+        logger.error("Error getting server game leaderboard: %s", e)
         return []
 
 def get_global_leaderboard(limit=10, offset=0):
@@ -301,39 +655,25 @@ def get_global_leaderboard(limit=10, offset=0):
         List of tuples (username, game_name, wins, losses, win_rate)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        # Game ID to name mapping
-        game_names = {
-            "1001": "Memory Match",
-            "1002": "Tic Tac Toe"
-        }
-        
         # Get all-time stats for each player across all servers and games
         cursor.execute('''
-        SELECT username, game_id, SUM(wins) as total_wins, SUM(losses) as total_losses 
-        FROM leaderboard 
+        SELECT username, COALESCE(name, 'Game ' || game_id) AS game_name, SUM(wins) as total_wins, SUM(losses) as total_losses, printf('%.1f%%', COALESCE(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 0)) AS win_rate
+        FROM leaderboard JOIN player_names USING (user_id, server_id) LEFT JOIN games USING (game_id)
         GROUP BY user_id, game_id
         ORDER BY total_wins DESC, total_losses ASC
         LIMIT ? OFFSET ?
         ''', (limit, offset))
         
-        results = cursor.fetchall()
-        conn.close()
+        leaderboard = cursor.fetchall()
+        _release_read_conn(conn)
         
-        leaderboard = []
-        for username, game_id, wins, losses in results:
-            total_games = wins + losses
-            win_rate = f"{(wins / total_games * 100) if total_games > 0 else 0:.1f}%"
-            game_name = game_names.get(game_id, f"Game {game_id}")
-            
-            leaderboard.append((username, game_name, wins, losses, win_rate))
-            
         return leaderboard
         
     except Exception as e:
-        logger.error(f"Error getting global leaderboard: {e}")
+        logger.error("Error getting global leaderboard: %s", e)
         return []
 
 def get_global_game_leaderboard(game_id, limit=10, offset=0):
@@ -349,33 +689,30 @@ def get_global_game_leaderboard(game_id, limit=10, offset=0):
         List of tuples (username, wins, losses, win_rate)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
         # Get all-time stats for each player across all servers for the specific game
         cursor.execute('''
-        SELECT username, SUM(wins) as total_wins, SUM(losses) as total_losses 
-        FROM leaderboard 
+        SELECT username, SUM(wins) as total_wins, SUM(losses) as total_losses, printf('%.1f%%', COALESCE(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 0)) AS win_rate
+        FROM leaderboard JOIN player_names USING (user_id, server_id)
         WHERE game_id = ?
         GROUP BY user_id
         ORDER BY total_wins DESC, total_losses ASC
         LIMIT ? OFFSET ?
         ''', (game_id, limit, offset))
         
-        results = cursor.fetchall()
-        conn.close()
+        # Build the rows straight off the cursor, then hand the connection back
+        leaderboard = [
+            (username, wins, losses, win_rate)
+            for username, wins, losses, win_rate in cursor
+        ]
+        _release_read_conn(conn)
         
-        leaderboard = []
-        for username, wins, losses in results:
-            total_games = wins + losses
-            win_rate = f"{(wins / total_games * 100) if total_games > 0 else 0:.1f}%"
-            
-            leaderboard.append((username, wins, losses, win_rate))
-            
         return leaderboard
         
     except Exception as e:
-        logger.error(f"Error getting global game leaderboard: {e}")
+        logger.error("Error getting global game leaderboard: %s", e)
         return []
 
 def search_player(search_term, scope="server", server_id=None, game_id=None):
@@ -392,19 +729,13 @@ def search_player(search_term, scope="server", server_id=None, game_id=None):
         List of tuples (username, game_name, wins, losses, win_rate)
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        # Game ID to name mapping
-        game_names = {
-            "1001": "Memory Match",
-            "1002": "Tic Tac Toe"
-        }
-        
         params = [f"%{search_term}%"]
         query = """
-        SELECT username, game_id, SUM(wins) as total_wins, SUM(losses) as total_losses 
-        FROM leaderboard 
+        SELECT username, COALESCE(name, 'Game ' || game_id) AS game_name, SUM(wins) as total_wins, SUM(losses) as total_losses, printf('%.1f%%', COALESCE(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 0)) AS win_rate
+        FROM leaderboard JOIN player_names USING (user_id, server_id) LEFT JOIN games USING (game_id)
         WHERE username LIKE ?
         """
         
@@ -419,100 +750,285 @@ def search_player(search_term, scope="server", server_id=None, game_id=None):
         query += " GROUP BY username, game_id ORDER BY total_wins DESC, total_losses ASC LIMIT 10"
         
         cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
+        search_results = cursor.fetchall()
+        _release_read_conn(conn)
         
-        search_results = []
-        for username, game_id, wins, losses in results:
-            total_games = wins + losses
-            win_rate = f"{(wins / total_games * 100) if total_games > 0 else 0:.1f}%"
-            game_name = game_names.get(game_id, f"Game {game_id}")
-            
-            search_results.append((username, game_name, wins, losses, win_rate))
-            
         return search_results
         
     except Exception as e:
-        logger.error(f"Error searching for player: {e}")
+        logger.error("Error searching for player: %s", e)
         return []
 
 def get_server_leaderboard_count(server_id):
     """Get the total number of entries in the server leaderboard."""
+    key = ("server", server_id)
+    # A single lookup, a flush in another thread may clear the cache at any point
+    count = _count_cache.get(key)
+    if count is not None:
+        return count
+    generation = _count_generation
+    
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        cursor.execute(
-            "SELECT COUNT(*) FROM leaderboard WHERE server_id = ?", 
-            (server_id,)
-        )
+        cursor.execute(SERVER_LEADERBOARD_COUNT_SQL, (server_id,))
         count = cursor.fetchone()[0]
-        conn.close()
+        _release_read_conn(conn)
         
+        _store_count(key, generation, count)
         return count
         
     except Exception as e:
-        logger.error(f"Error getting server leaderboard count: {e}")
+        logger.error("Error getting server leaderboard count: %s", e)
         return 0
 
 def get_server_game_leaderboard_count(server_id, game_id):
     """Get the total number of entries in the server leaderboard for a specific game."""
+    key = ("server", server_id, game_id)
+    # A single lookup, a flush in another thread may clear the cache at any point
+    count = _count_cache.get(key)
+    if count is not None:
+        return count
+    generation = _count_generation
+    
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        cursor.execute(
-            "SELECT COUNT(*) FROM leaderboard WHERE server_id = ? AND game_id = ?", 
-            (server_id, game_id)
-        )
+        cursor.execute(SERVER_GAME_LEADERBOARD_COUNT_SQL, (server_id, game_id))
         count = cursor.fetchone()[0]
-        conn.close()
+        _release_read_conn(conn)
         
+        _store_count(key, generation, count)
         return count
         
     except Exception as e:
-        logger.error(f"Error getting server game leaderboard count: {e}")
+        logger.error("Error getting server game leaderboard count: %s", e)
         return 0
 
 def get_global_leaderboard_count():
     """Get the total number of unique player-game combinations in the global leaderboard."""
+    key = ("global",)
+    # A single lookup, a flush in another thread may clear the cache at any point
+    count = _count_cache.get(key)
+    if count is not None:
+        return count
+    generation = _count_generation
+    
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT COUNT(*) FROM (SELECT DISTINCT user_id, game_id FROM leaderboard)")
+        cursor.execute(GLOBAL_LEADERBOARD_COUNT_SQL)
         count = cursor.fetchone()[0]
-        conn.close()
+        _release_read_conn(conn)
         
+        _store_count(key, generation, count)
         return count
         
     except Exception as e:
-        logger.error(f"Error getting global leaderboard count: {e}")
+        logger.error("Error getting global leaderboard count: %s", e)
         return 0
 
 def get_global_game_leaderboard_count(game_id):
     """Get the total number of entries in the global leaderboard for a specific game."""
+    key = ("global", game_id)
+    # A single lookup, a flush in another thread may clear the cache at any point
+    count = _count_cache.get(key)
+    if count is not None:
+        return count
+    generation = _count_generation
+    
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _acquire_read_conn()
         cursor = conn.cursor()
         
-        cursor.execute(
-            "SELECT COUNT(DISTINCT user_id) FROM leaderboard WHERE game_id = ?", 
-            (game_id,)
-        )
+        cursor.execute(GLOBAL_GAME_LEADERBOARD_COUNT_SQL, (game_id,))
         count = cursor.fetchone()[0]
-        conn.close()
+        _release_read_conn(conn)
         
+        _store_count(key, generation, count)
         return count
         
     except Exception as e:
-        logger.error(f"Error getting global game leaderboard count: {e}")
+        logger.error("Error getting global game leaderboard count: %s", e)
         return 0
 
+def get_server_leaderboard_with_count(server_id, limit=10, offset=0, after=None):
+    """
+    Get a page of the server leaderboard together with its total number of entries.
+    
+    Args:
+        server_id: Discord server ID
+        limit: Maximum number of entries to return
+        offset: Starting offset for pagination (the rank offset of the page when after is given)
+        after: Page key returned for the previous page, continues from there instead of using OFFSET
+        
+    Returns:
+        Tuple (leaderboard, total, next_key) where leaderboard is a list of tuples (username, game_name, wins, losses, win_rate)
+        and next_key is the key for the following page (None if this page is empty)
+    """
+    try:
+        conn = _acquire_read_conn()
+        cursor = conn.cursor()
+        
+        # Get the page, continuing after the previous page's key when there is one
+        if after:
+            cursor.execute(SERVER_LEADERBOARD_AFTER_SQL, (server_id, *_keyset_params(after), limit))
+        else:
+            cursor.execute(SERVER_LEADERBOARD_PAGE_SQL, (server_id, limit, offset))
+        
+        results = cursor.fetchall()
+        _release_read_conn(conn)
+        
+        # Cached until the next write, so no page query has to count every row of the server
+        total = get_server_leaderboard_count(server_id)
+        
+        if not results:
+            return [], total, None
+        
+        leaderboard = [
+            (username, game_name, wins, losses, win_rate)
+            for username, game_name, wins, losses, win_rate, *_ in results
+        ]
+        
+        last = results[-1]
+        return leaderboard, total, (last[2], last[3], last[5])
+        
+    except Exception as e:
+        logger.error("Error getting server leaderboard with count: %s", e)
+        return [], 0, None
+
+def get_server_game_leaderboard_with_count(server_id, game_id, limit=10, offset=0, after=None):
+    """
+    Get a page of the server leaderboard for a specific game together with its total number of entries.
+    
+    Args:
+        server_id: Discord server ID
+        game_id: Game identifier
+        limit: Maximum number of entries to return
+        offset: Starting offset for pagination (the rank offset of the page when after is given)
+        after: Page key returned for the previous page, continues from there instead of using OFFSET
+        
+    Returns:
+        Tuple (leaderboard, total, next_key) where leaderboard is a list of tuples (username, wins, losses, win_rate)
+        and next_key is the key for the following page (None if this page is empty)
+    """
+    try:
+        conn = _acquire_read_conn()
+        cursor = conn.cursor()
+        
+        # Get the page, continuing after the previous page's key when there is one
+        if after:
+            cursor.execute(SERVER_GAME_LEADERBOARD_AFTER_SQL, (server_id, game_id, *_keyset_params(after), limit))
+        else:
+            cursor.execute(SERVER_GAME_LEADERBOARD_PAGE_SQL, (server_id, game_id, limit, offset))
+        
+        results = cursor.fetchall()
+        _release_read_conn(conn)
+        
+        # Cached until the next write, so no page query has to count every row of the server
+        total = get_server_game_leaderboard_count(server_id, game_id)
+        
+        if not results:
+            return [], total, None
+        
+        leaderboard = [
+            (username, wins, losses, win_rate)
+            for username, wins, losses, win_rate, *_ in results
+        ]
+        
+        last = results[-1]
+        return leaderboard, total, (last[1], last[2], last[4])
+        
+    except Exception as e:
+        logger.error("Error getting server game leaderboard with count: %s", e)
+        return [], 0, None
+
+def get_global_leaderboard_with_count(limit=10, offset=0, after=None):
+    """
+    Get a page of the global leaderboard together with its total number of entries.
+    
+    Args:
+        limit: Maximum number of entries to return
+        offset: Starting offset for pagination
+        after: Ignored, grouped global rankings are always paged with OFFSET
+        
+    Returns:
+        Tuple (leaderboard, total, None) where leaderboard is a list of tuples (username, game_name, wins, losses, win_rate)
+    """
+    try:
+        conn = _acquire_read_conn()
+        cursor = conn.cursor()
+        
+        # Get the page and the total number of player-game groups in one query
+        cursor.execute(GLOBAL_LEADERBOARD_WITH_COUNT_SQL, (limit, offset))
+        
+        results = cursor.fetchall()
+        _release_read_conn(conn)
+        
+        # Past the last page there are no rows to carry the total
+        if not results:
+            return [], get_global_leaderboard_count() if offset else 0, None
+        
+        leaderboard = [
+            (username, game_name, wins, losses, win_rate)
+            for username, game_name, wins, losses, win_rate, _ in results
+        ]
+        
+        return leaderboard, results[0][-1], None
+        
+    except Exception as e:
+        logger.error("Error getting global leaderboard with count: %s", e)
+        return [], 0, None
+
+def get_global_game_leaderboard_with_count(game_id, limit=10, offset=0, after=None):
+    """
+    Get a page of the global leaderboard for a specific game together with its total number of entries.
+    
+    Args:
+        game_id: Game identifier
+        limit: Maximum number of entries to return
+        offset: Starting offset for pagination
+        after: Ignored, grouped global rankings are always paged with OFFSET
+        
+    Returns:
+        Tuple (leaderboard, total, None) where leaderboard is a list of tuples (username, wins, losses, win_rate)
+    """
+    try:
+        conn = _acquire_read_conn()
+        cursor = conn.cursor()
+        
+        # Get the page and the total number of players in one query
+        cursor.execute(GLOBAL_GAME_LEADERBOARD_WITH_COUNT_SQL, (game_id, limit, offset))
+        
+        results = cursor.fetchall()
+        _release_read_conn(conn)
+        
+        # Past the last page there are no rows to carry the total
+        if not results:
+            return [], get_global_game_leaderboard_count(game_id) if offset else 0, None
+        
+        leaderboard = [
+            (username, wins, losses, win_rate)
+            for username, wins, losses, win_rate, _ in results
+        ]
+        
+        return leaderboard, results[0][-1], None
+        
+    except Exception as e:
+        logger.error("Error getting global game leaderboard with count: %s", e)
+        return [], 0, None
+
 # Create a singleton database instance
 database = {
     'init_db': init_db,
     'update_player_stats': update_player_stats,
+    'queue_player_stats': queue_player_stats,
+    'queue_game_results': queue_game_results,
+    'flush_player_stats': flush_player_stats,
+    'run_stats_flusher': run_stats_flusher,
     'get_global_leaderboard': get_global_leaderboard,
     'get_server_leaderboard': get_server_leaderboard,
     'get_player_stats': get_player_stats,
@@ -523,5 +1039,9 @@ database = {
     'get_server_leaderboard_count': get_server_leaderboard_count,
     'get_server_game_leaderboard_count': get_server_game_leaderboard_count,
     'get_global_leaderboard_count': get_global_leaderboard_count,
-    'get_global_game_leaderboard_count': get_global_game_leaderboard_count
+    'get_global_game_leaderboard_count': get_global_game_leaderboard_count,
+    'get_server_leaderboard_with_count': get_server_leaderboard_with_count,
+    'get_server_game_leaderboard_with_count': get_server_game_leaderboard_with_count,
+    'get_global_leaderboard_with_count': get_global_leaderboard_with_count,
+    'get_global_game_leaderboard_with_count': get_global_game_leaderboard_with_count
 } 
\ No newline at end of file
@@ -4,129 +4,195 @@ Utility functions shared between different games.
 import discord
 import logging
 import asyncio
+import heapq
+import itertools
 import time
 import uuid
 
+from common.config import AFK_TIMEOUT_SECONDS
+from common.database import database
+
 logger = logging.getLogger("discord_bot")
 
 # Active games tracking - dictionary of dictionaries: {game_id: {channel_id: game_instance}}
 active_games = {}
 
-async def check_afk(bot, game_id, channel_id, game, end_game_func, afk_timeout):
+# AFK schedule - min-heap of (deadline, game_id, channel_id), stale entries are skipped when popped
+afk_heap = []
+afk_wakeup = asyncio.Event()  # Set when a new earliest deadline is scheduled
+
+def add_active_game(game_id, channel_id, game):
     """
-    Check if a game is AFK and end it if necessary.
+    Store a game in active_games and schedule its AFK check.
     
     Args:
-        bot: The Discord bot instance
         game_id: The unique game identifier
         channel_id: The channel ID where the game is taking place
-        game: The game instance
-        end_game_func: Function to call to end the game
-        afk_timeout: Timeout in seconds
+        game: The game instance (must have a last_activity_time attribute)
+    """
+    active_games.setdefault(game_id, {})[channel_id] = game
     
-    Returns:
-        bool: True if game was ended due to AFK, False otherwise
+    entry = (game.last_activity_time + AFK_TIMEOUT_SECONDS, game_id, channel_id)
+    heapq.heappush(afk_heap, entry)
+    
+    # Wake the AFK checker if this game now expires first
+    if afk_heap[0] is entry:
+        afk_wakeup.set()
+
+# Pending challenges and end game confirmations, registered by each game module under its game ID
+# {game_id: {(target_user_id, channel_id): challenge}} and {game_id: {confirmation_id: confirmation}}
+pending_challenges_by_game = {}
+pending_confirmations_by_game = {}
+
+class PendingChallenge:
+    """A challenge message waiting for the target player to accept or decline, the channel is part of its key."""
+    __slots__ = ("challenger", "message_id")
+    
+    def __init__(self, challenger, message_id):
+        self.challenger = challenger
+        self.message_id = message_id
+
+class PendingConfirmation:
+    """An end game request waiting for the opponent to accept or decline."""
+    __slots__ = ("channel_id", "requester", "opponent", "message_id")
+    
+    def __init__(self, channel_id, requester, opponent, message_id):
+        self.channel_id = channel_id
+        self.requester = requester
+        self.opponent = opponent
+        self.message_id = message_id
+
+# Reverse index for reaction lookups - {message_id: (pending_dict, key)}
+# Entries are checked against pending_dict on lookup, so stale ones are harmless
+pending_messages = {}
+
+def track_pending_message(message_id, pending_dict, key):
     """
-    try:
-        current_time = time.time()
+    Index a pending challenge or confirmation by its message ID.
+    
+    Args:
+        message_id: ID of the challenge or confirmation message
+        pending_dict: The dictionary holding the pending entry
+        key: Key of the entry in pending_dict
+    """
+    pending_messages[message_id] = (pending_dict, key)
+
+def get_pending_message(message_id):
+    """
+    Look up the pending challenge or confirmation for a message.
+    
+    Args:
+        message_id: ID of the message that was reacted to
         
-        # Check if the game has been inactive for too long
-        if current_time - game.last_activity_time > afk_timeout:
-            # Get the channel
-            channel = bot.get_channel(channel_id)
-            if not channel:
-                # Channel no longer exists, remove the game
-                if game_id in active_games and channel_id in active_games[game_id]:
-                    del active_games[game_id][channel_id]
-                return True
-            
-            # End the game due to AFK
-            await end_game_func(
-                channel, 
-                game, 
-                None, 
-                f"Game ended due to inactivity (no moves for {int(afk_timeout/60)} minutes)."
-            )
-            return True
+    Returns:
+        tuple: (pending_dict, key, value), or None if nothing is pending for this message
+    """
+    entry = pending_messages.get(message_id)
+    if entry is None:
+        return None
+    
+    pending_dict, key = entry
+    value = pending_dict.get(key)
+    if value is None or value.message_id != message_id:
+        # Entry was removed or replaced by a newer challenge
+        del pending_messages[message_id]
+        return None
+    
+    return pending_dict, key, value
+
+# Challenge and confirmation expiry schedule - min-heap of
+# (deadline, sequence, registry, game_id, key, message_id, label), walked by a single timer task
+expiry_heap = []
+expiry_wakeup = asyncio.Event()  # Set when a new earliest deadline is scheduled
+_expiry_sequence = itertools.count()  # Tiebreaker so entries with equal deadlines never compare further
+_expiry_task = None
+
+def _schedule_expiration(registry, game_id, key, timeout_seconds, message_id, label):
+    """Add an expiry to the schedule and make sure the timer task is running."""
+    global _expiry_task
+    
+    entry = (time.monotonic() + timeout_seconds, next(_expiry_sequence), registry, game_id, key, message_id, label)
+    heapq.heappush(expiry_heap, entry)
+    
+    # Wake the timer if this now expires first
+    if expiry_heap[0] is entry:
+        expiry_wakeup.set()
+    
+    if _expiry_task is None or _expiry_task.done():
+        _expiry_task = asyncio.get_running_loop().create_task(run_expirations())
+
+async def run_expirations():
+    """Remove challenges and confirmations as their deadlines pass, sleeping until the next one."""
+    while True:
+        try:
+            now = time.monotonic()
+            while expiry_heap and expiry_heap[0][0] <= now:
+                _, _, registry, game_id, key, message_id, label = heapq.heappop(expiry_heap)
+                
+                # The entry is resolved either way, so stop indexing its message
+                if message_id is not None:
+                    pending_messages.pop(message_id, None)
+                
+                # Remove it if it's still pending
+                if registry.get(game_id, {}).pop(key, None) is not None:
+                    logger.info("%s %s for game %s expired and was removed", label, key, game_id)
             
-        return False
+            timeout = expiry_heap[0][0] - now if expiry_heap else None
+        except Exception as e:
+            logger.error("Error in run_expirations: %s", e)
+            timeout = 1
         
-    except Exception as e:
-        logger.error(f"Error in AFK check: {e}")
-        return False
+        # Sleep until the next deadline, or until an earlier one is scheduled
+        expiry_wakeup.clear()
+        try:
+            await asyncio.wait_for(expiry_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
 
-async def handle_challenge_expiration(challenge_key, timeout_seconds):
+def handle_challenge_expiration(game_id, challenge_key, timeout_seconds, message_id=None):
     """
-    Handle the expiration of a game challenge.
+    Schedule the expiration of a game challenge.
     
     Args:
-        challenge_key: Key for this challenge in the challenge dictionary
+        game_id: The game the challenge is for
+        challenge_key: Key for this challenge in the game's challenge dictionary
         timeout_seconds: Time in seconds to wait before expiring
+        message_id: ID of the challenge message to drop from the reaction index
+    """
+    _schedule_expiration(pending_challenges_by_game, game_id, challenge_key, timeout_seconds, message_id, "Challenge")
+
+async def edit_and_clear_reactions(message, **kwargs):
     """
-    # Import here to avoid circular imports
-    from games.game_1001_matching.commands_1001 import pending_challenges
-    from games.game_1002_tictactoe.commands_1002 import pending_ttt_challenges
-    from games.game_1003_rps.commands_1003 import pending_rps_challenges
+    Edit a message and clear its reactions, with both requests in flight at once.
     
-    try:
-        # Wait for the timeout
-        await asyncio.sleep(timeout_seconds)
-        
-        # Check if this was a memory match challenge
-        if challenge_key in pending_challenges:
-            # Remove it
-            del pending_challenges[challenge_key]
-            logger.info(f"Challenge {challenge_key} expired and was removed")
-            
-        # Check if this was a tic tac toe challenge    
-        elif challenge_key in pending_ttt_challenges:
-            # Remove it
-            del pending_ttt_challenges[challenge_key]
-            logger.info(f"TTT Challenge {challenge_key} expired and was removed")
-            
-        # Check if this was a Rock Paper Scissors challenge
-        elif challenge_key in pending_rps_challenges:
-            # Remove it
-            del pending_rps_challenges[challenge_key]
-            logger.info(f"RPS Challenge {challenge_key} expired and was removed")
-            
-    except Exception as e:
-        logger.error(f"Error in handle_challenge_expiration: {e}")
+    An error from the edit is raised as usual, failing to clear the reactions is only logged.
+    
+    Args:
+        message: The message (or partial message) to update
+        **kwargs: Passed on to message.edit
+    """
+    edited, cleared = await asyncio.gather(message.edit(**kwargs), message.clear_reactions(), return_exceptions=True)
+    
+    if isinstance(cleared, BaseException):
+        logger.warning("Could not clear reactions on message %s: %s", message.id, cleared)
+    if isinstance(edited, BaseException):
+        raise edited
 
 def generate_confirmation_id():
     """Generate a unique confirmation ID."""
     return str(uuid.uuid4())
 
-async def handle_confirmation_expiration(confirmation_id, timeout_seconds):
+def handle_confirmation_expiration(game_id, confirmation_id, timeout_seconds, message_id=None):
     """
-    Handle the expiration of an end game confirmation.
+    Schedule the expiration of an end game confirmation.
     
     Args:
+        game_id: The game the confirmation is for
         confirmation_id: ID for this confirmation
         timeout_seconds: Time in seconds to wait before expiring
+        message_id: ID of the confirmation message to drop from the reaction index
     """
-    # Import here to avoid circular imports
-    from games.game_1001_matching.commands_1001 import end_game_confirmations
-    from games.game_1002_tictactoe.commands_1002 import end_ttt_confirmations
-    
-    try:
-        # Wait for the timeout
-        await asyncio.sleep(timeout_seconds)
-        
-        # Check if this was a memory match game confirmation
-        if confirmation_id in end_game_confirmations:
-            # Remove it
-            del end_game_confirmations[confirmation_id]
-            logger.info(f"End game confirmation {confirmation_id} expired and was removed")
-            
-        # Check if this was a tic tac toe game confirmation
-        elif confirmation_id in end_ttt_confirmations:
-            # Remove it
-            del end_ttt_confirmations[confirmation_id]
-            logger.info(f"TTT End game confirmation {confirmation_id} expired and was removed")
-            
-    except Exception as e:
-        logger.error(f"Error in handle_confirmation_expiration: {e}")
+    _schedule_expiration(pending_confirmations_by_game, game_id, confirmation_id, timeout_seconds, message_id, "End game confirmation")
 
 async def update_database_with_game_results(**kwargs):
     """
@@ -136,7 +202,7 @@ async def update_database_with_game_results(**kwargs):
         This function accepts the following parameters in two formats:
         
         Format 1:
-        channel: Discord channel where the game happened
+        server_id: ID of the server where the game happened (None outside servers)
         winner: Winner user (or None for a tie)
         loser: Loser user (or player2 in case of a tie)
         game_id: Game identifier
@@ -150,50 +216,30 @@ async def update_database_with_game_results(**kwargs):
         score_player2: Score of player 2
         channel_id: ID of the channel where the game happened
     """
-    from common.database import database
-    
     try:
         # Check which format is being used
-        if 'channel' in kwargs and 'winner' in kwargs and 'loser' in kwargs:
+        if 'server_id' in kwargs and 'winner' in kwargs and 'loser' in kwargs:
             # Format 1
-            channel = kwargs['channel']
+            server_id = kwargs['server_id']
             winner = kwargs['winner']
             loser = kwargs['loser']
             game_id = kwargs['game_id']
             
-            if not hasattr(channel, 'guild') or not channel.guild:
-                logger.error(f"Channel {channel.id} has no guild attribute or guild is None")
+            # Stats are tracked per server
+            if server_id is None:
+                logger.error("Game %s results have no server to record them for", game_id)
                 return
-                
-            server_id = channel.guild.id
             
+            results = []
             if winner:
                 # Update winner stats
-                database['update_player_stats'](
-                    winner.id,
-                    winner.display_name,
-                    server_id,
-                    True,
-                    game_id
-                )
-                
-                # Update loser stats
-                database['update_player_stats'](
-                    loser.id,
-                    loser.display_name,
-                    server_id,
-                    False,
-                    game_id
-                )
-            else:
-                # It's a tie, both players get a loss
-                database['update_player_stats'](
-                    loser.id,
-                    loser.display_name,
-                    server_id,
-                    False,
-                    game_id
-                )
+                results.append((winner.id, winner.display_name, server_id, True, game_id))
+            
+            # Update loser stats, in a tie this is the only row and the player gets a loss
+            results.append((loser.id, loser.display_name, server_id, False, game_id))
+            
+            # Queue both players together so they're written in the same transaction
+            database['queue_game_results'](results)
         
         elif 'player1_id' in kwargs and 'player2_id' in kwargs:
             # Format 2 - Just log for now since we don't have easy access to server_id
@@ -205,17 +251,15 @@ async def update_database_with_game_results(**kwargs):
             score_player2 = kwargs.get('score_player2', 0)
             
             logger.info(
-                f"Game results: game_id={game_id}, "
-                f"player1_id={player1_id} (score: {score_player1}), "
-                f"player2_id={player2_id} (score: {score_player2}), "
-                f"winner_id={winner_id if winner_id else 'Tie'}"
+                "Game results: game_id=%s, player1_id=%s (score: %s), player2_id=%s (score: %s), winner_id=%s",
+                game_id, player1_id, score_player1, player2_id, score_player2, winner_id if winner_id else "Tie"
             )
             
             # We won't update the database in this format for now
             # since we don't have the server_id and display_names easily
         
         else:
-            logger.error(f"Invalid parameter format for update_database_with_game_results: {kwargs}")
+            logger.error("Invalid parameter format for update_database_with_game_results: %s", kwargs)
     
     except Exception as e:
-        logger.error(f"Error updating database with game results: {e}") 
\ No newline at end of file
+        logger.error("Error updating database with game results: %s", e) 
\ No newline at end of file
@@ -13,33 +13,65 @@ from discord.ext import commands
 from common.config import (
     CHALLENGE_TIMEOUT_SECONDS, 
     ACCEPT_EMOJI, DECLINE_EMOJI, EPHEMERAL_MESSAGE_DURATION,
-    EMOJI_CATEGORIES
+    EMOJI_CATEGORIES, EMOJI_CATEGORY_NAMES
 )
 from common.database import database
 from common.utils.game_utils import (
     active_games, handle_challenge_expiration, 
-    generate_confirmation_id, handle_confirmation_expiration
+    generate_confirmation_id, handle_confirmation_expiration,
+    track_pending_message, edit_and_clear_reactions, PendingChallenge, PendingConfirmation,
+    pending_challenges_by_game, pending_confirmations_by_game
 )
-from games.game_1001_matching.game_1001 import MemoryGame
-from games.game_1001_matching.ui_1001 import GameView
+from games.game_1001_matching.ui_1001 import start_memory_game
 
 logger = logging.getLogger("discord_bot")
 
+# Embed colours, created once and shared by every embed
+COLOR_GOLD = discord.Color.gold()
+COLOR_ORANGE = discord.Color.orange()
+COLOR_RED = discord.Color.red()
+
 # Game-specific storage
 GAME_ID = "1001"  # Unique identifier for Memory Match Game
-pending_challenges = {}  # (target_user_id, channel_id) -> (challenger, channel, message_id, category)
-end_game_confirmations = {}  # uuid -> {channel_id, requester, opponent, message_id, opponent_id}
+pending_challenges = pending_challenges_by_game.setdefault(GAME_ID, {})  # (target_user_id, channel_id) -> MatchChallenge
+end_game_confirmations = pending_confirmations_by_game.setdefault(GAME_ID, {})  # uuid -> PendingConfirmation
 
 # Compatibility aliases for pending_challenges and end_game_confirmations
 pending_match_challenges = pending_challenges
 end_match_confirmations = end_game_confirmations
 
+class MatchChallenge(PendingChallenge):
+    """A pending Memory Match challenge with its chosen category and grid size."""
+    __slots__ = ("category", "rows", "cols")
+    
+    def __init__(self, challenger, message_id, category, rows, cols):
+        super().__init__(challenger, message_id)
+        self.category = category
+        self.rows = rows
+        self.cols = cols
+
+# Parts of the challenge embed that are the same for every challenge, copied per challenge
+CHALLENGE_EMBED_TEMPLATE = discord.Embed(
+    title="🎮 Memory Match Challenge! 🎮",
+    color=COLOR_ORANGE
+)
+CHALLENGE_EMBED_TEMPLATE.add_field(name="⏳ Timeout", value=f"{int(CHALLENGE_TIMEOUT_SECONDS)} seconds", inline=True)
+CHALLENGE_EMBED_TEMPLATE.add_field(
+    name="📝 Instructions", 
+    value=f"React with {ACCEPT_EMOJI} to accept or {DECLINE_EMOJI} to decline below.",
+    inline=False
+)
+CHALLENGE_EMBED_TEMPLATE.set_footer(text=f"Match your memory skills! | Game ID: {GAME_ID}")
+
+# Autocomplete choices, built once since category names are fixed and already lowercase
+CATEGORY_CHOICES = tuple(app_commands.Choice(name=cat, value=cat) for cat in EMOJI_CATEGORY_NAMES)
+AVAILABLE_CATEGORIES_TEXT = ", ".join(EMOJI_CATEGORY_NAMES)
+
 async def category_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
     """Provide autocomplete suggestions for emoji categories."""
-    categories = list(EMOJI_CATEGORIES.keys())
+    current = current.lower()
     return [
-        app_commands.Choice(name=cat, value=cat)
-        for cat in categories if current.lower() in cat.lower()
+        choice for choice in CATEGORY_CHOICES if current in choice.value
     ][:25]  # Discord limits to 25 choices
 
 async def setup_challenge_command(bot):
@@ -85,33 +117,25 @@ async def setup_memory_match_commands(bot):
                 await ctx.send(f"{user.mention} already has a pending challenge in this channel.")
                 return
                 
-            # Validate category if provided
-            if category and category.lower() not in EMOJI_CATEGORIES:
-                available_cats = ", ".join(EMOJI_CATEGORIES.keys())
-                await ctx.send(f"Invalid category. Available categories: {available_cats}")
+            # Validate category if provided, names are stored lowercase
+            if category:
+                category = category.lower()
+            if category and category not in EMOJI_CATEGORIES:
+                await ctx.send(f"Invalid category. Available categories: {AVAILABLE_CATEGORIES_TEXT}")
                 return
                 
             # If no category provided, select random one
             if not category:
-                category = random.choice(list(EMOJI_CATEGORIES.keys()))
+                category = random.choice(EMOJI_CATEGORY_NAMES)
             
             # Parse grid size
             rows, cols = 5, 5  # Default
             if grid_size == "4x5":
                 rows, cols = 5, 4  # 4 columns, 5 rows (mobile-friendly)
                 
-            # Create the challenge embed
-            embed = discord.Embed(
-                title="🎮 Memory Match Challenge! 🎮",
-                description=f"💥 {ctx.author.mention} challenges {user.mention} to a Memory Match game with {category} emojis! 💥",
-                color=discord.Color.orange()
-            )
-            embed.add_field(name="⏳ Timeout", value=f"{int(CHALLENGE_TIMEOUT_SECONDS)} seconds", inline=True)
-            embed.add_field(
-                name="📝 Instructions", 
-                value=f"React with {ACCEPT_EMOJI} to accept or {DECLINE_EMOJI} to decline below.",
-                inline=False
-            )
+            # Create the challenge embed from the static template
+            embed = CHALLENGE_EMBED_TEMPLATE.copy()
+            embed.description = f"💥 {ctx.author.mention} challenges {user.mention} to a Memory Match game with {category} emojis! 💥"
             embed.add_field(
                 name="📊 Category", 
                 value=f"{category}",
@@ -123,138 +147,43 @@ async def setup_memory_match_commands(bot):
                 inline=True
             )
             embed.set_thumbnail(url=ctx.author.display_avatar.url)
-            embed.set_footer(text=f"Match your memory skills! | Game ID: {GAME_ID}")
             
             # Send the challenge message
             challenge_msg = await ctx.send(embed=embed)
             
             # Add reaction options
-            await challenge_msg.add_reaction(ACCEPT_EMOJI)
-            await challenge_msg.add_reaction(DECLINE_EMOJI)
+            await asyncio.gather(challenge_msg.add_reaction(ACCEPT_EMOJI), challenge_msg.add_reaction(DECLINE_EMOJI))
             
             # Store the challenge with grid size
-            pending_match_challenges[(user.id, ctx.channel.id)] = (ctx.author, ctx.channel, challenge_msg.id, category, rows, cols)
+            pending_match_challenges[(user.id, ctx.channel.id)] = MatchChallenge(ctx.author, challenge_msg.id, category, rows, cols)
+            track_pending_message(challenge_msg.id, pending_match_challenges, (user.id, ctx.channel.id))
             
             # Set up challenge expiration
-            asyncio.create_task(handle_challenge_expiration((user.id, ctx.channel.id), CHALLENGE_TIMEOUT_SECONDS))
+            handle_challenge_expiration(GAME_ID, (user.id, ctx.channel.id), CHALLENGE_TIMEOUT_SECONDS, challenge_msg.id)
         
-        except Exception as e:
-            logger.error(f"Error creating challenge: {e}")
+        except discord.HTTPException as e:
+            logger.error("Error creating challenge: %s", e)
             await ctx.send("Error creating challenge. Please try again.")
 
     @bot.hybrid_command(name="matching_accept", description="Accept a pending Memory Match challenge")
     async def accept_challenge(ctx):
         """Accept a pending Memory Match challenge."""
-        try:
-            # Check if there's a pending challenge for this user in this channel
-            if (ctx.author.id, ctx.channel.id) not in pending_match_challenges:
-                await ctx.send("You don't have any pending Memory Match challenges in this channel.")
-                return
-            
-            # Check if there's already an active game in this channel
-            if ctx.channel.id in active_games.get(GAME_ID, {}):
-                await ctx.send("There's already an active game in this channel. Finish or end that game first.")
-                
-                # Remove the pending challenge
-                del pending_match_challenges[(ctx.author.id, ctx.channel.id)]
-                return
-                
-            # Get the challenge details
-            challenger, channel, message_id, category, rows, cols = pending_match_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Remove the challenge from pending
-            del pending_match_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Create the game
-            game = MemoryGame(challenger, ctx.author, ctx.channel, category, rows, cols)
-            
-            # Make sure the active_games dictionary is initialized for this game ID
-            if GAME_ID not in active_games:
-                active_games[GAME_ID] = {}
-                
-            # Store the game
-            active_games[GAME_ID][ctx.channel.id] = game
-            
-            # Try to delete the challenge message
-            try:
-                challenge_msg = await ctx.channel.fetch_message(message_id)
-                await challenge_msg.delete()
-            except (discord.errors.NotFound, discord.errors.Forbidden):
-                # Message might have been deleted or we lack permissions
-                pass
-                
-            # Create game view
-            view = GameView(game)
-            
-            # Send initial game state
-            grid_size_info = f"{cols}x{rows}" if rows and cols else "standard"
-            await ctx.send(f"📝 Memory Match Game started: {challenger.mention} vs {ctx.author.mention} with **{category}** emojis ({grid_size_info} grid)\n🎲 **{game.current_player.mention} will go first!**")
-            
-            # Send the main game messages (board and buttons separate)
-            try:
-                board_message, buttons_message = await view.send_initial_messages(ctx.channel)
-            except Exception as e:
-                logger.error(f"Error sending initial game messages: {e}")
-                await ctx.channel.send("Error displaying the game. Please try starting a new game.")
-                # Clean up active game if setup failed critically
-                if ctx.channel.id in active_games[GAME_ID]:
-                    del active_games[GAME_ID][ctx.channel.id]
-                return
-            
-            logger.info(f"Memory Match game started in channel {ctx.channel.id}: {challenger.display_name} vs {ctx.author.display_name} with category {category} and grid size {grid_size_info}")
-            
-        except Exception as e:
-            logger.error(f"Error accepting challenge: {e}")
-            await ctx.send("Error starting game. Please try again.")
+        await accept_matching_challenge(ctx.channel, ctx.author, ctx.send)
 
     @bot.hybrid_command(name="matching_decline", description="Decline a pending Memory Match challenge")
     async def decline_challenge(ctx):
         """Decline a pending Memory Match challenge."""
-        try:
-            # Check if there's a pending challenge for this user in this channel
-            if (ctx.author.id, ctx.channel.id) not in pending_match_challenges:
-                await ctx.send("You don't have any pending Memory Match challenges in this channel.")
-                return
-                
-            # Get the challenge details
-            challenger, channel, message_id, category, rows, cols = pending_match_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Remove the challenge from pending
-            del pending_match_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Create the decline embed
-            embed = discord.Embed(
-                title="Challenge Declined",
-                description=f"{ctx.author.mention} has declined {challenger.mention}'s Memory Match challenge.",
-                color=discord.Color.red()
-            )
-            
-            # Try to edit the original challenge message
-            try:
-                challenge_msg = await ctx.channel.fetch_message(message_id)
-                await challenge_msg.edit(embed=embed)
-                await challenge_msg.clear_reactions()
-            except (discord.errors.NotFound, discord.errors.Forbidden):
-                # Message might have been deleted or we lack permissions
-                # Send a new message instead
-                await ctx.send(embed=embed)
-                
-            logger.info(f"Memory Match challenge declined in channel {ctx.channel.id}: {challenger.display_name} -> {ctx.author.display_name}")
-            
-        except Exception as e:
-            logger.error(f"Error declining challenge: {e}")
-            await ctx.send("Error declining challenge. Please try again.")
+        await decline_matching_challenge(ctx.channel, ctx.author, ctx.send)
 
     @bot.hybrid_command(name="matching_end", description="End the current Memory Match game in this channel")
     async def end_game(ctx):
         """End the current Memory Match game in this channel."""
         try:
             # Check if there's an active game in this channel
-            if ctx.channel.id not in active_games.get(GAME_ID, {}):
+            game = active_games.get(GAME_ID, {}).get(ctx.channel.id)
+            if game is None:
                 await ctx.send("There's no active Memory Match game in this channel.")
                 return
-                
-            game = active_games[GAME_ID][ctx.channel.id]
             
             # Check if the user is one of the players
             if ctx.author.id != game.player1.id and ctx.author.id != game.player2.id:
@@ -271,7 +200,7 @@ async def setup_memory_match_commands(bot):
             embed = discord.Embed(
                 title="End Game Confirmation",
                 description=f"{ctx.author.mention} wants to end the current Memory Match game.",
-                color=discord.Color.gold()
+                color=COLOR_GOLD
             )
             
             # Add reactions for confirmation
@@ -284,197 +213,19 @@ async def setup_memory_match_commands(bot):
             confirmation_msg = await ctx.send(embed=embed)
             
             # Add reaction options
-            await confirmation_msg.add_reaction(ACCEPT_EMOJI)
-            await confirmation_msg.add_reaction(DECLINE_EMOJI)
+            await asyncio.gather(confirmation_msg.add_reaction(ACCEPT_EMOJI), confirmation_msg.add_reaction(DECLINE_EMOJI))
             
             # Store the confirmation request
-            end_match_confirmations[confirmation_id] = {
-                'channel_id': ctx.channel.id,
-                'requester': ctx.author,
-                'opponent': opponent,
-                'message_id': confirmation_msg.id,
-                'opponent_id': opponent.id
-            }
+            end_match_confirmations[confirmation_id] = PendingConfirmation(ctx.channel.id, ctx.author, opponent, confirmation_msg.id)
+            track_pending_message(confirmation_msg.id, end_match_confirmations, confirmation_id)
             
             # Set up confirmation expiration
-            asyncio.create_task(handle_confirmation_expiration(confirmation_id, CHALLENGE_TIMEOUT_SECONDS))
+            handle_confirmation_expiration(GAME_ID, confirmation_id, CHALLENGE_TIMEOUT_SECONDS, confirmation_msg.id)
             
-        except Exception as e:
-            logger.error(f"Error processing end game request: {e}")
+        except discord.HTTPException as e:
+            logger.error("Error processing end game request: %s", e)
             await ctx.send("Error processing end game request. Please try again.")
 
-    # React to emojis for accepting/declining challenges
-    @bot.event
-    async def on_reaction_add(reaction, user):
-        try:
-            # Ignore bot's own reactions
-            if user.bot:
-                return
-                
-            message = reaction.message
-            channel = message.channel
-            emoji = str(reaction.emoji)
-            
-            # Check pending match challenges first
-            for (target_id, channel_id), (challenger, challenge_channel, message_id, category, rows, cols) in list(pending_match_challenges.items()):
-                if message.id == message_id and user.id == target_id:
-                    if channel_id != channel.id:
-                        continue
-                        
-                    # Check if accepting or declining
-                    if emoji == ACCEPT_EMOJI:
-                        # Remove the challenge to prevent duplicate processing
-                        if (target_id, channel_id) in pending_match_challenges:
-                            del pending_match_challenges[(target_id, channel_id)]
-                            
-                        # Create the game
-                        game = MemoryGame(challenger, user, channel, category, rows, cols)
-                        
-                        # Make sure the active_games dictionary is initialized for this game ID
-                        if GAME_ID not in active_games:
-                            active_games[GAME_ID] = {}
-                            
-                        # Store the game
-                        active_games[GAME_ID][channel.id] = game
-                        
-                        # Try to delete the challenge message
-                        try:
-                            await message.delete()
-                        except discord.errors.NotFound:
-                            pass
-                            
-                        # Create game view
-                        view = GameView(game)
-                        
-                        # Send initial game state
-                        grid_size_info = f"{cols}x{rows}" if rows and cols else "standard"
-                        await channel.send(f"📝 Memory Match Game started: {challenger.mention} vs {user.mention} with **{category}** emojis ({grid_size_info} grid)\n🎲 **{game.current_player.mention} will go first!**")
-                        
-                        # Send the main game messages (board and buttons separate)
-                        try:
-                            board_message, buttons_message = await view.send_initial_messages(channel)
-                        except Exception as e:
-                            logger.error(f"Error sending initial game messages: {e}")
-                            await channel.send("Error displaying the game. Please try starting a new game.")
-                            # Clean up active game if setup failed
-                            if channel.id in active_games[GAME_ID]:
-                                del active_games[GAME_ID][channel.id]
-                            return
-                        
-                        logger.info(f"Memory Match game started in channel {channel.id}: {challenger.display_name} vs {user.display_name} with category {category} and grid size {grid_size_info}")
-                        return
-                        
-                    elif emoji == DECLINE_EMOJI:
-                        # Remove the challenge from pending
-                        if (target_id, channel_id) in pending_match_challenges:
-                            del pending_match_challenges[(target_id, channel_id)]
-                        
-                        # Create the decline embed
-                        embed = discord.Embed(
-                            title="Challenge Declined",
-                            description=f"{user.mention} has declined {challenger.mention}'s Memory Match challenge.",
-                            color=discord.Color.red()
-                        )
-                        
-                        # Edit the original challenge message
-                        try:
-                            await message.edit(embed=embed)
-                            await message.clear_reactions()
-                        except discord.errors.NotFound:
-                            pass
-                            
-                        logger.info(f"Memory Match challenge declined in channel {channel.id}: {challenger.display_name} -> {user.display_name}")
-                        return
-            
-            # Check end game confirmations
-            for confirmation_id, data in list(end_match_confirmations.items()):
-                if message.id == data['message_id'] and user.id == data['opponent_id']:
-                    channel_id = data['channel_id']
-                    requester = data['requester']
-                    
-                    if channel.id != channel_id:
-                        continue
-                    
-                    # Check if accepting or declining end request
-                    if emoji == ACCEPT_EMOJI:
-                        # Check if the game still exists
-                        if channel.id in active_games.get(GAME_ID, {}):
-                            game = active_games[GAME_ID][channel.id]
-                            
-                            # Mark the game as over
-                            game.game_over = True
-                            
-                            # Create game end embed
-                            embed = discord.Embed(
-                                title="Memory Match Game Ended",
-                                description=f"Game between {game.player1.mention} and {game.player2.mention} has ended by agreement.",
-                                color=discord.Color.gold()
-                            )
-                            
-                            # Add final scores
-                            embed.add_field(
-                                name="Final Scores", 
-                                value=f"{game.player1.display_name}: {game.scores.get(game.player1.id, 0)}\n{game.player2.display_name}: {game.scores.get(game.player2.id, 0)}",
-                                inline=True
-                            )
-                            
-                            embed.set_footer(text=f"Game ended by {requester.display_name} with {user.display_name}'s agreement")
-                            
-                            # Send the game end message
-                            await channel.send(embed=embed)
-                            
-                            # Delete the buttons message if it exists
-                            if hasattr(game, 'buttons_message') and game.buttons_message:
-                                try:
-                                    await game.buttons_message.delete()
-                                except:
-                                    pass
-                            
-                            # Update the board to show the final state
-                            await game.update_board("Game ended by agreement")
-                            
-                            # Remove the game from active games
-                            del active_games[GAME_ID][channel.id]
-                            
-                            logger.info(f"Memory Match game ended in channel {channel.id} by agreement")
-                            
-                        # Remove the confirmation
-                        if confirmation_id in end_match_confirmations:
-                            del end_match_confirmations[confirmation_id]
-                            
-                        # Try to delete the confirmation message
-                        try:
-                            await message.delete()
-                        except discord.errors.NotFound:
-                            pass
-                            
-                        return
-                        
-                    elif emoji == DECLINE_EMOJI:
-                        # Create the decline embed
-                        embed = discord.Embed(
-                            title="End Game Request Declined",
-                            description=f"{user.mention} wants to continue playing.",
-                            color=discord.Color.green()
-                        )
-                        
-                        # Edit the original confirmation message
-                        try:
-                            await message.edit(embed=embed)
-                            await message.clear_reactions()
-                        except discord.errors.NotFound:
-                            pass
-                            
-                        # Remove the confirmation
-                        if confirmation_id in end_match_confirmations:
-                            del end_match_confirmations[confirmation_id]
-                            
-                        logger.info(f"End game request declined in channel {channel.id}")
-                        return
-                        
-        except Exception as e:
-            logger.error(f"Error handling reaction: {e}")
-
     # Register the Memory Match commands with the bot
     return {
         "matching_game": challenge,
@@ -483,6 +234,102 @@ async def setup_memory_match_commands(bot):
         "matching_end": end_game
     }
 
+async def accept_matching_challenge(channel, user, send=None):
+    """
+    Accept a pending Memory Match challenge and start the game.
+    
+    Args:
+        channel: The channel the challenge was made in
+        user: The challenged user
+        send: Coroutine used for replies (defaults to channel.send)
+    """
+    # Without a command to reply to, the start announcement is sent together with the board
+    announce = send
+    send = send or channel.send
+    
+    try:
+        # Remove the challenge from pending, a concurrent accept or decline may already have taken it
+        challenge = pending_match_challenges.pop((user.id, channel.id), None)
+        if challenge is None:
+            await send("You don't have any pending Memory Match challenges in this channel.")
+            return
+        
+        # Check if there's already an active game in this channel
+        if channel.id in active_games.get(GAME_ID, {}):
+            await send("There's already an active game in this channel. Finish or end that game first.")
+            return
+            
+        # Get the challenge details
+        challenger, message_id = challenge.challenger, challenge.message_id
+        category, rows, cols = challenge.category, challenge.rows, challenge.cols
+        
+        # Try to delete the challenge message
+        try:
+            challenge_msg = channel.get_partial_message(message_id)
+            await challenge_msg.delete()
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            # Message might have been deleted or we lack permissions
+            pass
+            
+        # Create the game and send its initial state
+        grid_size_info = f"{cols}x{rows}" if rows and cols else "standard"
+        game = await start_memory_game(
+            channel, challenger, user, category, rows, cols,
+            f"📝 Memory Match Game started: {challenger.mention} vs {user.mention} with **{category}** emojis ({grid_size_info} grid)",
+            announce
+        )
+        if game is None:
+            return
+        
+        logger.info("Memory Match game started in channel %s: %s vs %s with category %s and grid size %s", channel.id, challenger.display_name, user.display_name, category, grid_size_info)
+        
+    except discord.HTTPException as e:
+        logger.error("Error accepting challenge: %s", e)
+        await send("Error starting game. Please try again.")
+
+async def decline_matching_challenge(channel, user, send=None):
+    """
+    Decline a pending Memory Match challenge.
+    
+    Args:
+        channel: The channel the challenge was made in
+        user: The challenged user
+        send: Coroutine used for replies (defaults to channel.send)
+    """
+    send = send or channel.send
+    
+    try:
+        # Remove the challenge from pending, a concurrent accept or decline may already have taken it
+        challenge = pending_match_challenges.pop((user.id, channel.id), None)
+        if challenge is None:
+            await send("You don't have any pending Memory Match challenges in this channel.")
+            return
+            
+        # Get the challenge details
+        challenger, message_id = challenge.challenger, challenge.message_id
+        
+        # Create the decline embed
+        embed = discord.Embed(
+            title="Challenge Declined",
+            description=f"{user.mention} has declined {challenger.mention}'s Memory Match challenge.",
+            color=COLOR_RED
+        )
+        
+        # Try to edit the original challenge message
+        try:
+            challenge_msg = channel.get_partial_message(message_id)
+            await edit_and_clear_reactions(challenge_msg, embed=embed)
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            # Message might have been deleted or we lack permissions
+            # Send a new message instead
+            await send(embed=embed)
+            
+        logger.info("Memory Match challenge declined in channel %s: %s -> %s", channel.id, challenger.display_name, user.display_name)
+        
+    except discord.HTTPException as e:
+        logger.error("Error declining challenge: %s", e)
+        await send("Error declining challenge. Please try again.")
+
 async def end_memory_match_game_internal(channel, game, ended_by=None, reason="Game ended."):
     """End a Memory Match game and clean up resources.
     
@@ -499,12 +346,13 @@ async def end_memory_match_game_internal(channel, game, ended_by=None, reason="G
         
         # Mark the game as over
         game.game_over = True
+        game.invalidate_board_display()
         
         # Create game end embed
         embed = discord.Embed(
             title="Memory Match Game Ended",
             description=f"Game between {game.player1.mention} and {game.player2.mention} has ended.",
-            color=discord.Color.gold()
+            color=COLOR_GOLD
         )
         
         embed.add_field(
@@ -515,7 +363,7 @@ async def end_memory_match_game_internal(channel, game, ended_by=None, reason="G
         
         embed.add_field(
             name="Final Scores", 
-            value=f"{game.player1.display_name}: {game.scores.get(game.player1.id, 0)}\n{game.player2.display_name}: {game.scores.get(game.player2.id, 0)}",
+            value=game.format_scores(),
             inline=True
         )
         
@@ -536,16 +384,15 @@ async def end_memory_match_game_internal(channel, game, ended_by=None, reason="G
         await game.update_board("Game Over - Ended manually")
         
         # Remove the game from active games
-        del active_games[GAME_ID][channel.id]
+        active_games.get(GAME_ID, {}).pop(channel.id, None)
         
-        logger.info(f"Memory Match game ended in channel {channel.id}: {reason}")
+        logger.info("Memory Match game ended in channel %s: %s", channel.id, reason)
         
     except Exception as e:
-        logger.error(f"Error ending Memory Match game: {e}")
+        logger.error("Error ending Memory Match game: %s", e)
         # Try to remove the game from active games
         try:
-            if GAME_ID in active_games and channel.id in active_games[GAME_ID]:
-                del active_games[GAME_ID][channel.id]
+            active_games.get(GAME_ID, {}).pop(channel.id, None)
         except:
             pass 
 
@@ -5,7 +5,6 @@ import random
 import discord
 import asyncio
 import logging
-import traceback
 import time
 
 # Import from new folder structure
@@ -15,10 +14,16 @@ from common.utils.game_utils import update_database_with_game_results
 
 logger = logging.getLogger("discord_bot")
 
+# Embed colours, created once and shared by every embed
+COLOR_BLUE = discord.Color.blue()
+
 GAME_ID = "1001" # Define Game ID for database logging
+JOKER_EMOJI = "🃏" # Unpaired card dealt when the grid has an odd number of cells
 
 class EmojiCard:
     """Represents a single emoji card in the game."""
+    __slots__ = ("emoji", "position", "is_matched", "is_revealed", "is_joker")
+    
     def __init__(self, emoji, position, is_joker=False):
         self.emoji = emoji
         self.position = position  # (row, col) tuple
@@ -40,16 +45,22 @@ class MemoryGame:
         self.player2 = player2
         self.channel = channel
         self.category = category
-        # Randomly select the first player
-        self.current_player = random.choice([player1, player2])
+        # Randomly select the first player, current_player is read off the turn index
+        self._players = (player1, player2)
+        self._turn_idx = random.randrange(2)
         self.board = []
         self.selected_this_turn = [] # List of (row, col) for current turn's selections
         self.scores = {player1.id: 0, player2.id: 0}
+        self._score_diff = 0 # Player 1's score minus player 2's, kept up to date by _add_point
         self.matched_pairs_count = 0
         self.game_over = False
         self.winner = None
         self.board_message_id = None # To store the ID of the game board message
-        self.last_activity_time = time.time() # For AFK tracking
+        self._board_cache = None # Rendered board text, cleared whenever a card or game_over changes
+        self._board_edit_in_flight = False # True while update_board is sending an edit
+        self._pending_board_render = None # Future for the update requested during that edit, resolved once it's sent
+        self._queued_board_status = None
+        self.last_activity_time = time.monotonic() # For AFK tracking
 
         # Use provided rows/columns, or default from config
         self.rows = rows if rows is not None else ROWS
@@ -66,21 +77,30 @@ class MemoryGame:
         self.target_score_to_win_5x5 = 7 if self.is_5x5_grid else None
 
         self._initialize_board()
-        logger.info(f"Memory Match game ({self.rows}x{self.columns}) created between {player1.display_name} and {player2.display_name} in category {category}")
+        
+        # Board embed, built once and updated in place by get_board_embed
+        self._embed = discord.Embed(
+            title=f"Memory Match - {self.category.capitalize()}", 
+            color=COLOR_BLUE
+        )
+        self._embed.add_field(name="Scores", value="", inline=True)
+        self._embed.add_field(name="Current Turn", value="", inline=True)
+        
+        logger.info("Memory Match game (%sx%s) created between %s and %s in category %s", self.rows, self.columns, player1.display_name, player2.display_name, category)
     
     def _initialize_board(self):
         """Generates the game board with shuffled emoji pairs."""
         try:
             # Validate the category
             if self.category not in EMOJI_CATEGORIES:
-                logger.error(f"Invalid emoji category: {self.category}")
+                logger.error("Invalid emoji category: %s", self.category)
                 raise ValueError(f"Invalid category: {self.category}")
             
             available_emojis = EMOJI_CATEGORIES[self.category]
             
             # Ensure we have enough unique emojis
             if len(available_emojis) < self.pairs_to_find:
-                logger.error(f"Not enough unique emojis in category '{self.category}' for a {self.rows}x{self.columns} grid needing {self.pairs_to_find} pairs.")
+                logger.error("Not enough unique emojis in category '%s' for a %sx%s grid needing %s pairs.", self.category, self.rows, self.columns, self.pairs_to_find)
                 # Fallback or raise error - for now, this might lead to issues if not handled upstream
                 # This should ideally be checked before game creation if possible.
                 # For now, let the game proceed, it might repeat emojis if too few.
@@ -91,91 +111,109 @@ class MemoryGame:
             
             # Add joker card if needed
             if self.include_joker:
-                joker_emoji = "🃏"
-                emojis_for_game.append(joker_emoji)
+                emojis_for_game.append(JOKER_EMOJI)
             
+            # A single shuffle deals the pairs and the joker in random order
             random.shuffle(emojis_for_game)
             
             # Distribute emojis onto the board
-            # The board is a list of lists (rows containing columns)
-            self.board = [[None for _ in range(self.columns)] for _ in range(self.rows)]
-            temp_emojis = list(emojis_for_game) # Create a mutable copy
-            random.shuffle(temp_emojis)
+            # The board is a flat list in row order, the card at (row, col) is at row * columns + col
+            self.board = [None] * self.num_cards
             
-            card_idx = 0
-            for r in range(self.rows):
-                for c in range(self.columns):
-                    if card_idx < len(temp_emojis):
-                        self.board[r][c] = EmojiCard(temp_emojis[card_idx], (r, c))
-                        card_idx += 1
-                    else: # Should not happen if num_cards matches len(temp_emojis)
-                        self.board[r][c] = None 
+            # Any cells past the last emoji stay None, which should not happen if num_cards matches len(emojis_for_game)
+            for card_idx, emoji in enumerate(emojis_for_game[:self.num_cards]):
+                self.board[card_idx] = EmojiCard(emoji, divmod(card_idx, self.columns), emoji == JOKER_EMOJI)
             
-            logger.info(f"Created board with {self.rows}x{self.columns} grid, {len(emojis_for_game)} emoji pairs, and {('1 joker card' if self.include_joker else 'no joker card')}")
+            logger.info("Created board with %sx%s grid, %s emoji pairs, and %s", self.rows, self.columns, len(emojis_for_game), '1 joker card' if self.include_joker else 'no joker card')
         except Exception as e:
-            logger.error(f"Error in _initialize_board: {e}\n{traceback.format_exc()}")
+            logger.error("Error in _initialize_board: %s", e, exc_info=True)
             raise
     
     def get_card(self, row, col):
         """Gets the card at the specified position."""
         try:
             if 0 <= row < self.rows and 0 <= col < self.columns:
-                return self.board[row][col]
-            logger.warning(f"Attempted to get card at invalid position: ({row},{col})")
+                return self.board[row * self.columns + col]
+            logger.warning("Attempted to get card at invalid position: (%s,%s)", row, col)
             return None
         except Exception as e:
-            logger.error(f"Error in get_card at ({row},{col}): {e}")
+            logger.error("Error in get_card at (%s,%s): %s", row, col, e)
             return None
     
+    def format_scores(self):
+        """Return both players' scores, one per line."""
+        player1, player2, scores = self.player1, self.player2, self.scores
+        return f"{player1.display_name}: {scores.get(player1.id, 0)}\n{player2.display_name}: {scores.get(player2.id, 0)}"
+    
     def get_board_embed(self, game_status_message=""):
-        """Get an embed displaying the current game board."""
-        # Create a Discord embed with the current board state
-        embed = discord.Embed(
-            title=f"Memory Match - {self.category.capitalize()}", 
-            color=discord.Color.blue()
-        )
-        
-        # Set the board display
-        board_display = self._get_board_display()
-        embed.description = board_display
+        """
+        Get an embed displaying the current game board.
         
-        # Add player scores
-        score1 = self.scores.get(self.player1.id, 0)
-        score2 = self.scores.get(self.player2.id, 0)
+        The same embed is returned on every call, updated to the current state,
+        so it should be sent right away rather than kept.
+        """
+        embed = self._embed
         
-        embed.add_field(
-            name="Scores",
-            value=f"{self.player1.display_name}: {score1}\n{self.player2.display_name}: {score2}",
-            inline=True
-        )
+        # Set the board display
+        embed.description = self._get_board_display()
         
-        # Add current turn
-        embed.add_field(
-            name="Current Turn",
-            value=f"@{self.current_player.display_name}",
-            inline=True
-        )
+        # Update player scores and current turn
+        embed.set_field_at(0, name="Scores", value=self.format_scores(), inline=True)
+        embed.set_field_at(1, name="Current Turn", value=f"@{self.current_player.display_name}", inline=True)
         
-        # Add game over message if relevant
+        # Add game over message if relevant, the field is only added once
         if self.game_over:
             if self.winner:
                 result = f"🏆 {self.winner.display_name} wins!"
             else:
                 result = "🤝 It's a tie!"
             
-            embed.add_field(
-                name="Result",
-                value=result,
-                inline=True
-            )
+            if len(embed.fields) > 2:
+                embed.set_field_at(2, name="Result", value=result, inline=True)
+            else:
+                embed.add_field(name="Result", value=result, inline=True)
         
         if game_status_message:
             embed.set_footer(text=game_status_message)
+        else:
+            embed.remove_footer()
         
         return embed
     
     async def update_board(self, status_message=None, reveal_all=False):
-        """Updates the board message with the current game state."""
+        """
+        Updates the board message with the current game state.
+        
+        Updates requested while an edit is in flight are coalesced, only the latest one is
+        sent once that edit finishes. Every caller waits for the edit that covers its request,
+        so the board state it asked for is rendered before it moves on.
+        """
+        if self._board_edit_in_flight:
+            self._queued_board_status = status_message
+            if self._pending_board_render is None:
+                self._pending_board_render = asyncio.get_running_loop().create_future()
+            # Shield it so one cancelled caller doesn't cancel the render for the others
+            await asyncio.shield(self._pending_board_render)
+            return
+        
+        self._board_edit_in_flight = True
+        try:
+            await self._edit_board(status_message)
+            while self._pending_board_render is not None:
+                pending, self._pending_board_render = self._pending_board_render, None
+                try:
+                    await self._edit_board(self._queued_board_status)
+                finally:
+                    pending.set_result(None)
+        finally:
+            self._board_edit_in_flight = False
+            # Don't leave anyone waiting if this task was cancelled before sending their update
+            if self._pending_board_render is not None:
+                self._pending_board_render.set_result(None)
+                self._pending_board_render = None
+    
+    async def _edit_board(self, status_message=None):
+        """Render the board and edit it into the board message, sending a new one if needed."""
         try:
             embed = self.get_board_embed(status_message)
             
@@ -186,15 +224,14 @@ class MemoryGame:
                     logger.debug("Board message updated successfully (using board_message reference)")
                     return
                 except Exception as e:
-                    logger.error(f"Error updating board_message: {e}")
+                    logger.error("Error updating board_message: %s", e)
                     # Fall back to board_message_id method
             
-            # If we have a message ID but no direct object, try to fetch and update
+            # If we have a message ID but no direct object, edit it through a partial message
             if self.board_message_id:
                 try:
-                    channel = self.channel
-                    message = await channel.fetch_message(self.board_message_id)
-                    await message.edit(embed=embed)
+                    # Editing returns the full message, so there's nothing to fetch first
+                    message = await self.channel.get_partial_message(self.board_message_id).edit(embed=embed)
                     # Update the direct reference too
                     self.board_message = message
                     logger.debug("Board message updated successfully (using board_message_id)")
@@ -204,14 +241,14 @@ class MemoryGame:
                     self.board_message_id = message.id
                     self.board_message = message
                 except Exception as e:
-                    logger.error(f"Error updating board message: {e}\n{traceback.format_exc()}")
+                    logger.error("Error updating board message: %s", e, exc_info=True)
                     # Try to send a new message if update fails
                     try:
                         message = await self.channel.send(embed=embed)
                         self.board_message_id = message.id
                         self.board_message = message
                     except Exception as e2:
-                        logger.error(f"Failed to create new board message after update error: {e2}")
+                        logger.error("Failed to create new board message after update error: %s", e2)
             else:
                 try:
                     message = await self.channel.send(embed=embed)
@@ -219,10 +256,10 @@ class MemoryGame:
                     self.board_message = message
                     logger.debug("New board message created")
                 except Exception as e:
-                    logger.error(f"Error creating board message: {e}\n{traceback.format_exc()}")
+                    logger.error("Error creating board message: %s", e, exc_info=True)
                     raise
         except Exception as e:
-            logger.error(f"Error in update_board: {e}\n{traceback.format_exc()}")
+            logger.error("Error in update_board: %s", e, exc_info=True)
     
     async def make_move(self, row1, col1, row2, col2, player):
         """Process a player's move selecting two cards.
@@ -237,7 +274,7 @@ class MemoryGame:
 
             # Validate player's turn
             if player.id != self.current_player.id:
-                logger.warning(f"Player {player.display_name} tried to move out of turn")
+                logger.warning("Player %s tried to move out of turn", player.display_name)
                 return False, "It's not your turn!", False
             
             # Validate card positions
@@ -245,7 +282,7 @@ class MemoryGame:
             card2 = self.get_card(row2, col2)
             
             if not card1 or not card2:
-                logger.warning(f"Invalid card selection: ({row1},{col1}), ({row2},{col2})")
+                logger.warning("Invalid card selection: (%s,%s), (%s,%s)", row1, col1, row2, col2)
                 return False, "Invalid card selection.", False
             
             if card1.is_matched or card2.is_matched:
@@ -256,7 +293,7 @@ class MemoryGame:
                 # This check should ideally be caught by UI
                 return False, "You selected the same card twice.", False
 
-            logger.info(f"{player.display_name} evaluating pair: ({row1+1},{col1+1}) and ({row2+1},{col2+1})")
+            logger.info("%s evaluating pair: (%s,%s) and (%s,%s)", player.display_name, row1+1, col1+1, row2+1, col2+1)
             
             # Cards are assumed to be already revealed by the UI calling this method.
             # No need to set card1.is_revealed or card2.is_revealed here.
@@ -264,33 +301,36 @@ class MemoryGame:
 
             result_message_key = ""
             current_move_matched = False
+            
+            # Every outcome below matches or hides cards
+            self.invalidate_board_display()
 
             # Check for Joker card
-            if self.include_joker and (card1.emoji == "🃏" or card2.emoji == "🃏"):
-                joker_card = card1 if card1.emoji == "🃏" else card2
-                other_card = card2 if card1.emoji == "🃏" else card1
+            if card1.is_joker or card2.is_joker:
+                joker_card = card1 if card1.is_joker else card2
+                other_card = card2 if card1.is_joker else card1
                 
                 joker_card.is_matched = True
                 # other_card remains as is, not matched by the joker
-                self.scores[player.id] += 1 
+                self._add_point(player)
                 self.matched_pairs_count += 0.5 # Joker counts as half a pair for completion tracking
                 
                 result_message_key = "Joker"
                 current_move_matched = True # Joker find counts as a successful move for turn continuation
-                logger.info(f"{player.display_name} found the joker card! Score: {self.scores[player.id]}")
+                logger.info("%s found the joker card! Score: %s", player.display_name, self.scores[player.id])
             
             # Check for a normal match
             elif card1.emoji == card2.emoji:
                 card1.is_matched = True
                 card2.is_matched = True
-                self.scores[player.id] += 1
+                self._add_point(player)
                 self.matched_pairs_count += 1
                 result_message_key = "Match"
                 current_move_matched = True
-                logger.info(f"{player.display_name} found a match! Score: {self.scores[player.id]}")
+                logger.info("%s found a match! Score: %s", player.display_name, self.scores[player.id])
             else:
                 # No match
-                logger.info(f"{player.display_name} found no match.")
+                logger.info("%s found no match.", player.display_name)
                 result_message_key = "No Match"
                 
                 # Explicitly set the cards to not revealed in the game state
@@ -302,59 +342,49 @@ class MemoryGame:
                 # This ensures it always happens even if there are errors elsewhere
                 old_player = self.current_player
                 self._switch_turn()
-                logger.info(f"Turn explicitly switched from {old_player.display_name} to {self.current_player.display_name}")
+                logger.info("Turn explicitly switched from %s to %s", old_player.display_name, self.current_player.display_name)
                 
-                self.last_activity_time = time.time()
+                self.last_activity_time = time.monotonic()
                 game_just_ended_by_this_move = False
 
             # Check for game end conditions (applies after joker, match, or no match)
+            player_score = self.scores[player.id]
+            all_pairs_found = self.matched_pairs_count >= self.pairs_to_find
+            
             # 5x5 grid win conditions
             if self.is_5x5_grid:
-                if self.scores[player.id] >= self.target_score_to_win_5x5:
+                if player_score >= self.target_score_to_win_5x5:
                     self.winner = player
                     result_message_key = f"Game Over - {player.display_name} wins by reaching {self.target_score_to_win_5x5} pairs!"
                     game_just_ended_by_this_move = True
-                elif self.matched_pairs_count >= self.pairs_to_find: # All pairs found
+                elif all_pairs_found: # All pairs found
                     # Determine winner based on scores
-                    score1 = self.scores[self.player1.id]
-                    score2 = self.scores[self.player2.id]
-                    if score1 > score2:
-                        self.winner = self.player1
-                        result_message_key = f"Game Over - {self.player1.display_name} wins!"
-                    elif score2 > score1:
-                        self.winner = self.player2
-                        result_message_key = f"Game Over - {self.player2.display_name} wins!"
+                    self.winner = self._leader()
+                    if self.winner:
+                        result_message_key = f"Game Over - {self.winner.display_name} wins!"
                     else: # Tie
-                        self.winner = None
                         result_message_key = "Game Over - It's a Tie!"
                     game_just_ended_by_this_move = True
             # 4x5 grid win conditions
             elif self.is_4x5_grid:
-                if self.scores[player.id] >= self.target_score_to_win_4x5:
+                if player_score >= self.target_score_to_win_4x5:
                     self.winner = player
                     result_message_key = f"Game Over - {player.display_name} wins by reaching {self.target_score_to_win_4x5} pairs!"
                     game_just_ended_by_this_move = True
-                elif self.matched_pairs_count >= self.pairs_to_find: # All 10 pairs found (or 9.5 with joker)
+                elif all_pairs_found: # All 10 pairs found (or 9.5 with joker)
                     # Recalculate winner based on scores as target wasn't hit directly by this player
-                    score1 = self.scores[self.player1.id]
-                    score2 = self.scores[self.player2.id]
-                    if score1 == 5 and score2 == 5: # Specific 5-5 tie for 4x5
+                    self.winner = self._leader()
+                    if self.winner:
+                        result_message_key = f"Game Over - {self.winner.display_name} wins!"
+                    elif self.scores[self.player1.id] == 5: # Specific 5-5 tie for 4x5
                         result_message_key = "Game Over - It's a 5-5 Tie!"
-                        self.winner = None
-                    elif score1 > score2:
-                        self.winner = self.player1
-                        result_message_key = f"Game Over - {self.player1.display_name} wins!"
-                    elif score2 > score1:
-                        self.winner = self.player2
-                        result_message_key = f"Game Over - {self.player2.display_name} wins!"
                     else: # Should be caught by 5-5 tie, but as a fallback for general tie
-                        self.winner = None
                         result_message_key = "Game Over - It's a Tie!"
                     game_just_ended_by_this_move = True
             
             # Default win condition for other grid sizes
-            elif not game_just_ended_by_this_move and self.matched_pairs_count >= self.pairs_to_find:
-                self.winner = self.get_winner() # Determine winner by general score comparison
+            elif not game_just_ended_by_this_move and all_pairs_found:
+                self.winner = self._leader() # Determine winner by general score comparison
                 if self.winner:
                     result_message_key = f"Game Over - {self.winner.display_name} wins! All pairs found."
                 else:
@@ -363,23 +393,29 @@ class MemoryGame:
 
             if game_just_ended_by_this_move:
                 self.game_over = True
-                final_scores_msg = f"Final Scores: {self.player1.display_name}={self.scores[self.player1.id]}, {self.player2.display_name}={self.scores[self.player2.id]}"
-                logger.info(f"Game over! {result_message_key} {final_scores_msg}")
+                self.invalidate_board_display()
+                player1, player2 = self.player1, self.player2
+                score1, score2 = self.scores[player1.id], self.scores[player2.id]
+                final_scores_msg = f"Final Scores: {player1.display_name}={score1}, {player2.display_name}={score2}"
+                logger.info("Game over! %s %s", result_message_key, final_scores_msg)
                 
-                # Update database with game results
-                await update_database_with_game_results(
-                    game_id=GAME_ID,
-                    player1_id=self.player1.id,
-                    player2_id=self.player2.id,
-                    winner_id=self.winner.id if self.winner else None,
-                    score_player1=self.scores[self.player1.id],
-                    score_player2=self.scores[self.player2.id],
-                    channel_id=self.channel.id
-                )
+                # Update database with game results and show the final board at the same time,
+                # both handle their own errors
                 # The UI layer will handle the final user-facing message and "Play Again" button.
                 # This method just signals game end and the outcome.
-                # However, let's update the internal board embed to a final state for completeness.
-                await self.update_board(status_message=f"{result_message_key} {final_scores_msg}")
+                await asyncio.gather(
+                    update_database_with_game_results(
+                        game_id=GAME_ID,
+                        player1_id=player1.id,
+                        player2_id=player2.id,
+                        winner_id=self.winner.id if self.winner else None,
+                        score_player1=score1,
+                        score_player2=score2,
+                        channel_id=self.channel.id
+                    ),
+                    # Render the final state directly rather than queueing behind an edit in flight
+                    self._edit_board(status_message=f"{result_message_key} {final_scores_msg}")
+                )
                 return True, result_message_key, True
 
             # If game continues and wasn't a match, we already switched turns above
@@ -387,7 +423,7 @@ class MemoryGame:
             return True, result_message_key, False
 
         except Exception as e:
-            logger.error(f"Error in make_move: {e}\n{traceback.format_exc()}")
+            logger.error("Error in make_move: %s", e, exc_info=True)
             return False, f"An error occurred: {type(e).__name__}", False
     
     def _check_game_over(self):
@@ -400,51 +436,69 @@ class MemoryGame:
         # This condition implies all cards are matched if game_over wasn't set by target scores.
         return self.matched_pairs_count >= self.pairs_to_find
     
+    @property
+    def current_player(self):
+        """The player whose turn it is."""
+        return self._players[self._turn_idx]
+    
     def _switch_turn(self):
         """Switches the turn to the other player."""
-        self.current_player = self.player2 if self.current_player == self.player1 else self.player1
+        self._turn_idx ^= 1
+    
+    def _add_point(self, player):
+        """Give a player a point and update the running score difference."""
+        self.scores[player.id] += 1
+        self._score_diff += 1 if player.id == self.player1.id else -1
+    
+    def _leader(self):
+        """Return the player with the higher score, or None if the scores are level."""
+        if self._score_diff > 0:
+            return self.player1
+        if self._score_diff < 0:
+            return self.player2
+        return None
     
     def get_winner(self):
         """Determine the winner based on scores. Returns winning player object or None for a tie."""
         if self.game_over: # Ensure game is actually over before declaring winner based on final scores
-            score1 = self.scores.get(self.player1.id, 0)
-            score2 = self.scores.get(self.player2.id, 0)
-            
-            if score1 > score2:
-                return self.player1
-            elif score2 > score1:
-                return self.player2
-            else: # Tie
-                return None
+            return self._leader()
         return self.winner # If winner was already set by specific conditions (e.g., 4x5 target score)
     
+    def invalidate_board_display(self):
+        """Drop the rendered board text, call after changing a card's state or game_over."""
+        self._board_cache = None
+    
     def _get_board_display(self):
         """Generates a text representation of the game board."""
+        if self._board_cache is not None:
+            return self._board_cache
+        
         # Simplified display without grid lines
         
         # Start with an empty line for better Discord rendering
-        board_str = "\n"
+        parts = ["```\n\n"]
         
         # Header row (column numbers)
-        board_str += "     "  # Space for row labels 
-        for c in range(self.columns):
-            board_str += f"{c+1}   "  # Column numbers with spacing
-            
-        board_str += "\n\n"  # Extra line for spacing
+        parts.append("     ")  # Space for row labels
+        parts.extend(f"{c+1}   " for c in range(self.columns))  # Column numbers with spacing
+        parts.append("\n\n")  # Extra line for spacing
         
         # Add each row without cell borders
         for r in range(self.rows):
             # Row number
-            board_str += f" {r+1}  "
+            parts.append(f" {r+1}  ")
             
             # Add each cell
+            row_base = r * self.columns
             for c in range(self.columns):
-                card = self.board[r][c]
+                card = self.board[row_base + c]
                 # Display card based on its state; only force reveal if game is over
                 display = " " if card is None else card.get_display(force_reveal=self.game_over)
-                board_str += f"{display}  "  # Emoji with spacing
+                parts.append(f"{display}  ")  # Emoji with spacing
             
-            board_str += "\n"  # End of row
+            parts.append("\n")  # End of row
         
-        # Return formatted as code block
-        return f"```\n{board_str}```" 
\ No newline at end of file
+        # Formatted as code block
+        parts.append("```")
+        self._board_cache = "".join(parts)
+        return self._board_cache
\ No newline at end of file
@@ -9,12 +9,57 @@ import time
 import asyncio # Added for sleep
 import random # For selecting random category
 
-from common.config import EPHEMERAL_MESSAGE_DURATION, ROWS, COLUMNS, REVEAL_DELAY_SECONDS, EMOJI_CATEGORIES # Added EMOJI_CATEGORIES
+from common.config import EPHEMERAL_MESSAGE_DURATION, ROWS, COLUMNS, REVEAL_DELAY_SECONDS, EMOJI_CATEGORY_NAMES
 from games.game_1001_matching.game_1001 import MemoryGame
-from common.utils.game_utils import active_games
+from common.utils.game_utils import active_games, add_active_game
 
 logger = logging.getLogger("discord_bot")
 
+async def start_memory_game(channel, player1, player2, category, rows, cols, intro, send=None):
+    """
+    Create a Memory Match game, store it and send its opening messages.
+    
+    Args:
+        channel: The channel to play in
+        player1: First player
+        player2: Second player
+        category: Emoji category for the cards
+        rows: Number of grid rows (None for the default)
+        cols: Number of grid columns (None for the default)
+        intro: Start announcement, who goes first is added to it
+        send: Coroutine used for the announcement (defaults to sending it with the board)
+        
+    Returns:
+        MemoryGame: The new game, or None if its board couldn't be sent
+    """
+    # Create the game instance
+    game = MemoryGame(player1, player2, channel, category, rows, cols)
+    
+    # Store the game and schedule its AFK check
+    add_active_game("1001", channel.id, game)
+    
+    announcement = f"{intro}\n🎲 **{game.current_player.mention} will go first!**"
+    
+    # Replies to a command have to go through its own send, otherwise the announcement rides on the board message
+    if send is not None:
+        await send(announcement)
+        announcement = None
+    
+    # Create game view
+    view = GameView(game)
+    
+    # Send the main game messages (board and buttons separate)
+    try:
+        await view.send_initial_messages(channel, announcement)
+    except Exception as e:
+        logger.error("Error sending initial game messages: %s", e)
+        await channel.send("Error displaying the game. Please try starting a new game.")
+        # Clean up active game if setup failed critically
+        active_games.get("1001", {}).pop(channel.id, None)
+        return None
+    
+    return game
+
 class PlayAgainButton(discord.ui.Button):
     """Button to start a new Memory Match game with the same players."""
     def __init__(self, player1, player2, grid_rows, grid_cols):
@@ -42,46 +87,24 @@ class PlayAgainButton(discord.ui.Button):
             await interaction.response.defer()
             
             # Select a random category
-            category = random.choice(list(EMOJI_CATEGORIES.keys()))
-            
-            # Use the original player order for consistency, randomization will happen in MemoryGame
-            # Create the game instance
-            game = MemoryGame(self.player1, self.player2, interaction.channel, category, self.grid_rows, self.grid_cols)
-            
-            # Make sure the active_games dictionary is initialized for this game ID
-            game_id = "1001"
-            if game_id not in active_games:
-                active_games[game_id] = {}
-                
-            # Store the game
-            active_games[game_id][interaction.channel.id] = game
+            category = random.choice(EMOJI_CATEGORY_NAMES)
             
             # Disable this button to prevent multiple clicks
             self.disabled = True
             await interaction.message.edit(view=self.view)
             
-            # Send initial informational message
-            await interaction.channel.send(f"📝 Memory Match Game started with **random category {category}**: {self.player1.mention} vs {self.player2.mention}\n🎲 **{game.current_player.mention} will go first!**")
-
-            # Create game view
-            view = GameView(game)
-            
-            # Send the main game messages (board and buttons separate)
-            try:
-                board_message, buttons_message = await view.send_initial_messages(interaction.channel)
-                # The board_message and board_message_id are already set in send_initial_messages
-            except Exception as e:
-                logger.error(f"Error sending initial game messages: {e}")
-                await interaction.channel.send("Error displaying the game. Please try starting a new game.")
-                # Clean up active game if setup failed critically
-                if game_id in active_games and interaction.channel.id in active_games[game_id]:
-                    del active_games[game_id][interaction.channel.id]
+            # Use the original player order for consistency, randomization will happen in MemoryGame
+            game = await start_memory_game(
+                interaction.channel, self.player1, self.player2, category, self.grid_rows, self.grid_cols,
+                f"📝 Memory Match Game started with **random category {category}**: {self.player1.mention} vs {self.player2.mention}"
+            )
+            if game is None:
                 return
             
-            logger.info(f"New Memory Match game started via Play Again in channel {interaction.channel.id}: {self.player1.display_name} vs {self.player2.display_name}")
+            logger.info("New Memory Match game started via Play Again in channel %s: %s vs %s", interaction.channel.id, self.player1.display_name, self.player2.display_name)
             
         except Exception as e:
-            logger.error(f"Error in PlayAgainButton callback: {e}\n{traceback.format_exc()}")
+            logger.error("Error in PlayAgainButton callback: %s", e, exc_info=True)
             await interaction.followup.send(f"Error starting new game: {type(e).__name__}. Please use the /matching_game command instead.")
 
 class CardButton(discord.ui.Button):
@@ -137,10 +160,10 @@ class CardButton(discord.ui.Button):
             await view.select_card(interaction, self.row_idx, self.col_idx)
             
         except discord.errors.NotFound:
-            logger.warning(f"Interaction or message not found during CardButton callback. User: {interaction.user.id}")
+            logger.warning("Interaction or message not found during CardButton callback. User: %s", interaction.user.id)
             # No response possible if interaction is gone
         except discord.errors.HTTPException as http_err:
-            logger.error(f"HTTPException in CardButton callback: {http_err}\n{traceback.format_exc()}")
+            logger.error("HTTPException in CardButton callback: %s", http_err, exc_info=True)
             if interaction.response.is_done(): # Check if already responded (e.g. by select_card)
                 try:
                     await interaction.followup.send(f"A network error occurred: {http_err.status}. Please try again.", ephemeral=True)
@@ -201,7 +224,7 @@ class GameView(discord.ui.View):
                     buttons_in_this_row = buttons_per_ui_row.get(ui_row, 0)
                     if buttons_in_this_row >= 5:
                         # If we've already added 5 buttons to this UI row, we need to move to the next row
-                        logger.warning(f"UI row {ui_row} already has 5 buttons; this shouldn't happen with a 5-column grid")
+                        logger.warning("UI row %s already has 5 buttons; this shouldn't happen with a 5-column grid", ui_row)
                         continue
                     
                     # Add this button with the numbered label
@@ -228,8 +251,8 @@ class GameView(discord.ui.View):
                 for ui_row, buttons in sorted(ui_row_buttons.items()):
                     layout_info.append(f"UI Row {ui_row}: {' '.join(buttons)}")
                 
-                logger.info(f"Added {button_count} buttons across {len(ui_row_buttons)} UI rows")
-                logger.info(f"Button layout: {'; '.join(layout_info)}")
+                logger.info("Added %s buttons across %s UI rows", button_count, len(ui_row_buttons))
+                logger.info("Button layout: %s", '; '.join(layout_info))
             else:
                 logger.warning("No buttons were added to the view")
                 
@@ -237,12 +260,12 @@ class GameView(discord.ui.View):
             error_msg = f"Error adding buttons: {e}\n{traceback.format_exc()}"
             logger.error(error_msg)
     
-    async def send_initial_messages(self, channel):
-        """Send the initial board and buttons messages."""
+    async def send_initial_messages(self, channel, content=None):
+        """Send the initial board and buttons messages, with optional text above the board."""
         try:
             # Send the game board embed first
             initial_embed = self.game.get_board_embed()
-            board_message = await channel.send(embed=initial_embed)
+            board_message = await channel.send(content=content, embed=initial_embed)
             self.game.board_message = board_message
             self.game.board_message_id = board_message.id
             
@@ -252,11 +275,11 @@ class GameView(discord.ui.View):
             self.game.buttons_message = buttons_message  # Store it in the game object too
             
             # Log successful setup
-            logger.info(f"Initial game messages sent for Memory Match in channel {channel.id}")
+            logger.info("Initial game messages sent for Memory Match in channel %s", channel.id)
             
             return board_message, buttons_message
         except Exception as e:
-            logger.error(f"Error sending initial messages: {e}\n{traceback.format_exc()}")
+            logger.error("Error sending initial messages: %s", e, exc_info=True)
             raise
 
     async def select_card(self, interaction, row, col):
@@ -283,11 +306,12 @@ class GameView(discord.ui.View):
                     return
             
             # Update last activity time for AFK detection
-            self.game.last_activity_time = time.time()
+            self.game.last_activity_time = time.monotonic()
             
             # Add to selected cards
             self.selected_cards.append((row, col))
             card.is_revealed = True
+            self.game.invalidate_board_display()
             
             # First card selection
             if len(self.selected_cards) == 1:
@@ -332,6 +356,7 @@ class GameView(discord.ui.View):
                     # Reset card state
                     card.is_revealed = False
                     card1.is_revealed = False
+                    self.game.invalidate_board_display()
                     self.selected_cards = []
                     
                     # Create a new buttons view for same player
@@ -410,7 +435,7 @@ class GameView(discord.ui.View):
                     await self.game.update_board(f"{self.game.current_player.display_name}, your turn.")
         
         except Exception as e:
-            logger.error(f"Error in select_card: {e}\n{traceback.format_exc()}")
+            logger.error("Error in select_card: %s", e, exc_info=True)
             await interaction.followup.send("An error occurred while processing your selection.", ephemeral=True)
             # Reset state on error
             self.selected_cards = []
@@ -428,7 +453,7 @@ class GameView(discord.ui.View):
                 try:
                     await self.buttons_message.delete()
                 except Exception as e:
-                    logger.error(f"Error deleting old buttons message: {e}")
+                    logger.error("Error deleting old buttons message: %s", e)
                     # Continue even if delete fails
                     pass
             
@@ -441,10 +466,10 @@ class GameView(discord.ui.View):
             self.game.buttons_message = buttons_message
             self.buttons_message = buttons_message  # Update in this view too for any clean-up
             
-            logger.info(f"Replaced buttons message for {self.game.current_player.display_name}'s turn")
+            logger.info("Replaced buttons message for %s's turn", self.game.current_player.display_name)
             
         except Exception as e:
-            logger.error(f"Error replacing buttons message: {e}\n{traceback.format_exc()}")
+            logger.error("Error replacing buttons message: %s", e, exc_info=True)
 
     def _update_buttons_for_game_state(self, force_disable_all=False):
         """Updates the buttons based on the current game state."""
@@ -473,14 +498,14 @@ class GameView(discord.ui.View):
     async def on_timeout(self):
         # This view has timeout=None, so this won't be called automatically
         # If a timeout were set, this is where cleanup would happen.
-        logger.info(f"GameView for game in channel {self.game.channel.id} timed out (theoretically). Stopping view.")
+        logger.info("GameView for game in channel %s timed out (theoretically). Stopping view.", self.game.channel.id)
         message = self.game.buttons_message # or self.message if it's directly set by discord.py
         if message:
             await message.edit(view=None) # Remove buttons
         self.stop()
 
     async def on_error(self, interaction: discord.Interaction, error: Exception, item: discord.ui.Item):
-        logger.error(f"Error in GameView item {item}: {error}\n{traceback.format_exc()}")
+        logger.error("Error in GameView item %s: %s", item, error, exc_info=True)
         if interaction.response.is_done():
             await interaction.followup.send(f"An error occurred with the interface: {type(error).__name__}", ephemeral=True)
         else:
@@ -500,6 +525,7 @@ class GameView(discord.ui.View):
                 card1.is_revealed = False
             if card2:
                 card2.is_revealed = False
+            self.game.invalidate_board_display()
             
             # Get current player after turn switch
             current_player = self.game.current_player
@@ -510,11 +536,11 @@ class GameView(discord.ui.View):
                 try:
                     await self.buttons_message.edit(content=f"Click a number to select a card. {current_player.mention}'s turn:")
                 except Exception as e:
-                    logger.error(f"Error updating buttons message content: {e}")
+                    logger.error("Error updating buttons message content: %s", e)
             
-            logger.info(f"Cards hidden after 3-second delay. Row1,Col1: ({row1+1},{col1+1}), Row2,Col2: ({row2+1},{col2+1})")
+            logger.info("Cards hidden after 3-second delay. Row1,Col1: (%s,%s), Row2,Col2: (%s,%s)", row1+1, col1+1, row2+1, col2+1)
             
         except Exception as e:
-            logger.error(f"Error hiding cards after delay: {e}\n{traceback.format_exc()}")
+            logger.error("Error hiding cards after delay: %s", e, exc_info=True)
             # No need to recover here as the buttons have already been updated
             # and this method runs in the background 
\ No newline at end of file
@@ -15,19 +15,25 @@ from common.config import (
 )
 from common.database import database
 from common.utils.game_utils import (
-    active_games, handle_challenge_expiration, 
+    active_games, add_active_game, handle_challenge_expiration, 
     generate_confirmation_id, handle_confirmation_expiration,
-    update_database_with_game_results
+    update_database_with_game_results, track_pending_message, edit_and_clear_reactions,
+    PendingChallenge, PendingConfirmation, pending_challenges_by_game, pending_confirmations_by_game
 )
 from games.game_1002_tictactoe.game_1002 import TicTacToeGame
 from games.game_1002_tictactoe.ui_1002 import TicTacToeView
 
 logger = logging.getLogger("discord_bot")
 
+# Embed colours, created once and shared by every embed
+COLOR_GOLD = discord.Color.gold()
+COLOR_ORANGE = discord.Color.orange()
+COLOR_RED = discord.Color.red()
+
 # Game-specific storage
 GAME_ID = "1002"  # Unique identifier for Tic Tac Toe Game
-pending_ttt_challenges = {}  # (target_user_id, channel_id) -> (challenger, channel, message_id)
-end_ttt_confirmations = {}  # uuid -> {channel_id, requester, opponent, message_id, opponent_id}
+pending_ttt_challenges = pending_challenges_by_game.setdefault(GAME_ID, {})  # (target_user_id, channel_id) -> PendingChallenge
+end_ttt_confirmations = pending_confirmations_by_game.setdefault(GAME_ID, {})  # uuid -> PendingConfirmation
 
 async def setup_tictactoe_command(bot):
     """Set up the Tic Tac Toe challenge command."""
@@ -65,7 +71,7 @@ async def setup_tictactoe_command(bot):
             embed = discord.Embed(
                 title="⚔️ Tic Tac Toe Challenge! ⚔️",
                 description=f"💥 {ctx.author.mention} dares {user.mention} to a game of Tic Tac Toe! 💥",
-                color=discord.Color.orange()
+                color=COLOR_ORANGE
             )
             embed.add_field(name="⏳ Timeout", value=f"{int(CHALLENGE_TIMEOUT_SECONDS)} seconds", inline=True)
             embed.add_field(
@@ -80,123 +86,38 @@ async def setup_tictactoe_command(bot):
             challenge_msg = await ctx.send(embed=embed)
             
             # Add reaction options
-            await challenge_msg.add_reaction(ACCEPT_EMOJI)
-            await challenge_msg.add_reaction(DECLINE_EMOJI)
+            await asyncio.gather(challenge_msg.add_reaction(ACCEPT_EMOJI), challenge_msg.add_reaction(DECLINE_EMOJI))
             
             # Store the challenge
-            pending_ttt_challenges[(user.id, ctx.channel.id)] = (ctx.author, ctx.channel, challenge_msg.id)
+            pending_ttt_challenges[(user.id, ctx.channel.id)] = PendingChallenge(ctx.author, challenge_msg.id)
+            track_pending_message(challenge_msg.id, pending_ttt_challenges, (user.id, ctx.channel.id))
             
             # Set up challenge expiration
-            asyncio.create_task(handle_challenge_expiration((user.id, ctx.channel.id), CHALLENGE_TIMEOUT_SECONDS))
+            handle_challenge_expiration(GAME_ID, (user.id, ctx.channel.id), CHALLENGE_TIMEOUT_SECONDS, challenge_msg.id)
         
-        except Exception as e:
-            logger.error(f"Error creating challenge: {e}")
+        except discord.HTTPException as e:
+            logger.error("Error creating challenge: %s", e)
             await ctx.send("Error creating challenge. Please try again.")
 
     @bot.hybrid_command(name="ttt_accept", description="Accept a pending Tic Tac Toe challenge")
     async def accept_ttt(ctx):
         """Accept a pending Tic Tac Toe challenge."""
-        try:
-            # Check if there's a pending challenge for this user in this channel
-            if (ctx.author.id, ctx.channel.id) not in pending_ttt_challenges:
-                await ctx.send("You don't have any pending Tic Tac Toe challenges in this channel.")
-                return
-            
-            # Check if there's already an active game in this channel
-            if ctx.channel.id in active_games.get(GAME_ID, {}):
-                await ctx.send("There's already an active game in this channel. Finish or end that game first.")
-                
-                # Remove the pending challenge
-                del pending_ttt_challenges[(ctx.author.id, ctx.channel.id)]
-                return
-                
-            # Get the challenge details
-            challenger, channel, message_id = pending_ttt_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Remove the challenge from pending
-            del pending_ttt_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Create the game
-            game = TicTacToeGame(challenger, ctx.author, ctx.channel)
-            
-            # Make sure the active_games dictionary is initialized for this game ID
-            if GAME_ID not in active_games:
-                active_games[GAME_ID] = {}
-                
-            # Store the game
-            active_games[GAME_ID][ctx.channel.id] = game
-            
-            # Try to delete the challenge message
-            try:
-                challenge_msg = await ctx.channel.fetch_message(message_id)
-                await challenge_msg.delete()
-            except (discord.errors.NotFound, discord.errors.Forbidden):
-                # Message might have been deleted or we lack permissions
-                pass
-                
-            # Create game view
-            view = TicTacToeView(game)
-            
-            # Send initial game state
-            await ctx.send(f"Tic Tac Toe Game started: {challenger.mention} vs {ctx.author.mention}")
-            board_msg = await ctx.send(embed=game.get_board_embed(), view=view)
-            game.board_message = board_msg
-            game.board_message_id = board_msg.id
-            
-            logger.info(f"Tic Tac Toe game started in channel {ctx.channel.id}: {challenger.display_name} vs {ctx.author.display_name}")
-            
-        except Exception as e:
-            logger.error(f"Error accepting challenge: {e}")
-            await ctx.send("Error starting game. Please try again.")
+        await accept_ttt_challenge(ctx.channel, ctx.author, ctx.send)
 
     @bot.hybrid_command(name="ttt_decline", description="Decline a pending Tic Tac Toe challenge")
     async def decline_ttt(ctx):
         """Decline a pending Tic Tac Toe challenge."""
-        try:
-            # Check if there's a pending challenge for this user in this channel
-            if (ctx.author.id, ctx.channel.id) not in pending_ttt_challenges:
-                await ctx.send("You don't have any pending Tic Tac Toe challenges in this channel.")
-                return
-                
-            # Get the challenge details
-            challenger, channel, message_id = pending_ttt_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Remove the challenge from pending
-            del pending_ttt_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Create the decline embed
-            embed = discord.Embed(
-                title="Challenge Declined",
-                description=f"{ctx.author.mention} has declined {challenger.mention}'s Tic Tac Toe challenge.",
-                color=discord.Color.red()
-            )
-            
-            # Try to edit the original challenge message
-            try:
-                challenge_msg = await ctx.channel.fetch_message(message_id)
-                await challenge_msg.edit(embed=embed)
-                await challenge_msg.clear_reactions()
-            except (discord.errors.NotFound, discord.errors.Forbidden):
-                # Message might have been deleted or we lack permissions
-                # Send a new message instead
-                await ctx.send(embed=embed)
-                
-            logger.info(f"Tic Tac Toe challenge declined in channel {ctx.channel.id}: {challenger.display_name} -> {ctx.author.display_name}")
-            
-        except Exception as e:
-            logger.error(f"Error declining challenge: {e}")
-            await ctx.send("Error declining challenge. Please try again.")
+        await decline_ttt_challenge(ctx.channel, ctx.author, ctx.send)
 
     @bot.hybrid_command(name="ttt_end", description="End the current Tic Tac Toe game in this channel")
     async def end_ttt_game(ctx):
         """End the current Tic Tac Toe game in this channel."""
         try:
             # Check if there's an active game in this channel
-            if ctx.channel.id not in active_games.get(GAME_ID, {}):
+            game = active_games.get(GAME_ID, {}).get(ctx.channel.id)
+            if game is None:
                 await ctx.send("There's no active Tic Tac Toe game in this channel.")
                 return
-                
-            game = active_games[GAME_ID][ctx.channel.id]
             
             # Check if the user is one of the players
             if ctx.author.id != game.player1.id and ctx.author.id != game.player2.id:
@@ -213,7 +134,7 @@ async def setup_tictactoe_command(bot):
             embed = discord.Embed(
                 title="End Game Confirmation",
                 description=f"{ctx.author.mention} wants to end the current Tic Tac Toe game.",
-                color=discord.Color.gold()
+                color=COLOR_GOLD
             )
             
             # Add reactions for confirmation
@@ -226,23 +147,17 @@ async def setup_tictactoe_command(bot):
             confirmation_msg = await ctx.send(embed=embed)
             
             # Add reaction options
-            await confirmation_msg.add_reaction(ACCEPT_EMOJI)
-            await confirmation_msg.add_reaction(DECLINE_EMOJI)
+            await asyncio.gather(confirmation_msg.add_reaction(ACCEPT_EMOJI), confirmation_msg.add_reaction(DECLINE_EMOJI))
             
             # Store the confirmation request
-            end_ttt_confirmations[confirmation_id] = {
-                'channel_id': ctx.channel.id,
-                'requester': ctx.author,
-                'opponent': opponent,
-                'message_id': confirmation_msg.id,
-                'opponent_id': opponent.id
-            }
+            end_ttt_confirmations[confirmation_id] = PendingConfirmation(ctx.channel.id, ctx.author, opponent, confirmation_msg.id)
+            track_pending_message(confirmation_msg.id, end_ttt_confirmations, confirmation_id)
             
             # Set up confirmation expiration
-            asyncio.create_task(handle_confirmation_expiration(confirmation_id, CHALLENGE_TIMEOUT_SECONDS))
+            handle_confirmation_expiration(GAME_ID, confirmation_id, CHALLENGE_TIMEOUT_SECONDS, confirmation_msg.id)
             
-        except Exception as e:
-            logger.error(f"Error processing end game request: {e}")
+        except discord.HTTPException as e:
+            logger.error("Error processing end game request: %s", e)
             await ctx.send("Error processing end game request. Please try again.")
 
     # Register the Tic Tac Toe commands with the bot
@@ -253,6 +168,104 @@ async def setup_tictactoe_command(bot):
         "ttt_end": end_ttt_game
     }
 
+async def accept_ttt_challenge(channel, user, send=None):
+    """
+    Accept a pending Tic Tac Toe challenge and start the game.
+    
+    Args:
+        channel: The channel the challenge was made in
+        user: The challenged user
+        send: Coroutine used for replies (defaults to channel.send)
+    """
+    send = send or channel.send
+    
+    try:
+        # Remove the challenge from pending, a concurrent accept or decline may already have taken it
+        challenge = pending_ttt_challenges.pop((user.id, channel.id), None)
+        if challenge is None:
+            await send("You don't have any pending Tic Tac Toe challenges in this channel.")
+            return
+        
+        # Check if there's already an active game in this channel
+        if channel.id in active_games.get(GAME_ID, {}):
+            await send("There's already an active game in this channel. Finish or end that game first.")
+            return
+            
+        # Get the challenge details
+        challenger, message_id = challenge.challenger, challenge.message_id
+        
+        # Create the game
+        game = TicTacToeGame(challenger, user, channel)
+        
+        # Store the game and schedule its AFK check
+        add_active_game(GAME_ID, channel.id, game)
+        
+        # Try to delete the challenge message
+        try:
+            challenge_msg = channel.get_partial_message(message_id)
+            await challenge_msg.delete()
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            # Message might have been deleted or we lack permissions
+            pass
+            
+        # Create game view
+        view = TicTacToeView(game)
+        
+        # Send initial game state
+        await send(f"Tic Tac Toe Game started: {challenger.mention} vs {user.mention}")
+        board_msg = await send(embed=game.get_board_embed(), view=view)
+        game.board_message = board_msg
+        game.board_message_id = board_msg.id
+        
+        logger.info("Tic Tac Toe game started in channel %s: %s vs %s", channel.id, challenger.display_name, user.display_name)
+        
+    except discord.HTTPException as e:
+        logger.error("Error accepting challenge: %s", e)
+        await send("Error starting game. Please try again.")
+
+async def decline_ttt_challenge(channel, user, send=None):
+    """
+    Decline a pending Tic Tac Toe challenge.
+    
+    Args:
+        channel: The channel the challenge was made in
+        user: The challenged user
+        send: Coroutine used for replies (defaults to channel.send)
+    """
+    send = send or channel.send
+    
+    try:
+        # Remove the challenge from pending, a concurrent accept or decline may already have taken it
+        challenge = pending_ttt_challenges.pop((user.id, channel.id), None)
+        if challenge is None:
+            await send("You don't have any pending Tic Tac Toe challenges in this channel.")
+            return
+            
+        # Get the challenge details
+        challenger, message_id = challenge.challenger, challenge.message_id
+        
+        # Create the decline embed
+        embed = discord.Embed(
+            title="Challenge Declined",
+            description=f"{user.mention} has declined {challenger.mention}'s Tic Tac Toe challenge.",
+            color=COLOR_RED
+        )
+        
+        # Try to edit the original challenge message
+        try:
+            challenge_msg = channel.get_partial_message(message_id)
+            await edit_and_clear_reactions(challenge_msg, embed=embed)
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            # Message might have been deleted or we lack permissions
+            # Send a new message instead
+            await send(embed=embed)
+            
+        logger.info("Tic Tac Toe challenge declined in channel %s: %s -> %s", channel.id, challenger.display_name, user.display_name)
+        
+    except discord.HTTPException as e:
+        logger.error("Error declining challenge: %s", e)
+        await send("Error declining challenge. Please try again.")
+
 async def end_ttt_game_internal(channel, game, ended_by, reason="Game ended."):
     """End a Tic Tac Toe game and clean up resources.
     
@@ -277,7 +290,7 @@ async def end_ttt_game_internal(channel, game, ended_by, reason="Game ended."):
         if winner:
             # Update winner stats
             await update_database_with_game_results(
-                channel=channel,
+                server_id=game.server_id,
                 winner=winner,
                 loser=game.player1 if winner.id == game.player2.id else game.player2,
                 game_id=GAME_ID
@@ -285,7 +298,7 @@ async def end_ttt_game_internal(channel, game, ended_by, reason="Game ended."):
         else:
             # It's a tie, both players get a loss
             await update_database_with_game_results(
-                channel=channel,
+                server_id=game.server_id,
                 winner=None,
                 loser=game.player2,
                 game_id=GAME_ID
@@ -295,7 +308,7 @@ async def end_ttt_game_internal(channel, game, ended_by, reason="Game ended."):
         embed = discord.Embed(
             title="Tic Tac Toe Game Ended",
             description=f"Game between {game.player1.mention} and {game.player2.mention} has ended.",
-            color=discord.Color.gold()
+            color=COLOR_GOLD
         )
         
         embed.add_field(
@@ -331,15 +344,14 @@ async def end_ttt_game_internal(channel, game, ended_by, reason="Game ended."):
             pass
         
         # Remove the game from active games
-        del active_games[GAME_ID][channel.id]
+        active_games.get(GAME_ID, {}).pop(channel.id, None)
         
-        logger.info(f"Tic Tac Toe game ended in channel {channel.id}: {reason}")
+        logger.info("Tic Tac Toe game ended in channel %s: %s", channel.id, reason)
         
     except Exception as e:
-        logger.error(f"Error ending Tic Tac Toe game: {e}")
+        logger.error("Error ending Tic Tac Toe game: %s", e)
         # Try to remove the game from active games
         try:
-            if GAME_ID in active_games and channel.id in active_games[GAME_ID]:
-                del active_games[GAME_ID][channel.id]
+            active_games.get(GAME_ID, {}).pop(channel.id, None)
         except:
             pass 
\ No newline at end of file
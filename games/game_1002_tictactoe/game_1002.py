@@ -4,13 +4,16 @@ Game logic for the Discord Tic Tac Toe Game (ID: 1002).
 import random
 import discord
 import logging
-import traceback
 import time
 
 from common.database import database
 
 logger = logging.getLogger("discord_bot")
 
+# Embed colours, created once and shared by every embed
+COLOR_BLUE = discord.Color.blue()
+COLOR_GOLD = discord.Color.gold()
+
 class TicTacToeGame:
     """Main game class that handles the Tic Tac Toe game logic and state."""
     def __init__(self, player1, player2, channel):
@@ -18,6 +21,10 @@ class TicTacToeGame:
         self.player2 = player2  # O player
         self.channel = channel
         
+        # Server the results are recorded for, looked up once here rather than when the game ends
+        guild = getattr(channel, "guild", None)
+        self.server_id = guild.id if guild else None
+        
         # Game state
         self.board = [[None for _ in range(3)] for _ in range(3)]
         self.current_player = random.choice([player1, player2])
@@ -26,7 +33,7 @@ class TicTacToeGame:
         self.board_message = None
         
         # Track last activity time for AFK detection
-        self.last_activity_time = time.time()
+        self.last_activity_time = time.monotonic()
         
         # Symbols for players
         self.symbols = {
@@ -34,7 +41,7 @@ class TicTacToeGame:
             player2.id: "⭕"
         }
         
-        logger.info(f"Tic Tac Toe game created between {player1.display_name} and {player2.display_name}")
+        logger.info("Tic Tac Toe game created between %s and %s", player1.display_name, player2.display_name)
     
     def make_move(self, row, col, player):
         """Attempt to make a move at the specified position.
@@ -68,7 +75,7 @@ class TicTacToeGame:
             self.board[row][col] = self.symbols[player.id]
             
             # Update last activity time
-            self.last_activity_time = time.time()
+            self.last_activity_time = time.monotonic()
             
             # Check for win or draw
             winner_symbol = self._check_winner()
@@ -79,7 +86,7 @@ class TicTacToeGame:
                 else:
                     self.winner = self.player2
                     
-                logger.info(f"Tic Tac Toe game won by {self.winner.display_name}")
+                logger.info("Tic Tac Toe game won by %s", self.winner.display_name)
                 return True, f"{self.winner.display_name} wins!"
             
             # Check for draw
@@ -93,7 +100,7 @@ class TicTacToeGame:
             return True, f"Move made. It's now {self.current_player.display_name}'s turn."
             
         except Exception as e:
-            logger.error(f"Error in make_move: {e}\n{traceback.format_exc()}")
+            logger.error("Error in make_move: %s", e, exc_info=True)
             return False, f"An error occurred: {type(e).__name__}"
     
     def _switch_turn(self):
@@ -140,10 +147,10 @@ class TicTacToeGame:
         
         # Create the embed
         if self.game_over:
-            color = discord.Color.gold()
+            color = COLOR_GOLD
             title = "Tic Tac Toe - Game Over!"
         else:
-            color = discord.Color.blue()
+            color = COLOR_BLUE
             title = "Tic Tac Toe"
         
         embed = discord.Embed(
@@ -220,20 +227,20 @@ class TicTacToeGame:
                     logger.warning("Board message not found, creating new one")
                     self.board_message = await self.channel.send(embed=embed)
                 except Exception as e:
-                    logger.error(f"Error updating board message: {e}\n{traceback.format_exc()}")
+                    logger.error("Error updating board message: %s", e, exc_info=True)
                     # Try to send a new message if update fails
                     try:
                         self.board_message = await self.channel.send(embed=embed)
                     except Exception as e2:
-                        logger.error(f"Failed to create new board message after update error: {e2}")
+                        logger.error("Failed to create new board message after update error: %s", e2)
             else:
                 try:
                     self.board_message = await self.channel.send(embed=embed)
                 except Exception as e:
-                    logger.error(f"Error creating board message: {e}\n{traceback.format_exc()}")
+                    logger.error("Error creating board message: %s", e, exc_info=True)
                     raise
         except Exception as e:
-            logger.error(f"Error in update_board: {e}\n{traceback.format_exc()}")
+            logger.error("Error in update_board: %s", e, exc_info=True)
     
     def get_winner(self):
         """Get the winner of the game, or None if no winner or game not over."""
@@ -8,7 +8,7 @@ import time
 
 from common.config import EPHEMERAL_MESSAGE_DURATION
 from games.game_1002_tictactoe.game_1002 import TicTacToeGame
-from common.utils.game_utils import active_games
+from common.utils.game_utils import active_games, add_active_game
 
 logger = logging.getLogger("discord_bot")
 
@@ -42,13 +42,9 @@ class PlayAgainButton(discord.ui.Button):
             # Create the game instance
             game = TicTacToeGame(interaction.user, challenger, interaction.channel)
             
-            # Make sure the active_games dictionary is initialized for this game ID
+            # Store the game and schedule its AFK check
             game_id = "1002"
-            if game_id not in active_games:
-                active_games[game_id] = {}
-                
-            # Store the game
-            active_games[game_id][interaction.channel.id] = game
+            add_active_game(game_id, interaction.channel.id, game)
             
             # Disable this button to prevent multiple clicks
             self.disabled = True
@@ -67,17 +63,16 @@ class PlayAgainButton(discord.ui.Button):
                 game.board_message = game_message  # For updates
                 game.board_message_id = game_message.id  # For embed updates by game logic
             except Exception as e:
-                logger.error(f"Error sending initial game message with view: {e}")
+                logger.error("Error sending initial game message with view: %s", e)
                 await interaction.channel.send("Error displaying the game. Please try starting a new game.")
                 # Clean up active game if setup failed critically
-                if game_id in active_games and interaction.channel.id in active_games[game_id]:
-                    del active_games[game_id][interaction.channel.id]
+                active_games.get(game_id, {}).pop(interaction.channel.id, None)
                 return
             
-            logger.info(f"New Tic Tac Toe game started via Play Again in channel {interaction.channel.id}: {interaction.user.display_name} vs {challenger.display_name}")
+            logger.info("New Tic Tac Toe game started via Play Again in channel %s: %s vs %s", interaction.channel.id, interaction.user.display_name, challenger.display_name)
             
         except Exception as e:
-            logger.error(f"Error in PlayAgainButton callback: {e}\n{traceback.format_exc()}")
+            logger.error("Error in PlayAgainButton callback: %s", e, exc_info=True)
             await interaction.followup.send(f"Error starting new game: {type(e).__name__}. Please use the /tictactoe command instead.")
 
 class TicTacToeButton(discord.ui.Button):
@@ -159,10 +154,10 @@ class TicTacToeButton(discord.ui.Button):
             # a followup might be desired, or ensure edit_message handles it.
             
         except discord.errors.NotFound:
-            logger.warning(f"Interaction or message not found during TicTacToeButton callback. User: {interaction.user.id}")
+            logger.warning("Interaction or message not found during TicTacToeButton callback. User: %s", interaction.user.id)
             # No response possible if interaction is gone
         except discord.errors.HTTPException as http_err:
-            logger.error(f"HTTPException in button callback: {http_err}\n{traceback.format_exc()}")
+            logger.error("HTTPException in button callback: %s", http_err, exc_info=True)
             # Try to send a followup if interaction not fully dead
             if interaction.response.is_done():
                 try:
@@ -244,4 +239,4 @@ class TicTacToeView(discord.ui.View):
             try:
                 await self.game.board_message.edit(view=self)
             except Exception as e:
-                logger.error(f"Error updating view: {e}") 
\ No newline at end of file
+                logger.error("Error updating view: %s", e) 
\ No newline at end of file
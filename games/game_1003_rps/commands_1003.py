@@ -9,7 +9,6 @@ import time
 from discord import app_commands
 from discord.ext import commands
 import aiohttp
-import traceback
 
 from common.config import (
     CHALLENGE_TIMEOUT_SECONDS,
@@ -17,21 +16,36 @@ from common.config import (
 )
 from common.database import database
 from common.utils.game_utils import (
-    active_games, handle_challenge_expiration,
-    generate_confirmation_id, handle_confirmation_expiration
+    active_games, add_active_game, handle_challenge_expiration,
+    generate_confirmation_id, handle_confirmation_expiration,
+    track_pending_message, edit_and_clear_reactions, PendingChallenge, pending_challenges_by_game
 )
 from games.game_1003_rps.game_1003 import BasicRPSGame, ActionRPSGame, RPS_EMOJIS
 from games.game_1003_rps.ui_1003 import RPSView, ActionSelectView, PlayAgainButton
 
 logger = logging.getLogger("discord_bot")
 
+# Embed colours, created once and shared by every embed
+COLOR_BLUE = discord.Color.blue()
+COLOR_GOLD = discord.Color.gold()
+COLOR_ORANGE = discord.Color.orange()
+COLOR_RED = discord.Color.red()
+
 # Game-specific storage
 GAME_ID = "1003"  # Unique identifier for RPS Games
 BASIC_GAME_TYPE = "basic"  # Regular RPS
 ACTION_GAME_TYPE = "action"  # RPS with actions
 
 # Track challenges
-pending_rps_challenges = {}  # (target_user_id, channel_id) -> (challenger, channel, message_id, game_type)
+pending_rps_challenges = pending_challenges_by_game.setdefault(GAME_ID, {})  # (target_user_id, channel_id) -> RPSChallenge
+
+class RPSChallenge(PendingChallenge):
+    """A pending Rock Paper Scissors challenge with its game type."""
+    __slots__ = ("game_type",)
+    
+    def __init__(self, challenger, message_id, game_type):
+        super().__init__(challenger, message_id)
+        self.game_type = game_type
 
 async def setup_rps_commands(bot):
     """Set up both RPS game commands."""
@@ -91,7 +105,7 @@ async def setup_rps_commands(bot):
             embed = discord.Embed(
                 title=f"🎮 {display_game_type} Challenge! 🎮",
                 description=f"💥 {ctx.author.mention} challenges {user.mention} to a game of {display_game_type}! 💥",
-                color=discord.Color.orange()
+                color=COLOR_ORANGE
             )
             embed.add_field(name="⏳ Timeout", value=f"{int(CHALLENGE_TIMEOUT_SECONDS)} seconds", inline=True)
             embed.add_field(
@@ -121,20 +135,22 @@ async def setup_rps_commands(bot):
             challenge_msg = await ctx.send(embed=embed)
             
             # Add reaction options
-            await challenge_msg.add_reaction(ACCEPT_EMOJI)
-            await challenge_msg.add_reaction(DECLINE_EMOJI)
+            await asyncio.gather(challenge_msg.add_reaction(ACCEPT_EMOJI), challenge_msg.add_reaction(DECLINE_EMOJI))
             
             # Store the challenge
-            pending_rps_challenges[(user.id, ctx.channel.id)] = (ctx.author, ctx.channel, challenge_msg.id, game_type)
+            pending_rps_challenges[(user.id, ctx.channel.id)] = RPSChallenge(ctx.author, challenge_msg.id, game_type)
+            track_pending_message(challenge_msg.id, pending_rps_challenges, (user.id, ctx.channel.id))
             
             # Set up challenge expiration
-            asyncio.create_task(handle_challenge_expiration(
+            handle_challenge_expiration(
+                GAME_ID,
                 (user.id, ctx.channel.id), 
-                CHALLENGE_TIMEOUT_SECONDS
-            ))
+                CHALLENGE_TIMEOUT_SECONDS,
+                challenge_msg.id
+            )
         
-        except Exception as e:
-            logger.error(f"Error creating RPS challenge: {e}")
+        except discord.HTTPException as e:
+            logger.error("Error creating RPS challenge: %s", e)
             await ctx.send("Error creating challenge. Please try again.")
     
     @bot.hybrid_command(
@@ -143,43 +159,7 @@ async def setup_rps_commands(bot):
     )
     async def accept_rps(ctx):
         """Accept a pending RPS challenge."""
-        try:
-            # Check if there's a pending challenge for this user in this channel
-            if (ctx.author.id, ctx.channel.id) not in pending_rps_challenges:
-                await ctx.send("You don't have any pending Rock Paper Scissors challenges in this channel.")
-                return
-            
-            # Check if there's already an active game in this channel
-            if ctx.channel.id in active_games.get(GAME_ID, {}):
-                await ctx.send("There's already an active game in this channel. Finish that game first.")
-                
-                # Remove the pending challenge
-                del pending_rps_challenges[(ctx.author.id, ctx.channel.id)]
-                return
-                
-            # Get the challenge details
-            challenger, channel, message_id, game_type = pending_rps_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Remove the challenge from pending
-            del pending_rps_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Try to delete the challenge message
-            try:
-                challenge_msg = await ctx.channel.fetch_message(message_id)
-                await challenge_msg.delete()
-            except (discord.errors.NotFound, discord.errors.Forbidden):
-                # Message might have been deleted or we lack permissions
-                pass
-                
-            # Start the appropriate game
-            if game_type == BASIC_GAME_TYPE:
-                await start_basic_rps(ctx.channel, challenger, ctx.author)
-            else:
-                await start_action_rps(ctx.channel, challenger, ctx.author)
-            
-        except Exception as e:
-            logger.error(f"Error accepting RPS challenge: {e}")
-            await ctx.send("Error starting game. Please try again.")
+        await accept_rps_challenge(ctx.channel, ctx.author, ctx.send)
 
     @bot.hybrid_command(
         name="rps_decline", 
@@ -187,103 +167,7 @@ async def setup_rps_commands(bot):
     )
     async def decline_rps(ctx):
         """Decline a pending RPS challenge."""
-        try:
-            # Check if there's a pending challenge for this user in this channel
-            if (ctx.author.id, ctx.channel.id) not in pending_rps_challenges:
-                await ctx.send("You don't have any pending Rock Paper Scissors challenges in this channel.")
-                return
-                
-            # Get the challenge details
-            challenger, channel, message_id, game_type = pending_rps_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Remove the challenge from pending
-            del pending_rps_challenges[(ctx.author.id, ctx.channel.id)]
-            
-            # Create the decline embed
-            embed = discord.Embed(
-                title="Challenge Declined",
-                description=f"{ctx.author.mention} has declined {challenger.mention}'s Rock Paper Scissors challenge.",
-                color=discord.Color.red()
-            )
-            
-            # Try to edit the original challenge message
-            try:
-                challenge_msg = await ctx.channel.fetch_message(message_id)
-                await challenge_msg.edit(embed=embed)
-                await challenge_msg.clear_reactions()
-            except (discord.errors.NotFound, discord.errors.Forbidden):
-                # Message might have been deleted or we lack permissions
-                # Send a new message instead
-                await ctx.send(embed=embed)
-                
-            logger.info(f"RPS challenge declined in channel {ctx.channel.id}: {challenger.display_name} -> {ctx.author.display_name}")
-            
-        except Exception as e:
-            logger.error(f"Error declining RPS challenge: {e}")
-            await ctx.send("Error declining challenge. Please try again.")
-    
-    # Handle reactions to challenges
-    @bot.event
-    async def on_reaction_add(reaction, user):
-        try:
-            # Ignore bot's own reactions
-            if user.bot:
-                return
-                
-            message = reaction.message
-            channel = message.channel
-            emoji = str(reaction.emoji)
-            
-            # Check pending challenges
-            for (target_id, channel_id), (challenger, challenge_channel, message_id, game_type) in list(pending_rps_challenges.items()):
-                if message.id == message_id and user.id == target_id:
-                    if channel_id != channel.id:
-                        continue
-                        
-                    # Check if accepting or declining
-                    if emoji == ACCEPT_EMOJI:
-                        # Remove from pending challenges
-                        if (target_id, channel_id) in pending_rps_challenges:
-                            del pending_rps_challenges[(target_id, channel_id)]
-                            
-                        # Delete challenge message
-                        try:
-                            await message.delete()
-                        except discord.errors.NotFound:
-                            pass
-                            
-                        # Start appropriate game type
-                        if game_type == BASIC_GAME_TYPE:
-                            await start_basic_rps(channel, challenger, user)
-                        else:
-                            await start_action_rps(channel, challenger, user)
-                        
-                        return
-                        
-                    elif emoji == DECLINE_EMOJI:
-                        # Remove the challenge 
-                        if (target_id, channel_id) in pending_rps_challenges:
-                            del pending_rps_challenges[(target_id, channel_id)]
-                        
-                        # Create decline embed
-                        embed = discord.Embed(
-                            title="Challenge Declined",
-                            description=f"{user.mention} has declined {challenger.mention}'s Rock Paper Scissors challenge.",
-                            color=discord.Color.red()
-                        )
-                        
-                        # Edit message
-                        try:
-                            await message.edit(embed=embed)
-                            await message.clear_reactions()
-                        except discord.errors.NotFound:
-                            pass
-                            
-                        logger.info(f"RPS challenge declined in channel {channel.id}: {challenger.display_name} -> {user.display_name}")
-                        return
-                        
-        except Exception as e:
-            logger.error(f"Error handling RPS reaction: {e}")
+        await decline_rps_challenge(ctx.channel, ctx.author, ctx.send)
     
     # Register all RPS commands with the bot
     return {
@@ -293,6 +177,95 @@ async def setup_rps_commands(bot):
         "rps_decline": decline_rps
     }
 
+#---------- Challenge Response Functions ----------#
+
+async def accept_rps_challenge(channel, user, send=None):
+    """
+    Accept a pending Rock Paper Scissors challenge and start the game.
+    
+    Args:
+        channel: The channel the challenge was made in
+        user: The challenged user
+        send: Coroutine used for replies (defaults to channel.send)
+    """
+    send = send or channel.send
+    
+    try:
+        # Remove the challenge from pending, a concurrent accept or decline may already have taken it
+        challenge = pending_rps_challenges.pop((user.id, channel.id), None)
+        if challenge is None:
+            await send("You don't have any pending Rock Paper Scissors challenges in this channel.")
+            return
+        
+        # Check if there's already an active game in this channel
+        if channel.id in active_games.get(GAME_ID, {}):
+            await send("There's already an active game in this channel. Finish that game first.")
+            return
+            
+        # Get the challenge details
+        challenger, message_id, game_type = challenge.challenger, challenge.message_id, challenge.game_type
+        
+        # Try to delete the challenge message
+        try:
+            challenge_msg = channel.get_partial_message(message_id)
+            await challenge_msg.delete()
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            # Message might have been deleted or we lack permissions
+            pass
+            
+        # Start the appropriate game
+        if game_type == BASIC_GAME_TYPE:
+            await start_basic_rps(channel, challenger, user)
+        else:
+            await start_action_rps(channel, challenger, user)
+        
+    except discord.HTTPException as e:
+        logger.error("Error accepting RPS challenge: %s", e)
+        await send("Error starting game. Please try again.")
+
+async def decline_rps_challenge(channel, user, send=None):
+    """
+    Decline a pending Rock Paper Scissors challenge.
+    
+    Args:
+        channel: The channel the challenge was made in
+        user: The challenged user
+        send: Coroutine used for replies (defaults to channel.send)
+    """
+    send = send or channel.send
+    
+    try:
+        # Remove the challenge from pending, a concurrent accept or decline may already have taken it
+        challenge = pending_rps_challenges.pop((user.id, channel.id), None)
+        if challenge is None:
+            await send("You don't have any pending Rock Paper Scissors challenges in this channel.")
+            return
+            
+        # Get the challenge details
+        challenger, message_id = challenge.challenger, challenge.message_id
+        
+        # Create the decline embed
+        embed = discord.Embed(
+            title="Challenge Declined",
+            description=f"{user.mention} has declined {challenger.mention}'s Rock Paper Scissors challenge.",
+            color=COLOR_RED
+        )
+        
+        # Try to edit the original challenge message
+        try:
+            challenge_msg = channel.get_partial_message(message_id)
+            await edit_and_clear_reactions(challenge_msg, embed=embed)
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            # Message might have been deleted or we lack permissions
+            # Send a new message instead
+            await send(embed=embed)
+            
+        logger.info("RPS challenge declined in channel %s: %s -> %s", channel.id, challenger.display_name, user.display_name)
+        
+    except discord.HTTPException as e:
+        logger.error("Error declining RPS challenge: %s", e)
+        await send("Error declining challenge. Please try again.")
+
 #---------- Game Starter Functions ----------#
 
 async def start_basic_rps(channel, player1, player2):
@@ -300,10 +273,8 @@ async def start_basic_rps(channel, player1, player2):
     # Create the game instance
     game = BasicRPSGame(player1, player2, channel)
     
-    # Store in active games
-    if GAME_ID not in active_games:
-        active_games[GAME_ID] = {}
-    active_games[GAME_ID][channel.id] = game
+    # Store in active games and schedule the AFK check
+    add_active_game(GAME_ID, channel.id, game)
     
     # Send game start message
     start_message = await channel.send(f"🎮 Rock Paper Scissors started: {player1.mention} vs {player2.mention}")
@@ -318,17 +289,15 @@ async def start_basic_rps(channel, player1, player2):
     # Store the message ID for later deletion
     game.choice_message = choice_message
     
-    logger.info(f"Basic RPS game started in channel {channel.id}: {player1.display_name} vs {player2.display_name}")
+    logger.info("Basic RPS game started in channel %s: %s vs %s", channel.id, player1.display_name, player2.display_name)
 
 async def start_action_rps(channel, player1, player2):
     """Start a Rock Paper Scissors Action game."""
     # Create the game instance
     game = ActionRPSGame(player1, player2, channel)
     
-    # Store in active games
-    if GAME_ID not in active_games:
-        active_games[GAME_ID] = {}
-    active_games[GAME_ID][channel.id] = game
+    # Store in active games and schedule the AFK check
+    add_active_game(GAME_ID, channel.id, game)
     
     # Send game start message
     game.start_message = await channel.send(f"🎮 Rock Paper Scissors Action started: {player1.mention} vs {player2.mention}")
@@ -343,7 +312,7 @@ async def start_action_rps(channel, player1, player2):
     # Store the message ID for later deletion
     game.action_message = action_message
     
-    logger.info(f"Action RPS game started in channel {channel.id}: {player1.display_name} vs {player2.display_name}")
+    logger.info("Action RPS game started in channel %s: %s vs %s", channel.id, player1.display_name, player2.display_name)
 
 # Add these new view classes to handle interaction-based prompts
 
@@ -404,14 +373,14 @@ class StartRPSView(discord.ui.View):
                 )
             except (discord.errors.NotFound, discord.errors.HTTPException, aiohttp.ClientOSError) as e:
                 # If interaction expired or network error, send a new message to the channel
-                logger.warning(f"Interaction response failed: {str(e)}. Sending fallback message.")
+                logger.warning("Interaction response failed: %s. Sending fallback message.", e)
                 player = interaction.user
                 await interaction.channel.send(
                     f"{player.mention}, your interaction expired. Please click the button again to make your choice.",
                     delete_after=10
                 )
         except Exception as e:
-            logger.error(f"Error in RPS choose_button: {e}\n{traceback.format_exc()}")
+            logger.error("Error in RPS choose_button: %s", e, exc_info=True)
             try:
                 if not interaction.response.is_done():
                     await interaction.response.send_message(
@@ -474,14 +443,14 @@ class StartActionRPSView(discord.ui.View):
                 )
             except (discord.errors.NotFound, discord.errors.HTTPException, aiohttp.ClientOSError) as e:
                 # If interaction expired or network error, send a new message to the channel
-                logger.warning(f"Interaction response failed: {str(e)}. Sending fallback message.")
+                logger.warning("Interaction response failed: %s. Sending fallback message.", e)
                 player = interaction.user
                 await interaction.channel.send(
                     f"{player.mention}, your interaction expired. Please click the button again to choose your action.",
                     delete_after=10
                 )
         except Exception as e:
-            logger.error(f"Error in RPS action_button: {e}\n{traceback.format_exc()}")
+            logger.error("Error in RPS action_button: %s", e, exc_info=True)
             try:
                 if not interaction.response.is_done():
                     await interaction.response.send_message(
@@ -502,7 +471,7 @@ async def process_basic_rps_result(game):
     embed = discord.Embed(
         title="Rock Paper Scissors Result",
         description=result["message"],
-        color=discord.Color.blue()
+        color=COLOR_BLUE
     )
     
     # Add player choices
@@ -534,8 +503,7 @@ async def process_basic_rps_result(game):
         game.reset()
         
         # Remove from active games to avoid conflicts
-        if game.channel.id in active_games.get(GAME_ID, {}):
-            del active_games[GAME_ID][game.channel.id]
+        active_games.get(GAME_ID, {}).pop(game.channel.id, None)
             
         # Try to delete the old result message
         if hasattr(game, 'result_message') and game.result_message:
@@ -568,10 +536,9 @@ async def process_basic_rps_result(game):
     game.result_message = await game.channel.send(embed=embed, view=view)
     
     # Remove from active games
-    if game.channel.id in active_games.get(GAME_ID, {}):
-        del active_games[GAME_ID][game.channel.id]
+    active_games.get(GAME_ID, {}).pop(game.channel.id, None)
     
-    logger.info(f"Basic RPS game ended in channel {game.channel.id}")
+    logger.info("Basic RPS game ended in channel %s", game.channel.id)
 
 async def process_action_rps_result(game):
     """Process and display results for an action RPS game."""
@@ -582,7 +549,7 @@ async def process_action_rps_result(game):
     embed = discord.Embed(
         title="Rock Paper Scissors Action Result",
         description=result["message"],
-        color=discord.Color.blue()
+        color=COLOR_BLUE
     )
     
     # Add player choices
@@ -627,7 +594,7 @@ async def process_action_rps_result(game):
         action_embed = discord.Embed(
             title="Action Result",
             description=action_text,
-            color=discord.Color.gold()
+            color=COLOR_GOLD
         )
         
         # Add the GIF if found
@@ -650,8 +617,7 @@ async def process_action_rps_result(game):
             game.reset()
             
             # Remove from active games to avoid conflicts
-            if game.channel.id in active_games.get(GAME_ID, {}):
-                del active_games[GAME_ID][game.channel.id]
+            active_games.get(GAME_ID, {}).pop(game.channel.id, None)
             
             # Try to delete the old result messages
             if hasattr(game, 'result_message') and game.result_message:
@@ -690,8 +656,7 @@ async def process_action_rps_result(game):
             game.reset()
             
             # Remove from active games to avoid conflicts
-            if game.channel.id in active_games.get(GAME_ID, {}):
-                del active_games[GAME_ID][game.channel.id]
+            active_games.get(GAME_ID, {}).pop(game.channel.id, None)
                 
             # Try to delete the old result message
             if hasattr(game, 'result_message') and game.result_message:
@@ -715,10 +680,9 @@ async def process_action_rps_result(game):
         await game.channel.send("It's a tie! No action performed.", view=view)
     
     # Remove from active games
-    if game.channel.id in active_games.get(GAME_ID, {}):
-        del active_games[GAME_ID][game.channel.id]
+    active_games.get(GAME_ID, {}).pop(game.channel.id, None)
     
-    logger.info(f"Action RPS game ended in channel {game.channel.id}")
+    logger.info("Action RPS game ended in channel %s", game.channel.id)
 
 # Setup function for bot.py
 async def setup_rps_command(bot):
@@ -5,7 +5,6 @@ import random
 import discord
 import aiohttp
 import logging
-import traceback
 import time
 import os
 from typing import Optional, Dict, Tuple, List
@@ -42,7 +41,7 @@ class BasicRPSGame:
         self.choices = {player1.id: None, player2.id: None}
         self.game_over = False
         self.winner = None
-        self.last_activity_time = time.time()
+        self.last_activity_time = time.monotonic()
         
         # Message references for cleanup
         self.start_message = None
@@ -53,7 +52,7 @@ class BasicRPSGame:
         """Record a player's choice."""
         if player_id in [self.player1.id, self.player2.id] and choice in RPS_CHOICES:
             self.choices[player_id] = choice
-            self.last_activity_time = time.time()
+            self.last_activity_time = time.monotonic()
             return True
         return False
     
@@ -100,7 +99,7 @@ class BasicRPSGame:
         self.choices = {self.player1.id: None, self.player2.id: None}
         self.game_over = False
         self.winner = None
-        self.last_activity_time = time.time()
+        self.last_activity_time = time.monotonic()
 
 class ActionRPSGame(BasicRPSGame):
     """Extended RPS game with actions that display GIFs."""
@@ -117,7 +116,7 @@ class ActionRPSGame(BasicRPSGame):
         """Set what action the player wants to perform if they win."""
         if player_id in [self.player1.id, self.player2.id] and action in ACTION_OPTIONS:
             self.actions[player_id] = action
-            self.last_activity_time = time.time()
+            self.last_activity_time = time.monotonic()
             return True
         return False
     
@@ -189,10 +188,10 @@ class ActionRPSGame(BasicRPSGame):
                                 
                             return gif_url
                     else:
-                        logger.error(f"Tenor API error: {response.status} - {await response.text()}")
+                        logger.error("Tenor API error: %s - %s", response.status, await response.text())
                         
         except Exception as e:
-            logger.error(f"Error fetching GIF: {e}\n{traceback.format_exc()}")
+            logger.error("Error fetching GIF: %s", e, exc_info=True)
             
         return None
         
@@ -3,7 +3,6 @@ UI components for the Discord Rock Paper Scissors Games (ID: 1003).
 """
 import discord
 import logging
-import traceback
 import aiohttp
 from typing import List, Dict, Optional, Callable
 
@@ -28,7 +27,7 @@ class RPSButton(discord.ui.Button):
             if hasattr(view, 'on_choice_select'):
                 await view.on_choice_select(interaction, self.choice)
         except Exception as e:
-            logger.error(f"Error in RPSButton callback: {e}\n{traceback.format_exc()}")
+            logger.error("Error in RPSButton callback: %s", e, exc_info=True)
             try:
                 if interaction.response.is_done():
                     await interaction.followup.send("An error occurred. Please try again.", ephemeral=True)
@@ -79,7 +78,7 @@ class RPSView(discord.ui.View):
                 )
             except (discord.errors.NotFound, discord.errors.HTTPException, aiohttp.ClientOSError) as e:
                 # If interaction expired or network error, send a new message to the channel
-                logger.warning(f"Interaction response failed: {str(e)}. Sending fallback message.")
+                logger.warning("Interaction response failed: %s. Sending fallback message.", e)
                 await self.game.channel.send(
                     f"{interaction.user.mention} chose {RPS_EMOJIS[choice]} **{choice.capitalize()}**!",
                     delete_after=5
@@ -99,10 +98,10 @@ class RPSView(discord.ui.View):
                 try:
                     await self.on_choice_made(interaction, choice)
                 except Exception as e:
-                    logger.error(f"Error in on_choice_made callback: {e}\n{traceback.format_exc()}")
+                    logger.error("Error in on_choice_made callback: %s", e, exc_info=True)
         
         except Exception as e:
-            logger.error(f"Error in on_choice_select: {e}\n{traceback.format_exc()}")
+            logger.error("Error in on_choice_select: %s", e, exc_info=True)
             try:
                 if not interaction.response.is_done():
                     await interaction.response.send_message(
@@ -119,7 +118,7 @@ class RPSView(discord.ui.View):
             child.disabled = True
         
         # We're not saving message references now, so just log
-        logger.info(f"RPSView for player {self.player_id} timed out")
+        logger.info("RPSView for player %s timed out", self.player_id)
 
 
 class ActionSelectView(discord.ui.View):
@@ -148,7 +147,7 @@ class ActionSelectView(discord.ui.View):
                 )
             except (discord.errors.NotFound, discord.errors.HTTPException, aiohttp.ClientOSError) as e:
                 # If interaction expired or network error, send a new message to the channel
-                logger.warning(f"Interaction response failed: {str(e)}. Sending fallback message.")
+                logger.warning("Interaction response failed: %s. Sending fallback message.", e)
                 await self.game.channel.send(
                     f"{interaction.user.mention} selected their action!",
                     delete_after=5
@@ -168,10 +167,10 @@ class ActionSelectView(discord.ui.View):
                 try:
                     await self.on_action_selected(interaction, action)
                 except Exception as e:
-                    logger.error(f"Error in on_action_selected callback: {e}\n{traceback.format_exc()}")
+                    logger.error("Error in on_action_selected callback: %s", e, exc_info=True)
         
         except Exception as e:
-            logger.error(f"Error in action_selected: {e}\n{traceback.format_exc()}")
+            logger.error("Error in action_selected: %s", e, exc_info=True)
             try:
                 if not interaction.response.is_done():
                     await interaction.response.send_message(
@@ -188,7 +187,7 @@ class ActionSelectView(discord.ui.View):
             child.disabled = True
         
         # We're not saving message references now, so just log
-        logger.info(f"ActionSelectView for player {self.player_id} timed out")
+        logger.info("ActionSelectView for player %s timed out", self.player_id)
 
 
 class ActionSelect(discord.ui.Select):
@@ -225,7 +224,7 @@ class ActionSelect(discord.ui.Select):
             if hasattr(self.view, 'action_selected'):
                 await self.view.action_selected(interaction, action)
         except Exception as e:
-            logger.error(f"Error in ActionSelect callback: {e}\n{traceback.format_exc()}")
+            logger.error("Error in ActionSelect callback: %s", e, exc_info=True)
             try:
                 if interaction.response.is_done():
                     await interaction.followup.send("An error occurred. Please try again.", ephemeral=True)
@@ -253,7 +252,7 @@ class PlayAgainButton(discord.ui.Button):
             if self.play_again_callback:
                 await self.play_again_callback(interaction)
         except Exception as e:
-            logger.error(f"Error in PlayAgainButton callback: {e}\n{traceback.format_exc()}")
+            logger.error("Error in PlayAgainButton callback: %s", e, exc_info=True)
             try:
                 if interaction.response.is_done():
                     await interaction.followup.send("An error occurred. Please try again.", ephemeral=True)